@@ -1,7 +1,23 @@
 import argparse
+import getpass
+import os
 import pywikibot
-from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+import sys
+import time
+from annlightenmentlib.bacterialannotationbot import (BacterialAnnotationBot,
+                                                      get_property_dict)
 from annlightenmentlib.delete_items import DeleteItems
+from annlightenmentlib.event_log import EventLog
+from annlightenmentlib.export_backend import ExportBackend
+from annlightenmentlib.feature_model import FeatureModel
+from annlightenmentlib.async_wikibase_backend import AsyncWikibaseBackend
+from annlightenmentlib.label_cache import LabelCache
+from annlightenmentlib.plan_backend import PlanBackend
+from annlightenmentlib.pywikibot_backend import PywikibotBackend
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_journal import UploadJournal
+from annlightenmentlib.upload_scheduler import (UploadScheduler,
+                                                UploadSchedulerScope)
 
 def main():
     parser = argparse.ArgumentParser()    
@@ -22,16 +38,88 @@ def main():
     upload_parser.add_argument("strain_id", help="the ID (Q-number) of the "
                                "item that describes the strain you are working "
                                "with")
-    upload_parser.add_argument("--databank", default = "TillsWiki", help = ""
-                               "the databank you want to use. Chose from Tills"
-                               "Wiki or Wikidata. Default is TillsWiki") 
+    _add_upload_arguments(upload_parser)
+    upload_parser.add_argument("--plan", default=None, help="write every edit "
+                               "the upload would make to this JSON lines "
+                               "file instead of uploading, without "
+                               "contacting the wiki")
     upload_parser.set_defaults(func=upload_items)
+
+    batch_parser = subparsers.add_parser("upload-batch", help="subcommand to "
+                                         "upload the annotations of several "
+                                         "strains through one session and "
+                                         "worker pool")
+    batch_parser.add_argument("manifest", help="a tab-separated file with "
+                              "one line per strain: the path to the "
+                              "...merge_features.gff file, the path to the "
+                              "..._merge.csv file and the strain ID. Relative "
+                              "paths are relative to the manifest")
+    _add_upload_arguments(batch_parser)
+    batch_parser.set_defaults(func=upload_batch)
    
+    export_parser = subparsers.add_parser("export", help="subcommand to "
+                                          "write the items of an upload as "
+                                          "files for a bulk import into a "
+                                          "fresh Wikibase, without contacting "
+                                          "the wiki")
+    export_parser.add_argument("ANNOgesic_merge_gff", help="the path to the "
+                               "ANNOgesic ...merge_features.gff file")
+    export_parser.add_argument("ANNOgesic_merge_csv", help="the path to "
+                               "the ANNOgesic ..._merge.csv file that "
+                               "contains the sRNA interactions")
+    export_parser.add_argument("strain_id", help="the ID (Q-number) of the "
+                               "item that describes the strain")
+    export_parser.add_argument("--strain-label", default=None, help="the "
+                               "label of the strain, which is part of the "
+                               "labels of all items. Default is the strain "
+                               "ID")
+    export_parser.add_argument("--databank", default = "TillsWiki", help = ""
+                               "the databank whose properties are used. "
+                               "Chose from TillsWiki or Wikidata. Default is "
+                               "TillsWiki")
+    export_parser.add_argument("--ndjson", default=None, help="write the "
+                               "Wikibase entity JSON of every item to this "
+                               "file, one item per line")
+    export_parser.add_argument("--quickstatements", default=None,
+                               help="write a QuickStatements batch to this "
+                               "file")
+    export_parser.add_argument("--first-item-id", default=None, help="the "
+                               "next free ID of the wiki the items are "
+                               "imported into. The placeholder IDs Q-1, "
+                               "Q-2, ... of the new items are replaced by "
+                               "the IDs from there on, in the order of the "
+                               "files. Without it the placeholders are kept")
+    export_parser.set_defaults(func=export_items)
+
     delete_parser = subparsers.add_parser("delete", help="subcommand to delete "
                                           "items")
-    delete_parser.add_argument("path_to_logfile", help="the path to the log "
-                               "file that contains the IDs of the items which "
-                               "should be deleted")
+    delete_parser.add_argument("path_to_logfile", nargs="?", default=None,
+                               help="the path to the log file that contains "
+                               "the IDs of the items which should be deleted")
+    delete_parser.add_argument("--journal", default=None, help="delete the "
+                               "items recorded in this upload journal")
+    delete_parser.add_argument("--strain", default=None, help="delete all "
+                               "items that are found in the strain with this "
+                               "ID (Q-number)")
+    delete_parser.add_argument("--databank", default = "TillsWiki", help = ""
+                               "the databank you want to use. Chose from Tills"
+                               "Wiki or Wikidata. Default is TillsWiki")
+    delete_parser.add_argument("--workers", type=int, default=1, help="the "
+                               "number of deletions that are sent at the same "
+                               "time. Default is 1")
+    delete_parser.add_argument("--backend", default="pywikibot",
+                               choices=["pywikibot", "asyncio"], help="the "
+                               "client that talks to the wiki. Default is "
+                               "pywikibot")
+    delete_parser.add_argument("--api-url", default=None, help="the api.php "
+                               "URL for the asyncio backend. Default is the "
+                               "API of the databank's repository")
+    delete_parser.add_argument("--report", default=None, help="write the "
+                               "result of every item to this JSON lines file")
+    delete_parser.add_argument("--metrics", default=None, help="write the "
+                               "counts and timings of the API calls to this "
+                               "JSON file")
+    _add_write_interval_argument(delete_parser)
     delete_parser.set_defaults(func=delete_items)
 
     args = parser.parse_args()
@@ -39,17 +127,257 @@ def main():
     if args.version is True:
         print("ANNlightenment version 0")
     elif "func" in dir(args):
-        args.func(args)
+        event_log = EventLog("ANNlightenment_{}.log".format(
+            time.strftime("%Y%m%d-%H_%M_%S")))
+        try:
+            args.func(args)
+        finally:
+            event_log.close()
     else:
         parser.print_help()
         
+def _add_upload_arguments(parser):
+    parser.add_argument("--databank", default = "TillsWiki", help = ""
+                        "the databank you want to use. Chose from Tills"
+                        "Wiki or Wikidata. Default is TillsWiki") 
+    parser.add_argument("--cache", default=None, help="path to an "
+                        "SQLite file that caches labels and IDs of "
+                        "uploaded items between runs")
+    parser.add_argument("--workers", type=int, default=1, help="the "
+                        "number of edits that are sent at the same "
+                        "time. Writes start spaced by put_throttle of "
+                        "the user-config.py. With the asyncio backend "
+                        "they then follow the feedback of the server, "
+                        "pywikibot keeps them at put_throttle. Default "
+                        "is 1")
+    parser.add_argument("--backend", default="pywikibot",
+                        choices=["pywikibot", "asyncio"], help="the "
+                        "client that talks to the wiki. asyncio sends "
+                        "the requests of all workers over a few "
+                        "keep-alive connections. Default is pywikibot")
+    parser.add_argument("--api-url", default=None, help="the api.php "
+                        "URL for the asyncio backend. Default is the "
+                        "API of the databank's repository")
+    parser.add_argument("--journal", default=None, help="path to the "
+                        "journal of finished uploads, which is removed "
+                        "when the upload completes. Default is "
+                        "ANNlightenment_<strain_id>.journal, or "
+                        "ANNlightenment_<manifest name>.journal for a batch")
+    parser.add_argument("--keep-journal", default=False,
+                        action="store_true", help="keep the journal "
+                        "after a complete upload, e.g. to delete the "
+                        "uploaded items with it later")
+    parser.add_argument("--resume", default=False, action="store_true",
+                        help="continue an interrupted upload and skip "
+                        "everything its journal lists as done")
+    parser.add_argument("--sync", default=False, action="store_true",
+                        help="update the items already linked to the "
+                        "strain to a new ANNOgesic release: only "
+                        "missing and changed items and claims are "
+                        "uploaded and items and claims that are no "
+                        "longer in the release are removed")
+    parser.add_argument("--metrics", default=None, help="write the "
+                        "counts and timings of the API calls per "
+                        "operation and phase to this JSON file")
+    _add_write_interval_argument(parser)
+
+def _add_write_interval_argument(parser):
+    parser.add_argument("--min-write-interval", type=float, default=0,
+                        help="the shortest time in seconds between two "
+                        "writes, however fast the server answers. "
+                        "Default is 0")
+
 def upload_items(args):
+    feature_model = _return_checked_feature_model(args.ANNOgesic_merge_gff)
+    if args.plan is not None:
+        _plan_upload(args, feature_model)
+        return
+    journal = _return_journal(args, args.strain_id, args.strain_id)
     site = _return_database_site(args)
+    label_cache = None
+    if args.cache is not None:
+        label_cache = LabelCache(args.cache)
+    upload_executor = _return_upload_executor(args)
+    backend = _return_backend(args, site)
     BAB = BacterialAnnotationBot(
         site, args.ANNOgesic_merge_gff, args.ANNOgesic_merge_csv,
-        args.strain_id, args.databank)
+        args.strain_id, args.databank, label_cache, feature_model,
+        upload_executor, backend, journal, args.sync)
     BAB.all_features()
+    _finish_upload(args, upload_executor, journal, backend, label_cache)
+
+def upload_batch(args):
+    strains = _read_manifest(args.manifest)
+    feature_models = [_return_checked_feature_model(annotation_file)
+                      for annotation_file, interaction_file, strain_id
+                      in strains]
+    journal = _return_journal(
+        args, ",".join(strain_id for annotation_file, interaction_file,
+                       strain_id in strains),
+        os.path.splitext(os.path.basename(args.manifest))[0])
+    site = _return_database_site(args)
+    label_cache = None
+    if args.cache is not None:
+        label_cache = LabelCache(args.cache)
+    upload_executor = _return_upload_executor(args)
+    backend = _return_backend(args, site)
+    # the tasks of all strains run in one graph, so the workers are
+    # shared by all strains instead of waiting for one strain to finish
+    scheduler = UploadScheduler(upload_executor, journal)
+    bots = []
+    for (annotation_file, interaction_file, strain_id), feature_model in zip(
+            strains, feature_models):
+        BAB = BacterialAnnotationBot(
+            site, annotation_file, interaction_file, strain_id,
+            args.databank, label_cache, feature_model, upload_executor,
+            backend, sync=args.sync,
+            scheduler=UploadSchedulerScope(scheduler, strain_id))
+        BAB.schedule_all_features()
+        bots.append(BAB)
+    scheduler.run()
+    for BAB in bots:
+        BAB.finish_upload()
+    upload_executor.print_failures()
+    upload_executor.metrics.print_summary()
+    _finish_upload(args, upload_executor, journal, backend, label_cache)
+
+def _read_manifest(path_to_manifest):
+    """Return the (GFF, merge CSV, strain ID) lines of a manifest."""
+    manifest_directory = os.path.dirname(os.path.abspath(path_to_manifest))
+    strains = []
+    with open(path_to_manifest) as manifest:
+        for line_number, line in enumerate(manifest, 1):
+            if line.strip() == "" or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 3:
+                sys.stderr.write("Error: line {} of {} does not have three "
+                                 "tab-separated columns\n".format(
+                                     line_number, path_to_manifest))
+                sys.exit(1)
+            annotation_file, interaction_file, strain_id = fields
+            strains.append((os.path.join(manifest_directory, annotation_file),
+                            os.path.join(manifest_directory, interaction_file),
+                            strain_id))
+    strain_ids = [strain_id for annotation_file, interaction_file, strain_id
+                  in strains]
+    if len(set(strain_ids)) != len(strain_ids):
+        sys.stderr.write("Error: every strain may appear only once in {}"
+                         "\n".format(path_to_manifest))
+        sys.exit(1)
+    return(strains)
+
+def _finish_upload(args, upload_executor, journal, backend, label_cache):
+    upload_executor.shutdown()
+    if args.metrics is not None:
+        upload_executor.metrics.write(args.metrics)
+    if upload_executor.failures == [] and not args.keep_journal:
+        journal.remove()
+    elif upload_executor.failures == []:
+        journal.close()
+    else:
+        journal.close()
+        print("run the upload again with --resume to retry the failed "
+              "uploads")
+    backend.close()
+    if label_cache is not None:
+        label_cache.close()
     
+def _return_checked_feature_model(annotation_file):
+    feature_model = FeatureModel().read(annotation_file)
+    problems = feature_model.validate()
+    if problems != []:
+        for problem in problems:
+            sys.stderr.write("Error: {}\n".format(problem))
+        sys.stderr.write("{} problems found in {}, nothing was uploaded\n".format(
+            len(problems), annotation_file))
+        sys.exit(1)
+    print("read {} features from {}".format(
+        len(feature_model.entries), annotation_file))
+    return(feature_model)
+
+def _plan_upload(args, feature_model):
+    backend = PlanBackend(args.plan, pywikibot.config.put_throttle)
+    upload_executor = UploadExecutor()
+    BAB = BacterialAnnotationBot(
+        None, args.ANNOgesic_merge_gff, args.ANNOgesic_merge_csv,
+        args.strain_id, args.databank, None, feature_model,
+        upload_executor, backend)
+    BAB.all_features()
+    upload_executor.shutdown()
+    if args.metrics is not None:
+        upload_executor.metrics.write(args.metrics)
+    summary = backend.close()
+    print("planned {} writes with {} statements in {}:".format(
+        sum(summary["writes"].values()), summary["statements"], args.plan))
+    for operation, count in sorted(summary["writes"].items()):
+        print(" {} {}".format(count, operation))
+    print("with a put_throttle of {} seconds the upload takes at least "
+          "{:.1f} hours".format(summary["put_throttle"],
+                                summary["minimum_seconds"] / 3600))
+
+def export_items(args):
+    if args.ndjson is None and args.quickstatements is None:
+        sys.stderr.write("Error: give --ndjson, --quickstatements or both\n")
+        sys.exit(1)
+    feature_model = _return_checked_feature_model(args.ANNOgesic_merge_gff)
+    strain_labels = {}
+    if args.strain_label is not None:
+        strain_labels[args.strain_id] = args.strain_label
+    backend = ExportBackend(strain_labels)
+    upload_executor = UploadExecutor()
+    BAB = BacterialAnnotationBot(
+        None, args.ANNOgesic_merge_gff, args.ANNOgesic_merge_csv,
+        args.strain_id, args.databank, None, feature_model,
+        upload_executor, backend)
+    BAB.all_features()
+    upload_executor.shutdown()
+    if args.ndjson is not None:
+        backend.write_ndjson(args.ndjson, args.first_item_id)
+    if args.quickstatements is not None:
+        backend.write_quickstatements(args.quickstatements,
+                                      args.first_item_id)
+    print("exported {} items with {} statements".format(
+        len(backend), backend.get_number_of_statements()))
+
+def _return_journal(args, strain_id, name):
+    path_to_journal = args.journal
+    if path_to_journal is None:
+        path_to_journal = "ANNlightenment_{}.journal".format(name)
+    try:
+        journal = UploadJournal(path_to_journal, strain_id, args.resume)
+    except (FileExistsError, ValueError) as error:
+        sys.stderr.write("Error: {}\n".format(error))
+        sys.exit(1)
+    if args.resume:
+        print("resuming {} finished uploads from {}".format(
+            len(journal), path_to_journal))
+    return(journal)
+
+def _return_upload_executor(args):
+    # pywikibot spaces its writes by put_throttle and retries maxlag,
+    # ratelimited and server errors itself, so only the asyncio backend
+    # lets the executor follow the feedback of the server
+    return(UploadExecutor(args.workers, pywikibot.config.put_throttle,
+                          min_write_interval=args.min_write_interval,
+                          adaptive_rate=args.backend == "asyncio"))
+
+def _return_backend(args, site):
+    if args.backend == "asyncio":
+        return(_return_async_backend(args, site))
+    return(PywikibotBackend(site.data_repository()))
+
+def _return_async_backend(args, site):
+    repo = site.data_repository()
+    api_url = args.api_url
+    if api_url is None:
+        api_url = "{}://{}{}".format(repo.protocol(), repo.hostname(),
+                                     repo.apipath())
+    username = pywikibot.config.usernames[repo.family.name][repo.code]
+    password = getpass.getpass("password for {}: ".format(username))
+    return(AsyncWikibaseBackend(api_url, username, password,
+                                max_connections=max(args.workers, 1)))
+
 def _return_database_site(args):
     if args.databank == "Wikidata":
         print("working with Wikidata")
@@ -60,8 +388,35 @@ def _return_database_site(args):
     return(site)
 
 def delete_items(args):
-    deletion = DeleteItems(args.path_to_logfile)
-    id_list_for_deletion = deletion._return_ID_list_for_deletion()
-    deletion._delete(id_list_for_deletion)
+    sources = [source for source in [args.path_to_logfile, args.journal,
+                                     args.strain] if source is not None]
+    if len(sources) != 1:
+        sys.stderr.write("Error: give either a log file, --journal or "
+                         "--strain\n")
+        sys.exit(1)
+    site = _return_database_site(args)
+    backend = _return_backend(args, site)
+    upload_executor = _return_upload_executor(args)
+    deletion = DeleteItems(backend, upload_executor)
+    if args.journal is not None:
+        item_ids = deletion.get_item_ids_from_journal(args.journal)
+    elif args.strain is not None:
+        item_ids = deletion.get_item_ids_of_strain(
+            args.strain,
+            get_property_dict(args.databank)["found_in_taxon"])
+    else:
+        item_ids = deletion.get_item_ids_from_logfile(args.path_to_logfile)
+    print("deleting {} items".format(len(item_ids)))
+    deletion.delete(item_ids)
+    upload_executor.shutdown()
+    backend.close()
+    counts = deletion.get_counts()
+    print("{} items deleted, {} did not exist, {} failed".format(
+        counts["deleted"], counts["missing"], counts["failed"]))
+    upload_executor.metrics.print_summary()
+    if args.report is not None:
+        deletion.write_report(args.report)
+    if args.metrics is not None:
+        upload_executor.metrics.write(args.metrics)
 
 main()
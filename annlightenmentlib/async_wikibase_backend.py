@@ -0,0 +1,302 @@
+import asyncio
+import gzip
+import json
+import ssl
+import threading
+from urllib.parse import urlencode, urlsplit
+from annlightenmentlib.wikibase_backend import (WikibaseAPIError,
+                                                WikibaseBackend,
+                                                get_datavalue)
+
+class AsyncWikibaseClient():
+    """
+    Minimal asyncio client for the MediaWiki action API of a Wikibase.
+
+    Requests are POSTed over a small pool of keep-alive HTTP/1.1
+    connections, so that many in-flight edits share a few TCP (and TLS)
+    connections instead of opening one each. The session cookie and the
+    CSRF token are fetched once and reused by all requests.
+    """
+
+    def __init__(self, api_url, max_connections=8, maxlag=5,
+                 verify_certificate=True):
+        url = urlsplit(api_url)
+        self.use_tls = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.use_tls else 80)
+        self.path = url.path or "/"
+        self.max_connections = max_connections
+        self.maxlag = maxlag
+        self.ssl_context = None
+        if self.use_tls:
+            self.ssl_context = ssl.create_default_context()
+            if not verify_certificate:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.idle_connections = []
+        self.connection_semaphore = None
+        self.cookies = {}
+        self.csrf_token = None
+        self.token_lock = None
+
+    async def _get_connection(self):
+        if self.idle_connections:
+            return(self.idle_connections.pop())
+        return(await asyncio.open_connection(self.host, self.port,
+                                             ssl=self.ssl_context))
+
+    def _release_connection(self, connection, keep_alive):
+        if keep_alive:
+            self.idle_connections.append(connection)
+        else:
+            connection[1].close()
+
+    async def request(self, params):
+        """Send one API request and return the decoded JSON answer."""
+        params = dict(params, format="json")
+        if self.connection_semaphore is None:
+            self.connection_semaphore = asyncio.Semaphore(
+                self.max_connections)
+        async with self.connection_semaphore:
+            status, headers, body = await self._send(urlencode(params))
+        if status >= 400:
+            raise WikibaseAPIError("http-{}".format(status),
+                                   body[:200].decode(errors="replace"),
+                                   headers.get("retry-after"))
+        result = json.loads(body.decode("utf-8"))
+        if "error" in result:
+            raise WikibaseAPIError(result["error"].get("code"),
+                                   result["error"].get("info"),
+                                   headers.get("retry-after"))
+        return(result)
+
+    async def _send(self, form_data):
+        for attempt in range(2):
+            fresh_connection = not self.idle_connections
+            connection = await self._get_connection()
+            try:
+                status, headers, body = await self._exchange(connection,
+                                                             form_data)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection[1].close()
+                # a pooled connection may have been closed by the server
+                if fresh_connection or attempt == 1:
+                    raise
+                continue
+            except BaseException:
+                connection[1].close()
+                raise
+            keep_alive = headers.get("connection", "").lower() != "close"
+            self._release_connection(connection, keep_alive)
+            return(status, headers, body)
+
+    async def _exchange(self, connection, form_data):
+        reader, writer = connection
+        body = form_data.encode("utf-8")
+        request_lines = [
+            "POST {} HTTP/1.1".format(self.path),
+            "Host: {}".format(self.host),
+            "User-Agent: ANNlightenment",
+            "Accept-Encoding: gzip",
+            "Connection: keep-alive",
+            "Content-Type: application/x-www-form-urlencoded",
+            "Content-Length: {}".format(len(body))]
+        if self.cookies:
+            request_lines.append("Cookie: " + "; ".join(
+                "{}={}".format(name, value)
+                for name, value in self.cookies.items()))
+        writer.write(("\r\n".join(request_lines) + "\r\n\r\n").encode(
+            "latin-1") + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            if name == "set-cookie":
+                cookie = value.split(";", 1)[0]
+                cookie_name, _, cookie_value = cookie.partition("=")
+                self.cookies[cookie_name.strip()] = cookie_value.strip()
+            else:
+                headers[name] = value
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            response_body = await self._read_chunked_body(reader)
+        else:
+            response_body = await reader.readexactly(
+                int(headers.get("content-length", 0)))
+        if headers.get("content-encoding") == "gzip":
+            response_body = gzip.decompress(response_body)
+        return(status, headers, response_body)
+
+    async def _read_chunked_body(self, reader):
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            chunk_size = int(size_line.split(b";")[0].strip(), 16)
+            if chunk_size == 0:
+                # skip trailers up to the closing blank line
+                while (await reader.readline()).strip():
+                    pass
+                break
+            chunks.append(await reader.readexactly(chunk_size))
+            await reader.readexactly(2)
+        return(b"".join(chunks))
+
+    async def get_token(self, token_type="csrf"):
+        result = await self.request({"action": "query", "meta": "tokens",
+                                     "type": token_type})
+        return(result["query"]["tokens"][token_type + "token"])
+
+    async def login(self, username, password):
+        login_token = await self.get_token("login")
+        result = await self.request({"action": "login", "lgname": username,
+                                     "lgpassword": password,
+                                     "lgtoken": login_token})
+        if result["login"]["result"] != "Success":
+            raise WikibaseAPIError("login-failed",
+                                   result["login"].get("reason"))
+        self.csrf_token = None
+
+    async def _get_csrf_token(self):
+        if self.token_lock is None:
+            self.token_lock = asyncio.Lock()
+        async with self.token_lock:
+            if self.csrf_token is None:
+                self.csrf_token = await self.get_token("csrf")
+            return(self.csrf_token)
+
+    async def write(self, params):
+        """Send a write request with the CSRF token, fetching a new token
+        once if the session's token has become invalid. Like pywikibot,
+        every write asserts the login, so that an expired session fails
+        with assertuserfailed instead of editing logged-out, and is
+        flagged as a bot edit.
+        """
+        for attempt in range(2):
+            token = await self._get_csrf_token()
+            try:
+                return(await self.request(dict(
+                    params, token=token, maxlag=self.maxlag,
+                    bot=1, **{"assert": "user"})))
+            except WikibaseAPIError as error:
+                if error.code != "badtoken" or attempt == 1:
+                    raise
+                if self.csrf_token == token:
+                    self.csrf_token = None
+
+    async def close(self):
+        for reader, writer in self.idle_connections:
+            writer.close()
+        self.idle_connections = []
+
+
+class AsyncWikibaseBackend(WikibaseBackend):
+    """
+    Backend that sends the bot's API calls through AsyncWikibaseClient.
+    The client runs on an event loop in a background thread, so the
+    synchronous upload workers can share its connection pool.
+    """
+
+    def __init__(self, api_url, username=None, password=None,
+                 max_connections=8, maxlag=5, verify_certificate=True):
+        self.client = AsyncWikibaseClient(api_url, max_connections, maxlag,
+                                          verify_certificate)
+        self.written_revision_ids = {}
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever,
+                                            daemon=True)
+        self.loop_thread.start()
+        if username is not None:
+            self._run(self.client.login(username, password))
+
+    def _run(self, coroutine):
+        return(asyncio.run_coroutine_threadsafe(coroutine,
+                                                self.loop).result())
+
+    def _record_revision_id(self, item_id, revision_id):
+        if revision_id is not None:
+            self.written_revision_ids[item_id] = max(
+                revision_id, self.written_revision_ids.get(item_id, 0))
+
+    def create_item(self, data):
+        result = self._run(self.client.write(
+            {"action": "wbeditentity", "new": "item",
+             "data": json.dumps(data)}))
+        self._record_revision_id(result["entity"]["id"],
+                                 result["entity"].get("lastrevid"))
+        return(result["entity"]["id"])
+
+    def edit_entity(self, item_id, data, summary=None):
+        params = {"action": "wbeditentity", "id": item_id,
+                  "data": json.dumps(data)}
+        if summary is not None:
+            params["summary"] = summary
+        result = self._run(self.client.write(params))
+        self._record_revision_id(item_id, result["entity"].get("lastrevid"))
+
+    def add_claim(self, item_id, claim, target, datatype):
+        result = self._run(self.client.write(
+            {"action": "wbcreateclaim", "entity": item_id,
+             "property": claim, "snaktype": "value",
+             "value": json.dumps(get_datavalue(target, datatype))}))
+        self._record_revision_id(item_id, result.get(
+            "pageinfo", {}).get("lastrevid"))
+
+    def get_written_revision_id(self, item_id):
+        return(self.written_revision_ids.get(item_id))
+
+    def get_entities(self, item_ids, props):
+        return(self._run(self._get_entities(list(item_ids), props)))
+
+    async def _get_entities(self, item_ids, props):
+        # 50 IDs per request is the API limit for non-sysop accounts
+        results = await asyncio.gather(*[
+            self.client.request({"action": "wbgetentities",
+                                 "ids": "|".join(item_ids[start:start + 50]),
+                                 "props": props, "languages": "en"})
+            for start in range(0, len(item_ids), 50)])
+        entities = {}
+        for result in results:
+            for item_id, entity in result["entities"].items():
+                if "missing" not in entity:
+                    entities[item_id] = entity
+        return(entities)
+
+    def get_linking_item_ids(self, item_id):
+        return(self._run(self._get_linking_item_ids(item_id)))
+
+    async def _get_linking_item_ids(self, item_id):
+        entity = (await self._get_entities([item_id], "info"))[item_id]
+        linking_item_ids = []
+        params = {"action": "query", "list": "backlinks",
+                  "bltitle": entity["title"], "blnamespace": entity["ns"],
+                  "bllimit": "max"}
+        while True:
+            result = await self.client.request(params)
+            for backlink in result["query"]["backlinks"]:
+                linking_item_ids.append(backlink["title"].split(":")[-1])
+            if "continue" not in result:
+                return(linking_item_ids)
+            params.update(result["continue"])
+
+    def delete_item(self, item_id, reason):
+        entities = self.get_entities([item_id], "info")
+        if item_id not in entities:
+            raise WikibaseAPIError("missingtitle",
+                                   "{} does not exist".format(item_id))
+        self._run(self.client.write({"action": "delete",
+                                     "title": entities[item_id]["title"],
+                                     "reason": reason}))
+
+    def close(self):
+        self._run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
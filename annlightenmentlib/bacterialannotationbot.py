@@ -1,121 +1,329 @@
 from collections import defaultdict
 import csv
-import logging
+from functools import partial
 import pprint
 import pywikibot
-from pywikibot.data import api
 import sys
-import time
-from annlightenmentlib.gff3parser import Gff3Parser
+from annlightenmentlib.event_log import log_event
+from annlightenmentlib.feature_model import FeatureModel
+from annlightenmentlib.feature_store import FeatureStore
+from annlightenmentlib.item_inventory import ItemInventory
+from annlightenmentlib.metered_backend import MeteredBackend
+from annlightenmentlib.pywikibot_backend import PywikibotBackend
+from annlightenmentlib.run_context import RunContext
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_scheduler import UploadScheduler
+from annlightenmentlib.wiki_snapshot import WikiSnapshot, get_signature
 
 class BacterialAnnotationBot():
 
     def __init__(self, site, annotation_file, interaction_file, strain_id,
-                 databank):
+                 databank, label_cache=None, feature_model=None,
+                 upload_executor=None, backend=None, journal=None,
+                 sync=False, scheduler=None):
         self.annotation_file = annotation_file
+        self.feature_model = feature_model
         self.interaction_file = interaction_file
         self.strain_id = strain_id
         self.site = site
-        self.repo = self.site.data_repository()
+        if backend is None:
+            backend = PywikibotBackend(self.site.data_repository())
+        if upload_executor is None:
+            upload_executor = UploadExecutor(
+                put_throttle=pywikibot.config.put_throttle)
+        self.upload_executor = upload_executor
+        self.metrics = self.upload_executor.metrics
+        self.backend = MeteredBackend(backend, self.metrics)
         self.databank = databank
-        self.locus_tag_dict = defaultdict(dict)
-        self.id_locus_tag_dict = defaultdict(dict)
+        self.context = RunContext(self.backend, strain_id,
+                                  self._get_property_dict())
+        self.feature_store = FeatureStore()
+        self.id_locus_tag_dict = self.feature_store.id_locus_tag_dict
         self.number_of_uploaded_items = defaultdict(int)
+        self.item_inventory = None
+        self.label_cache = label_cache
+        if scheduler is None:
+            scheduler = UploadScheduler(self.upload_executor, journal)
+        self.scheduler = scheduler
+        self.requested_items = set()
+        self.sync = sync
+        self.wiki_snapshot = None
+        self.number_of_synced_items = defaultdict(int)
 
 
-    def _get_strain_name(self, strain_id):
-        strain_item = pywikibot.ItemPage(self.repo, strain_id) 
-        strain_item_dict = strain_item.get()
-        strain_label_en = strain_item_dict['labels']['en']
-        return(strain_label_en)
+    def _item_already_exists(self, key, item_name, item_description):
+        """Items that a resumed upload created in its earlier run do not
+        count as existing, their creation is replayed from the journal.
+        """
+        if self.scheduler.is_journaled(key):
+            return(False)
+        if (item_name, item_description) in self.requested_items:
+            return(True)
+        return(self._get_item_inventory().contains(item_name,
+                                                   item_description))
 
-    def _make_log_entry_no_transcript(self, ncRNA_name, targets_locus_tag):
-        timestr = time.strftime("%Y%m%d-%H_%M_%S")
-        logging.basicConfig(filename='ANNlightenment_' + timestr +
-                            '.log', level=logging.DEBUG)
-        logging.info("no matching transcript for ncRNA {} and targets locus "
-                     "tag {}".format(ncRNA_name, targets_locus_tag))
+    def _get_item_inventory(self):
+        if self.item_inventory is None:
+            self.item_inventory = self._load_item_inventory()
+        return(self.item_inventory)
 
-    
-    def _make_log_entry_interaction_exists(
-            self, method, ncRNA_ID, transcript_ID):
-        timestr = time.strftime("%Y%m%d-%H_%M_%S")
-        logging.basicConfig(filename='ANNlightenment_' + timestr +
-                            '.log', level=logging.DEBUG)
-        logging.info("interaction({}) between ncRNA {} and "
-                     "transcript {} already exists".format(
-                         method, ncRNA_ID, transcript_ID))
-                     
-    def _make_log_entry_create_interaction(
-            self, method, ncRNA_ID, transcript_ID):
-        timestr = time.strftime("%Y%m%d-%H_%M_%S")
-        logging.basicConfig(filename='ANNlightenment_' + timestr +
-                            '.log', level=logging.DEBUG)
-        logging.info("created interaction({}) between ncRNA {} and "
-                     "transcript {}".format(method, ncRNA_ID, transcript_ID))
-    
-    def _make_log_entry(self, item_type, new_item_id):
-        timestr = time.strftime("%Y%m%d-%H_%M_%S")
-        logging.basicConfig(filename='ANNlightenment_' + timestr +
-                            '.log', level=logging.DEBUG)
-        logging.info("created {} item with ID {}".format(item_type,
-                                                         new_item_id))
-    def _search_item_by_label(self, site, item_name):
-        all_results = []
-        last_continue = 0
-        params = { 'action' :'wbsearchentities' , 'format' : 'json' ,
-                   'language' : 'en', 'type' : 'item',
-                   'search': item_name}
-        while isinstance(last_continue, int):
-            params["continue"] = last_continue
-            request = api.Request(site=site,**params)
-            result = request.submit()
-            for item_entry in result['search']:
-                all_results.append(item_entry)
-            last_continue = result['search'
-            '-continue'] if "search-continue" in result else None
-        return(all_results)
-   
-    def _item_already_exists(self, name_entries, item_name, item_type,
-                             strain_name):
-        return_list = []        
-        if name_entries != []:
-            for list_item in name_entries:
-                if (list_item['label'] == item_name and
-                    list_item['description'] == "{} found in "
-                    "{}".format(item_type, strain_name)):
-                    return_list.append("yes")    
-                elif (list_item['label'] == item_name
-                      and list_item['description'] !="{} found in "
-                      "{}".format(item_type, strain_name)):
-                    return_list.append("yes, but different description")
-                else:
-                    return_list.append("no")
-        elif name_entries == []:
-            return_list.append("no")
-        if "yes" in return_list:
-            return("yes")
-        elif ("yes" not in return_list and
-              "no" not in return_list and
-              "yes, but different description" in return_list):
-            return("yes, but different description")
-        elif ("yes" not in return_list and
-              "no" in return_list):
-            return("no")
+    def _load_item_inventory(self):
+        """Fetch every item that is linked to the strain (found in taxon)
+        in bulk and index it by label. With a warm label cache only the
+        revision IDs of the cached items are checked against the wiki and
+        only new and changed items are read.
+        """
+        if self.sync:
+            item_inventory = ItemInventory()
+            for (label, description), item_id in (
+                    self._get_wiki_snapshot().item_ids.items()):
+                item_inventory.add(label, description, item_id)
+            return(item_inventory)
+        linked_item_ids = self._get_ids_of_items_linking_to(self.strain_id)
+        if (self.label_cache is not None and
+            self.label_cache.has_items(self.strain_id)):
+            self._verify_label_cache(linked_item_ids)
+            item_inventory = ItemInventory()
+            for item_id, label, description in self.label_cache.get_items(
+                    self.strain_id):
+                item_inventory.add(label, description, item_id)
+            print("found {} cached items linked to strain {}".format(
+                len(item_inventory), self.strain_id))
+            return(item_inventory)
+        item_inventory = ItemInventory()
+        item_rows = self._get_item_rows_of_strain(linked_item_ids)
+        for item_id, label, description, strain_id, revision_id in item_rows:
+            item_inventory.add(label, description, item_id)
+        if self.label_cache is not None:
+            self.label_cache.add_items(item_rows)
+        print("found {} items linked to strain {}".format(
+            len(item_inventory), self.strain_id))
+        return(item_inventory)
+
+    def _get_wiki_snapshot(self):
+        """Read all items of the strain with their statements in bulk."""
+        if self.wiki_snapshot is None:
+            property_dict = self.context.property_dict
+            self.wiki_snapshot = WikiSnapshot(self.context.strain_name)
+            for item_id, entity in self._get_entities(
+                    self._get_ids_of_items_linking_to(self.strain_id),
+                    "info|labels|descriptions|aliases|claims"):
+                if self.strain_id in self._get_claim_target_ids(
+                        entity, property_dict["found_in_taxon"]):
+                    self.wiki_snapshot.add_entity(item_id, entity)
+            print("sync: found {} items linked to strain {}".format(
+                len(self.wiki_snapshot), self.strain_id))
+        return(self.wiki_snapshot)
+
+    def _sync_existing_item(self, key, item_id, item_alias, claim_item_list,
+                            claim_string_list, existing_item_callback):
+        """Add the missing statements and alias to an existing item and
+        remove its stale statements of the same properties. The update is
+        journaled under its own key, so that the journal tells the items
+        the upload created from the items it only updated.
+        """
+        missing_claim_item_list = [
+            (claim, target) for claim, target in claim_item_list
+            if not self.wiki_snapshot.want(item_id,
+                                           get_signature(claim, target))]
+        missing_claim_string_list = [
+            (claim, target) for claim, target in claim_string_list
+            if not self.wiki_snapshot.want(item_id,
+                                           get_signature(claim, target))]
+        stale_statement_ids = self.wiki_snapshot.get_stale_statement_ids(
+            item_id, set(claim for claim, target in
+                         list(claim_item_list) + list(claim_string_list)))
+        if item_alias in self.wiki_snapshot.get_aliases(item_id):
+            item_alias = None
+        callback = partial(self._register_synced_item, existing_item_callback)
+        if (missing_claim_item_list == [] and
+            missing_claim_string_list == [] and
+            stale_statement_ids == [] and item_alias is None):
+            self.number_of_synced_items['unchanged'] += 1
+            callback(item_id)
+            self.scheduler.resolve(key, item_id)
+            return
+        self.number_of_synced_items['updated'] += 1
+        update_key = ("updated",) + key
+        self.scheduler.add_task(key, [update_key],
+                                partial(self.scheduler.resolve, key))
+        self.scheduler.submit(
+            update_key, item_id, self._update_existing_item,
+            (item_id, item_alias, missing_claim_item_list,
+             missing_claim_string_list, stale_statement_ids), callback)
+
+    def _register_synced_item(self, existing_item_callback, item_id):
+        if existing_item_callback is not None:
+            existing_item_callback(item_id)
+
+    def _update_existing_item(self, item_id, item_alias, claim_item_list,
+                              claim_string_list, stale_statement_ids):
+        claims = []
+        for claim, target in claim_item_list:
+            claims.append(self._get_statement_data(
+                self._get_item_snak_data(claim, target)))
+        for claim, target in claim_string_list:
+            claims.append(self._get_statement_data(
+                self._get_string_snak_data(claim, target)))
+        for statement_id in stale_statement_ids:
+            claims.append({'id': statement_id, 'remove': ''})
+        data = {'claims': claims}
+        if item_alias is not None:
+            data['aliases'] = {'en': [{'language': 'en', 'value': item_alias,
+                                       'add': ''}]}
+        self.upload_executor.write(
+            self.backend.edit_entity, item_id, data,
+            summary="Synchronising with a new ANNOgesic release.")
+        self._cache_revision_id(item_id)
+        print("updated item {}".format(item_id))
+        log_event("updated", item_id=item_id,
+                  statements=len(claim_item_list) + len(claim_string_list),
+                  removed_statements=len(stale_statement_ids))
+        return(item_id)
+
+    def _remove_stale_items_and_claims(self):
+        """Delete the items of the strain that the new release no longer
+        contains and remove the relation statements it no longer makes.
+        """
+        property_dict = self.context.property_dict
+        if self.upload_executor.failures != []:
+            print("sync: nothing is removed because {} uploads "
+                  "failed".format(len(self.upload_executor.failures)))
+            return
+        self.metrics.set_phase("sync cleanup")
+        relation_properties = set([
+            property_dict["encodes"], property_dict["encoded by"],
+            property_dict["part of"],
+            property_dict["physically interacts with"]])
+        for item_id in self.wiki_snapshot.get_unmatched_item_ids():
+            self.upload_executor.submit(
+                item_id, self._delete_item, (item_id,),
+                partial(self._count_synced_item, "deleted"))
+        for item_id in sorted(self.wiki_snapshot.matched_item_ids):
+            stale_statement_ids = self.wiki_snapshot.get_stale_statement_ids(
+                item_id, relation_properties)
+            if stale_statement_ids != []:
+                self.upload_executor.submit(
+                    item_id, self._update_existing_item,
+                    (item_id, None, [], [], stale_statement_ids),
+                    partial(self._count_synced_item, "cleaned"))
+        self.upload_executor.join()
+
+    def _count_synced_item(self, change, item_id):
+        self.number_of_synced_items[change] += 1
+
+    def _delete_item(self, item_id):
+        self.upload_executor.write(
+            self.backend.delete_item, item_id,
+            "not part of the new ANNOgesic release")
+        if self.label_cache is not None:
+            self.label_cache.remove_items([item_id])
+        print("deleted item {}".format(item_id))
+        log_event("deleted", item_id=item_id)
+        return(item_id)
+
+    def _is_synced_statement(self, item_id, signature):
+        """In a sync, record that the statement is wanted and return
+        whether the item already has it.
+        """
+        if not self.sync or self.wiki_snapshot is None:
+            return(False)
+        return(self.wiki_snapshot.want(item_id, signature))
+
+    def _get_item_rows_of_strain(self, item_ids):
+        """Return (item_id, label, description, strain_id, revision_id)
+        rows of those items whose found in taxon claim is the strain.
+        """
+        property_dict = self.context.property_dict
+        item_rows = []
+        for item_id, entity in self._get_entities(
+                item_ids, "info|labels|descriptions|claims"):
+            if self.strain_id not in self._get_claim_target_ids(
+                    entity, property_dict["found_in_taxon"]):
+                continue
+            label = entity.get('labels', {}).get('en', {}).get('value')
+            description = entity.get(
+                'descriptions', {}).get('en', {}).get('value')
+            if label is not None:
+                item_rows.append((item_id, label, description,
+                                  self.strain_id, entity.get('lastrevid')))
+        return(item_rows)
+
+    def _verify_label_cache(self, linked_item_ids):
+        """Compare the cached revision IDs of the strain's items with the
+        wiki. Items that no longer link to the strain are dropped, changed
+        items and items linked since the cache was filled are read.
+        """
+        cached_revision_ids = self.label_cache.get_revision_ids(
+            self.strain_id)
+        found_item_ids = set()
+        changed_item_ids = [item_id for item_id in linked_item_ids
+                            if item_id not in cached_revision_ids]
+        for item_id, entity in self._get_entities(
+                [item_id for item_id in linked_item_ids
+                 if item_id in cached_revision_ids], "info"):
+            found_item_ids.add(item_id)
+            if entity.get('lastrevid') != cached_revision_ids[item_id]:
+                changed_item_ids.append(item_id)
+        item_rows = self._get_item_rows_of_strain(changed_item_ids)
+        stale_item_ids = (
+            (set(cached_revision_ids) - found_item_ids) |
+            ((set(changed_item_ids) & set(cached_revision_ids)) -
+             set(row[0] for row in item_rows)))
+        self.label_cache.remove_items(stale_item_ids)
+        self.label_cache.add_items(item_rows)
+        print("label cache: {} items unchanged, {} read, {} "
+              "removed".format(
+                  len(found_item_ids) - len(changed_item_ids),
+                  len(item_rows), len(stale_item_ids)))
+
+    def _get_ids_of_items_linking_to(self, item_id):
+        return(self.backend.get_linking_item_ids(item_id))
+
+    def _get_entities(self, item_ids, props):
+        """Yield (ID, entity JSON) pairs of the existing items."""
+        entities = self.backend.get_entities(item_ids, props)
+        for item_id, entity in entities.items():
+            yield(item_id, entity)
+
+    def _get_claim_target_ids(self, entity, claim):
+        target_ids = []
+        for statement in entity.get('claims', {}).get(claim, []):
+            mainsnak = statement['mainsnak']
+            if mainsnak['snaktype'] != 'value':
+                continue
+            target_ids.append("Q{}".format(
+                mainsnak['datavalue']['value']['numeric-id']))
+        return(target_ids)
         
     def all_features(self):        
-        self.create_genes_products_and_claims()
-        self.create_relating_claims()
-        self.create_transcripts_and_claims()
-        self.create_transcripts_for_parentless_genes()
-        self.create_sRNA_interactions()
+        self.schedule_all_features()
+        self.scheduler.run()
+        self.finish_upload()
+        self.upload_executor.print_failures()
+        self.metrics.print_summary()
+
+    def schedule_all_features(self):
+        """Add the tasks of all phases to the scheduler without running
+        them, e.g. to run the tasks of several strains together.
+        """
+        self._schedule_genes_and_products()
+        self._schedule_relating_claims()
+        self._schedule_transcripts()
+        self._schedule_transcripts_for_parentless_genes()
+        self._schedule_sRNA_interactions()
+
+    def finish_upload(self):
+        """Clean up after the scheduled tasks have run."""
+        if self.sync:
+            self._remove_stale_items_and_claims()
         self.print_overview()
 
     def print_overview(self):
         sum_of_items = (sum(self.number_of_uploaded_items.values()) -
                         self.number_of_uploaded_items['interactions'])     
         print("ANNlightenment uploaded a total of {} "
-              "items".format(sum_of_items))
+              "items for strain {}".format(sum_of_items, self.strain_id))
         print(" {} genes, \n {} rRNAs, \n {} tRNAs, \n {} proteins, \n {} TSS,"
               "\n {} ncRNAs, \n {} transcripts derived from ANNOgesic \n "
               "{} transcripts derived from RefSeq and \n {} "
@@ -129,28 +337,67 @@ class BacterialAnnotationBot():
                   self.number_of_uploaded_items['transcripts_ANNOgesic'],
                   self.number_of_uploaded_items['transcripts_RefSeq'],
                   self.number_of_uploaded_items['interactions']))
+        if self.sync:
+            print("sync: {} items unchanged, {} updated, {} deleted, {} "
+                  "cleaned of stale claims".format(
+                      self.number_of_synced_items['unchanged'],
+                      self.number_of_synced_items['updated'],
+                      self.number_of_synced_items['deleted'],
+                      self.number_of_synced_items['cleaned']))
+        if self.scheduler.number_of_resumed_uploads > 0:
+            print("{} uploads of an earlier run were resumed from the "
+                  "journal".format(self.scheduler.number_of_resumed_uploads))
               
+    def _get_feature_model(self):
+        if self.feature_model is None:
+            self.feature_model = FeatureModel().read(self.annotation_file)
+        return(self.feature_model)
+
+    def _get_item_keys(self, row):
+        """Return the scheduler keys of the items created for an entry."""
+        if row.feature == "ncRNA":
+            return([("item", row), ("ncRNA gene", row)])
+        return([("item", row)])
+
+    def _get_child_item_key(self, row):
+        """Return the key of the item that is part of the transcripts of
+        a gene, TSS or ncRNA entry; for an ncRNA this is its gene item.
+        """
+        if row.feature == "ncRNA":
+            return(("ncRNA gene", row))
+        return(("item", row))
+
     def create_genes_products_and_claims(self):
-        with open(self.annotation_file) as csv_file: 
-            gff_parser = Gff3Parser()
-            gff_iterator = gff_parser.entries(csv_file)
-            for row in gff_iterator:
-                if row.feature == "gene":
-                    self._process_entry("gene", row)
-                elif row.feature == "CDS":
-                    self._process_entry("protein", row)
-                elif row.feature == "rRNA":
-                    self._process_entry("rRNA", row)
-                elif row.feature == "tRNA":
-                    self._process_entry("tRNA", row)
-                elif row.feature == "TSS":
-                    self._process_entry("transcription start site", row)
-                elif row.feature == "ncRNA":
-                    self._process_ncRNA_entry(row)
+        self._schedule_genes_and_products()
+        self.scheduler.run()
+
+    def _schedule_genes_and_products(self):
+        self.scheduler.phase = "genes and products"
+        feature_model = self._get_feature_model()
+        entry_types = {"gene": "gene", "CDS": "protein", "rRNA": "rRNA",
+                       "tRNA": "tRNA", "TSS": "transcription start site"}
+        for row in feature_model.entries_of(
+                ["gene", "CDS", "rRNA", "tRNA", "TSS", "ncRNA"]):
+            if row.feature == "ncRNA":
+                self.scheduler.add_task(
+                    ("item", row), [],
+                    partial(self._process_ncRNA_entry, row, "ncRNA"))
+                self.scheduler.add_task(
+                    ("ncRNA gene", row), [],
+                    partial(self._process_ncRNA_entry, row, "gene"))
+                self.scheduler.add_task(
+                    ("link", row), [("ncRNA gene", row), ("item", row)],
+                    partial(self._link_gene_and_product_if_created,
+                            ("link", row)))
+            else:
+                self.scheduler.add_task(
+                    ("item", row), [],
+                    partial(self._process_entry, entry_types[row.feature],
+                            row))
                         
     def _process_entry(self, entry_type, row):
-        property_dict = self._get_property_dict()
-        strain_name = self._get_strain_name(self.strain_id)
+        property_dict = self.context.property_dict
+        strain_name = self.context.strain_name
         genomic_start = row.start
         genomic_end = row.end
         if row.strand == "+":
@@ -178,14 +425,18 @@ class BacterialAnnotationBot():
             locus_tag = "NA"
             logging_expression = "TSS"
         self._create_gene_or_product_item_if_non_existent(
-            item_name, item_type, strain_name, item_description,
-            logging_expression, strand_direction, genomic_start, genomic_end,
-            locus_tag, parent, item_alias, entry_id)
+            ("item", row), item_name, item_type, strain_name,
+            item_description, logging_expression, strand_direction,
+            genomic_start, genomic_end, locus_tag, parent, item_alias,
+            entry_id)
         
         
-    def _process_ncRNA_entry(self, row):
-        property_dict = self._get_property_dict()
-        strain_name = self._get_strain_name(self.strain_id)
+    def _process_ncRNA_entry(self, row, logging_expression):
+        """Create the sRNA item (logging_expression "ncRNA") or the gene
+        item (logging_expression "gene") of an ncRNA entry.
+        """
+        property_dict = self.context.property_dict
+        strain_name = self.context.strain_name
         genomic_start = row.start
         genomic_end = row.end
         if row.strand == "+":
@@ -200,36 +451,25 @@ class BacterialAnnotationBot():
         else:
             parent = "NA"                    
         locus_tag = "NA"
-        item_type = "bacterial sRNA"
-        item_description = ("bacterial sRNA found in " +
-                            strain_name)
-        logging_expression = "ncRNA"
-        sRNA_ID = self._create_gene_or_product_item_if_non_existent(
-                        item_name, item_type, strain_name, item_description,
-                        logging_expression, strand_direction, genomic_start,
-                        genomic_end, locus_tag, parent, item_alias, entry_id)
-        g_item_type = "bacterial gene"
-        g_item_description = ("bacterial gene found in " + strain_name)
-        g_logging_expression = "gene"
-        gene_ID = self._create_gene_or_product_item_if_non_existent(
-                        item_name,
-                        g_item_type, strain_name, g_item_description,
-                        g_logging_expression, strand_direction, genomic_start,
-                        genomic_end, locus_tag, parent, item_alias, entry_id)
-        if sRNA_ID != None:
-            self._add_claim_item(gene_ID, property_dict["encodes"],
-                                 sRNA_ID)
-            self._add_claim_item(sRNA_ID,
-                                 property_dict["encoded by"],
-                                 gene_ID)
-            print("connected gene {} with product {}".format(
-                gene_ID, sRNA_ID))
+        if logging_expression == "ncRNA":
+            key = ("item", row)
+            item_type = "bacterial sRNA"
+            item_description = ("bacterial sRNA found in " +
+                                strain_name)
+        else:
+            key = ("ncRNA gene", row)
+            item_type = "bacterial gene"
+            item_description = ("bacterial gene found in " + strain_name)
+        self._create_gene_or_product_item_if_non_existent(
+                        key, item_name, item_type, strain_name,
+                        item_description, logging_expression,
+                        strand_direction, genomic_start, genomic_end,
+                        locus_tag, parent, item_alias, entry_id)
             
     def _create_gene_or_product_item_if_non_existent(
-            self, item_name, item_type, strain_name, item_description,
+            self, key, item_name, item_type, strain_name, item_description,
             logging_expression, strand_direction, genomic_start, genomic_end,
             locus_tag, parent, item_alias, entry_id):
-        name_entries = self._search_item_by_label(self.site, item_name)
         if "," in parent:
             parents = parent.split(',')
         elif parent == "NA":
@@ -238,430 +478,530 @@ class BacterialAnnotationBot():
         else:
             parents = []
             parents.append(parent)
-        if self._item_already_exists(name_entries, item_name,
-                                     item_type, strain_name) == "yes":
+        claim_item_list, claim_string_list = (
+            self._get_claims_for_new_item(
+                logging_expression, strand_direction, genomic_start,
+                genomic_end, locus_tag))
+        register_arguments = (logging_expression, locus_tag, parents,
+                              genomic_start, genomic_end, strand_direction,
+                              item_name, item_alias, entry_id)
+        self._create_item_if_non_existent(
+            key, item_name, item_description, item_alias, claim_item_list,
+            claim_string_list,
+            partial(self._register_new_gene_or_product_item,
+                    *register_arguments),
+            partial(self._register_gene_or_product_item,
+                    *register_arguments))
+
+    def _create_item_if_non_existent(
+            self, key, item_name, item_description, item_alias,
+            claim_item_list, claim_string_list, callback,
+            existing_item_callback=None):
+        """Submit the creation of an item unless it exists. In a sync an
+        existing item of the strain is brought up to date instead and
+        existing_item_callback is called with its ID.
+        """
+        if self.sync:
+            item_id = self._get_wiki_snapshot().get_item_id(
+                item_name, item_description)
+            if item_id is not None and self.wiki_snapshot.match(item_id):
+                self._sync_existing_item(
+                    key, item_id, item_alias, claim_item_list,
+                    claim_string_list, existing_item_callback)
+                return
+        if self._item_already_exists(key, item_name, item_description):
             print("item {} already exists".format(item_name))
-        elif (self._item_already_exists(name_entries, item_name,
-                                        item_type, strain_name) == "no" or
-              self._item_already_exists(name_entries, item_name,
-                                        item_type, strain_name) == ("yes, " 
-                                        "but different description")):
-            new_item_id = self._create_new_item(item_name, item_description)
-            self._make_log_entry(logging_expression, new_item_id)
-            if logging_expression in ["gene", "protein", "tRNA", "rRNA", "TSS"]:
-                self._write_to_id_locus_tag_dict(
-                    new_item_id, logging_expression, locus_tag, parents,
-                    genomic_start, genomic_end, strand_direction, item_name,
-                    entry_id)
-            elif logging_expression == "ncRNA":
-                self._write_sRNA_to_id_locus_tag_dict(
-                    new_item_id, logging_expression, locus_tag, parents,
-                    genomic_start, genomic_end, strand_direction, item_name,
-                    item_alias, entry_id)    
-            print("created {} item with ID {}".format(logging_expression,
-                                                      new_item_id))
-            if logging_expression == "gene":
-                self._add_claims_to_new_gene_item(
-                    new_item_id, strand_direction, genomic_start, genomic_end,
-                    locus_tag, item_alias)
-                self.number_of_uploaded_items['genes'] += 1
-            elif logging_expression == "rRNA":
-                self._add_claims_to_new_rRNA_item(new_item_id, item_alias)
-                self.number_of_uploaded_items['rRNAs'] += 1
-            elif logging_expression == "tRNA":
-                self._add_claims_to_new_tRNA_item(new_item_id, item_alias)
-                self.number_of_uploaded_items['tRNAs'] += 1
-            elif logging_expression == "protein":
-                self._add_claims_to_new_protein_item(
-                    new_item_id, locus_tag, item_alias)
-                self.number_of_uploaded_items['proteins'] += 1
-            elif logging_expression == "TSS":
-                self._add_claims_to_new_TSS_item(
-                    new_item_id, strand_direction, genomic_start, genomic_end,
-                    item_alias)
-                self.number_of_uploaded_items['TSS'] += 1
-            elif logging_expression == "ncRNA":
-                self._add_claims_to_new_sRNA_item(new_item_id, item_alias)
-                self.number_of_uploaded_items['ncRNAs'] += 1
-            return(new_item_id)
+            log_event("skipped", reason="item exists", label=item_name)
+            self.scheduler.resolve(key, None)
+            return
+        self.requested_items.add((item_name, item_description))
+        self.scheduler.submit(
+            key, item_name, self._create_new_item,
+            (item_name, item_description, item_alias, claim_item_list,
+             claim_string_list), callback)
+
+    def _register_gene_or_product_item(
+            self, logging_expression, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, item_alias, entry_id,
+            item_id):
+        if logging_expression in ["gene", "protein", "tRNA", "rRNA", "TSS"]:
+            self._write_to_id_locus_tag_dict(
+                item_id, logging_expression, locus_tag, parents,
+                genomic_start, genomic_end, strand_direction, item_name,
+                entry_id)
+        elif logging_expression == "ncRNA":
+            self._write_sRNA_to_id_locus_tag_dict(
+                item_id, logging_expression, locus_tag, parents,
+                genomic_start, genomic_end, strand_direction, item_name,
+                item_alias, entry_id)    
+
+    def _register_new_gene_or_product_item(
+            self, logging_expression, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, item_alias, entry_id,
+            new_item_id):
+        log_event("created", item_type=logging_expression,
+                  item_id=new_item_id)
+        self._register_gene_or_product_item(
+            logging_expression, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, item_alias, entry_id,
+            new_item_id)
+        print("created {} item with ID {}".format(logging_expression,
+                                                  new_item_id))
+        if logging_expression == "gene":
+            self.number_of_uploaded_items['genes'] += 1
+        elif logging_expression == "rRNA":
+            self.number_of_uploaded_items['rRNAs'] += 1
+        elif logging_expression == "tRNA":
+            self.number_of_uploaded_items['tRNAs'] += 1
+        elif logging_expression == "protein":
+            self.number_of_uploaded_items['proteins'] += 1
+        elif logging_expression == "TSS":
+            self.number_of_uploaded_items['TSS'] += 1
+        elif logging_expression == "ncRNA":
+            self.number_of_uploaded_items['ncRNAs'] += 1
                 
     def _write_to_id_locus_tag_dict(
             self, item_id, feature_type, locus_tag, parents, genomic_start,
             genomic_end, strand_direction, item_name, entry_id):
-        self.id_locus_tag_dict[item_id]['feature_type'] = feature_type
-        self.id_locus_tag_dict[item_id]['locus_tag'] = locus_tag                
-        self.id_locus_tag_dict[item_id]['parent'] = parents
-        self.id_locus_tag_dict[item_id]['genomic_start'] = genomic_start
-        self.id_locus_tag_dict[item_id]['genomic_end'] = genomic_end
-        self.id_locus_tag_dict[item_id]['strand_direction'] = strand_direction
-        self.id_locus_tag_dict[item_id]['item_name'] = item_name
-        self.id_locus_tag_dict[item_id]['entry_id'] = entry_id
+        self.feature_store.add(
+            item_id, feature_type, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, entry_id)
 
     def _write_sRNA_to_id_locus_tag_dict(
             self, item_id, feature_type, locus_tag, parents, genomic_start,
             genomic_end, strand_direction, item_name, item_alias, entry_id):
-        self.id_locus_tag_dict[item_id]['feature_type'] = feature_type
-        self.id_locus_tag_dict[item_id]['locus_tag'] = locus_tag                
-        self.id_locus_tag_dict[item_id]['parent'] = parents
-        self.id_locus_tag_dict[item_id]['genomic_start'] = genomic_start
-        self.id_locus_tag_dict[item_id]['genomic_end'] = genomic_end
-        self.id_locus_tag_dict[item_id]['strand_direction'] = strand_direction
-        self.id_locus_tag_dict[item_id]['item_name'] = item_name
-        self.id_locus_tag_dict[item_id]['item_alias'] = item_alias
-        self.id_locus_tag_dict[item_id]['entry_id'] = entry_id
+        self.feature_store.add(
+            item_id, feature_type, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, entry_id, item_alias)
         
-    def _add_claims_to_new_tRNA_item(self, new_item_id, item_alias):
-        property_dict = self._get_property_dict()
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] :
-                           property_dict["transfer RNA"]}
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        self._add_alias_to_new_item(new_item_id, item_alias)
+    def _get_claims_for_new_item(self, logging_expression, strand_direction,
+                                 genomic_start, genomic_end, locus_tag):
+        if logging_expression == "gene":
+            return(self._get_claims_for_new_gene_item(
+                strand_direction, genomic_start, genomic_end, locus_tag))
+        elif logging_expression == "rRNA":
+            return(self._get_claims_for_new_rRNA_item())
+        elif logging_expression == "tRNA":
+            return(self._get_claims_for_new_tRNA_item())
+        elif logging_expression == "protein":
+            return(self._get_claims_for_new_protein_item(locus_tag))
+        elif logging_expression == "TSS":
+            return(self._get_claims_for_new_TSS_item(
+                strand_direction, genomic_start, genomic_end))
+        elif logging_expression == "ncRNA":
+            return(self._get_claims_for_new_sRNA_item())
+
+    def _get_claims_for_new_tRNA_item(self):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"],
+                            property_dict["transfer RNA"])]
+        return(claim_item_list, [])
                 
-    def _add_claims_to_new_rRNA_item(self, new_item_id, item_alias):
-        property_dict = self._get_property_dict()
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] :
-                           property_dict["ribosomal RNA"]}
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)    
-        self._add_alias_to_new_item(new_item_id, item_alias)
-
-    def _add_claims_to_new_gene_item(
-            self, new_item_id, strand_direction, genomic_start, genomic_end,
-            locus_tag, item_alias):
-        property_dict = self._get_property_dict()
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] : property_dict["DNA"],
-                           property_dict["strand_orientation"] :
-                           strand_direction}
-        claim_string_dict = {property_dict["genomic_start"] :
-                             str(genomic_start),
-                             property_dict["genomic_end"] :
-                             str(genomic_end), property_dict["NCBI Locus tag"] :
-                             locus_tag}
-        additional_item_dict = {property_dict["instance_of"] :
-                                property_dict["gene"]}                    
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        for claim, target in additional_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)                    
-        for claim, target in claim_string_dict.items():
-            self._add_claim_string(new_item_id, claim, target) 
-        self._add_alias_to_new_item(new_item_id, item_alias)
-
-    def _add_claims_to_new_protein_item(self, new_item_id, locus_tag,
-                                        item_alias):
-        property_dict = self._get_property_dict()
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] :
-                           property_dict["protein"]}
-        claim_string_dict = {property_dict["NCBI Locus tag"] : locus_tag}      
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)              
-        for claim, target in claim_string_dict.items():
-            self._add_claim_string(new_item_id, claim, target)
-        self._add_alias_to_new_item(new_item_id, item_alias)
-
-    def _add_claims_to_new_TSS_item(self, new_item_id, strand_direction,
-                                    genomic_start, genomic_end, item_alias):
-        property_dict = self._get_property_dict()       
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] : property_dict["DNA"],
-                           property_dict["strand_orientation"] :
-                           strand_direction}
-        claim_string_dict = {property_dict["genomic_start"] :
-                             str(genomic_start),
-                             property_dict["genomic_end"] :
-                             str(genomic_end)}
-        claim_additional_item_dict = {property_dict["instance_of"] :
-                                      property_dict["TSS"]}                    
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        for claim, target in claim_additional_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)                    
-        for claim, target in claim_string_dict.items():
-            self._add_claim_string(new_item_id, claim, target)
-        self._add_alias_to_new_item(new_item_id, item_alias)
-
-    def _add_claims_to_new_sRNA_item(self, new_item_id, item_alias):
-        property_dict = self._get_property_dict()
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] : property_dict["RNA"]}
-        additional_item_dict = {property_dict["instance_of"] :
-                                property_dict["small_RNA"]}                    
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        for claim, target in additional_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        self._add_alias_to_new_item(new_item_id, item_alias)
+    def _get_claims_for_new_rRNA_item(self):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"],
+                            property_dict["ribosomal RNA"])]
+        return(claim_item_list, [])
+
+    def _get_claims_for_new_gene_item(
+            self, strand_direction, genomic_start, genomic_end, locus_tag):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"], property_dict["DNA"]),
+                           (property_dict["strand_orientation"],
+                            strand_direction),
+                           (property_dict["instance_of"],
+                            property_dict["gene"])]
+        claim_string_list = [(property_dict["genomic_start"],
+                              str(genomic_start)),
+                             (property_dict["genomic_end"], str(genomic_end)),
+                             (property_dict["NCBI Locus tag"], locus_tag)]
+        return(claim_item_list, claim_string_list)
+
+    def _get_claims_for_new_protein_item(self, locus_tag):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"],
+                            property_dict["protein"])]
+        claim_string_list = [(property_dict["NCBI Locus tag"], locus_tag)]
+        return(claim_item_list, claim_string_list)
+
+    def _get_claims_for_new_TSS_item(self, strand_direction, genomic_start,
+                                     genomic_end):
+        property_dict = self.context.property_dict       
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"], property_dict["DNA"]),
+                           (property_dict["strand_orientation"],
+                            strand_direction),
+                           (property_dict["instance_of"],
+                            property_dict["TSS"])]
+        claim_string_list = [(property_dict["genomic_start"],
+                              str(genomic_start)),
+                             (property_dict["genomic_end"], str(genomic_end))]
+        return(claim_item_list, claim_string_list)
+
+    def _get_claims_for_new_sRNA_item(self):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"], property_dict["RNA"]),
+                           (property_dict["instance_of"],
+                            property_dict["small_RNA"])]
+        return(claim_item_list, [])
             
-    def _add_alias_to_new_item(self, new_item_id, item_alias):
-        alias = item_alias
-        new_item = pywikibot.ItemPage(self.repo, new_item_id)
-        newalias = {"en": [alias]}
-        new_item.editAliases(newalias, summary="Setting new aliases.")
-                
     def create_relating_claims(self):
-        matching_IDs = self._get_matching_IDs_dict()
-        property_dict = self._get_property_dict()
-        for gene_ID, product_IDs in matching_IDs.items():
-            for product_ID in product_IDs:
-                self._add_claim_item(gene_ID, property_dict["encodes"],
-                                     product_ID)
-                self._add_claim_item(product_ID, property_dict["encoded by"],
-                                 gene_ID)
-                print("connected gene {} with product {}".format(gene_ID,
-                                                                 product_ID)) 
+        self._schedule_relating_claims()
+        self.scheduler.run()
+
+    def _schedule_relating_claims(self):
+        """Link every gene with the products of its locus tag as soon as
+        both items exist.
+        """
+        self.scheduler.phase = "relating claims"
+        locus_tag_dict = defaultdict(lambda: {"genes": [], "products": []})
+        for row in self._get_feature_model().entries_of(
+                ["gene", "CDS", "rRNA", "tRNA"]):
+            locus_tag = row.attributes['locus_tag']
+            if locus_tag == "NA":
+                continue
+            if row.feature == "gene":
+                locus_tag_dict[locus_tag]["genes"].append(row)
+            else:
+                locus_tag_dict[locus_tag]["products"].append(row)
+        for locus_tag_entry in locus_tag_dict.values():
+            for gene_row in locus_tag_entry["genes"]:
+                for product_row in locus_tag_entry["products"]:
+                    key = ("link", gene_row, product_row)
+                    self.scheduler.add_task(
+                        key, [("item", gene_row), ("item", product_row)],
+                        partial(self._link_gene_and_product_if_created, key))
+
+    def _link_gene_and_product_if_created(self, key, gene_ID, product_ID):
+        if gene_ID is None or product_ID is None:
+            self.scheduler.resolve(key, None)
+            return
+        self.scheduler.submit(key, product_ID, self._link_gene_and_product,
+                              (gene_ID, product_ID))
+
+    def _link_gene_and_product(self, gene_ID, product_ID):
+        property_dict = self.context.property_dict
+        self._add_claim_item(gene_ID, property_dict["encodes"],
+                             product_ID)
+        self._add_claim_item(product_ID, property_dict["encoded by"],
+                             gene_ID)
+        print("connected gene {} with product {}".format(gene_ID,
+                                                         product_ID)) 
+        log_event("linked", relation="encodes", item_id=gene_ID,
+                  target_id=product_ID)
             
-    def _get_matching_IDs_dict(self):
-        id_locus_tag_dict = self.id_locus_tag_dict
-        matching_IDs = {}
-        for item in id_locus_tag_dict.items():
-            if (item[1]["feature_type"] == "gene" and
-                item[1]["locus_tag"] != "NA"):
-                cds_list = []
-                for item2 in id_locus_tag_dict.items():
-                    if (item2[1]["locus_tag"] != "NA" and
-                        item2[1]["feature_type"] in ["protein", "rRNA", "tRNA"]): 
-                        if (item2[1]["locus_tag"] == item[1]["locus_tag"] and
-                            item2[0] != item[0]):
-                            cds_list.append(item2[0])
-                matching_IDs[item[0]] = cds_list
-        return(matching_IDs)
     def create_transcripts_and_claims(self):
-        strain_name = self._get_strain_name(self.strain_id)
-        property_dict = self._get_property_dict()
-        with open(self.annotation_file) as gff: 
-            gff_parser = Gff3Parser()
-            gff_iterator = gff_parser.entries(gff)
-            for row in gff_iterator:
-                genomic_start = row.start
-                genomic_end = row.end
-                if row.strand == "+":
-                    strand_direction = property_dict["Forward_Strand"]
-                elif row.strand == "-":
-                    strand_direction = property_dict["Reverse_Strand"]
-                if row.feature == "transcript":
-                    locus_tag = "NA"
-                    item_type = "bacterial transcript" 
-                    item_description = ("bacterial transcript found in " +
-                                        strain_name)
-                    item_name = (strain_name + " " + row.attributes['ID'] +
-                                 " " + str(row.start) + " " + str(row.end))
-                    item_alias = row.attributes['Name']
-                    logging_expression = "transcript"
-                    ID = row.attributes['ID']
-                    new_item_id = self._create_transcript_item_if_non_existent(
-                        item_name, item_type, strain_name, item_description,
-                        logging_expression, strand_direction, genomic_start,
-                        genomic_end, ID)
-                    determination_method = "ANNOgesic"
-                    if new_item_id != None:
-                        self._add_claims_to_new_transcript_item(new_item_id,
-                            strand_direction, genomic_start, genomic_end,
-                            determination_method, item_alias) 
+        self._schedule_transcripts()
+        self.scheduler.run()
+
+    def _schedule_transcripts(self):
+        """Create each transcript once its gene and TSS children exist and
+        add the part of claims of a child once all its transcripts exist.
+        """
+        self.scheduler.phase = "transcripts"
+        feature_model = self._get_feature_model()
+        transcript_keys = defaultdict(list)
+        for row in feature_model.entries_of(["transcript"]):
+            children_keys = [
+                self._get_child_item_key(child)
+                for child in feature_model.get_children(row.attributes['ID'])
+                if child.feature in ["gene", "TSS", "ncRNA"]]
+            self.scheduler.add_task(
+                ("transcript", row), children_keys,
+                partial(self._process_transcript_entry, row))
+            transcript_keys[row.attributes['ID']].append(("transcript", row))
+        for child in feature_model.entries_of(["gene", "TSS", "ncRNA"]):
+            child_key = self._get_child_item_key(child)
+            parent_transcript_keys = [
+                transcript_key
+                for parent in feature_model.get_parents(child)
+                for transcript_key in transcript_keys.get(parent, [])]
+            if parent_transcript_keys != []:
+                self.scheduler.add_task(
+                    ("part of", child_key),
+                    [child_key] + parent_transcript_keys,
+                    partial(self._add_part_of_claims, ("part of", child_key)))
+
+    def _process_transcript_entry(self, row, *children_IDs):
+        strain_name = self.context.strain_name
+        property_dict = self.context.property_dict
+        genomic_start = row.start
+        genomic_end = row.end
+        if row.strand == "+":
+            strand_direction = property_dict["Forward_Strand"]
+        elif row.strand == "-":
+            strand_direction = property_dict["Reverse_Strand"]
+        item_type = "bacterial transcript" 
+        item_description = ("bacterial transcript found in " +
+                            strain_name)
+        item_name = (strain_name + " " + row.attributes['ID'] +
+                     " " + str(row.start) + " " + str(row.end))
+        item_alias = row.attributes['Name']
+        logging_expression = "transcript"
+        determination_method = "ANNOgesic"
+        self._create_transcript_item_if_non_existent(
+            ("transcript", row), item_name, item_type, strain_name,
+            item_description, logging_expression, strand_direction,
+            genomic_start, genomic_end,
+            [child_ID for child_ID in children_IDs if child_ID is not None],
+            determination_method, item_alias)
                     
     def _create_transcript_item_if_non_existent(
-            self, item_name, item_type, strain_name, item_description,
+            self, key, item_name, item_type, strain_name, item_description,
             logging_expression, strand_direction, genomic_start, genomic_end,
-            ID):
-        property_dict = self._get_property_dict()
-        name_entries = self._search_item_by_label(self.site, item_name)
-        new_item_id = None
-        if self._item_already_exists(name_entries, item_name,
-                                     item_type, strain_name) == "yes":
-            print("item {} already exists".format(item_name))
-        elif (self._item_already_exists(name_entries, item_name,
-                                        item_type, strain_name) == "no" or
-              self._item_already_exists(name_entries, item_name,
-                                        item_type, strain_name) == ("yes, " 
-                                        "but different description")):
-            new_item_id = self._create_new_item(item_name, item_description)
-            self._make_log_entry(logging_expression, new_item_id)
-            print("created {} item with ID {}".format(logging_expression,
-                                                      new_item_id))
-            for child_ID in self._get_transcript_children(ID):
-                self._add_claim_item(new_item_id, property_dict["has part"],
-                                     child_ID)
-                self._add_claim_item(child_ID, property_dict["part of"],
-                                     new_item_id)
-                print("created has part/part of connection "
-                      "between {} and {}".format(new_item_id, child_ID))
-        return(new_item_id)
+            children_IDs, determination_method, item_alias):
+        property_dict = self.context.property_dict
+        claim_item_list, claim_string_list = (
+            self._get_claims_for_new_transcript_item(
+                strand_direction, genomic_start, genomic_end,
+                determination_method))
+        for child_ID in children_IDs:
+            claim_item_list.append((property_dict["has part"], child_ID))
+        self._create_item_if_non_existent(
+            key, item_name, item_description, item_alias,
+            claim_item_list, claim_string_list,
+            partial(self._register_new_transcript_item,
+                    determination_method))
+
+    def _register_new_transcript_item(self, determination_method,
+                                      new_item_id):
+        self._count_new_transcript_item(determination_method)
+        log_event("created", item_type="transcript", item_id=new_item_id)
+        print("created transcript item with ID {}".format(new_item_id))
                 
-    def _add_claims_to_new_transcript_item(self, new_item_id, strand_direction,
-                                           genomic_start, genomic_end,
-                                           determination_method, item_alias):
-        property_dict = self._get_property_dict()
+    def _get_claims_for_new_transcript_item(self, strand_direction,
+                                            genomic_start, genomic_end,
+                                            determination_method):
+        property_dict = self.context.property_dict
+        claim_item_list = [(property_dict["found_in_taxon"], self.strain_id),
+                           (property_dict["instance_of"], property_dict["RNA"]),
+                           (property_dict["strand_orientation"],
+                            strand_direction),
+                           (property_dict["determination method"],
+                            property_dict[determination_method]),
+                           (property_dict["instance_of"],
+                            property_dict["transcript"])]
+        claim_string_list = [(property_dict["genomic_start"],
+                              str(genomic_start)),
+                             (property_dict["genomic_end"], str(genomic_end))]
+        return(claim_item_list, claim_string_list)
+
+    def _count_new_transcript_item(self, determination_method):
         if determination_method == "ANNOgesic":
-            determination_method = property_dict["ANNOgesic"]
             self.number_of_uploaded_items['transcripts_ANNOgesic'] += 1
         elif determination_method == "RefSeq":
-            determination_method = property_dict["RefSeq"]
             self.number_of_uploaded_items['transcripts_RefSeq'] += 1
-        claim_item_dict = {property_dict["found_in_taxon"] : self.strain_id,
-                           property_dict["instance_of"] : property_dict["RNA"],
-                           property_dict["strand_orientation"] :
-                           strand_direction,
-                           property_dict["determination method"] :
-                           determination_method}
-        claim_string_dict = {property_dict["genomic_start"] :
-                             str(genomic_start),
-                             property_dict["genomic_end"] : str(genomic_end)}
-        additional_claim_item_dict = {property_dict["instance_of"] :
-                                      property_dict["transcript"]}
-        for claim, target in claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)            
-        for claim, target in claim_string_dict.items():
-            self._add_claim_string(new_item_id, claim, target)
-        for claim, target in additional_claim_item_dict.items():
-            self._add_claim_item(new_item_id, claim, target)
-        self._add_alias_to_new_item(new_item_id, item_alias)
                 
-    def _get_transcript_children(self, ID):
-        id_locus_tag_dict = self.id_locus_tag_dict
-        IDs_of_children = []
-        for item in id_locus_tag_dict.items():
-            if (item[1]["feature_type"] == "gene" or
-                item[1]["feature_type"] == "TSS"):
-                if "parent" in item[1]:                   
-                    for prnt in item[1]["parent"]:
-                        if prnt == ID:
-                            IDs_of_children.append(item[0])
-        print("these are the children of the transcript {}".format(
-            IDs_of_children))
-        return(IDs_of_children)
+    def _add_part_of_claims(self, key, child_ID, *transcript_IDs):
+        """Add the part of claims to all transcripts of a child item with
+        one edit.
+        """
+        property_dict = self.context.property_dict
+        transcript_IDs = [transcript_ID for transcript_ID in transcript_IDs
+                          if transcript_ID is not None]
+        if child_ID is None or transcript_IDs == []:
+            self.scheduler.resolve(key, None)
+            return
+        self.scheduler.submit(
+            key, child_ID, self._add_claims_to_existing_item,
+            (child_ID, [(property_dict["part of"], transcript_ID)
+                        for transcript_ID in transcript_IDs]),
+            partial(self._register_part_of_links, child_ID, transcript_IDs))
+
+    def _register_part_of_links(self, child_ID, transcript_IDs, result):
+        for transcript_ID in transcript_IDs:
+            self.feature_store.add_part_of_link(child_ID, transcript_ID)
+            print("created has part/part of connection "
+                  "between {} and {}".format(transcript_ID, child_ID))
+            log_event("linked", relation="part of", item_id=child_ID,
+                      target_id=transcript_ID)
     
     def create_transcripts_for_parentless_genes(self):
-        property_dict = self._get_property_dict()
-        strain_name = self._get_strain_name(self.strain_id)
-        id_locus_tag_dict = self.id_locus_tag_dict
+        self._schedule_transcripts_for_parentless_genes()
+        self.scheduler.run()
+
+    def _schedule_transcripts_for_parentless_genes(self):
+        """Create a RefSeq transcript for every new item without parent."""
+        self.scheduler.phase = "transcripts for parentless genes"
+        for row in self._get_feature_model().entries_of(
+                ["gene", "CDS", "rRNA", "tRNA", "TSS", "ncRNA"]):
+            if "Parent" in row.attributes:
+                continue
+            for item_key in self._get_item_keys(row):
+                transcript_key = ("RefSeq transcript", item_key)
+                self.scheduler.add_task(
+                    transcript_key, [item_key],
+                    partial(self._create_transcript_for_parentless_item,
+                            transcript_key))
+                self.scheduler.add_task(
+                    ("part of", item_key), [item_key, transcript_key],
+                    partial(self._add_part_of_claims, ("part of", item_key)))
+
+    def _create_transcript_for_parentless_item(self, key, item_id):
+        if item_id is None:
+            self.scheduler.resolve(key, None)
+            return
+        property_dict = self.context.property_dict
+        strain_name = self.context.strain_name
+        feature = self.id_locus_tag_dict[item_id]
         item_description = "bacterial transcript found in " + strain_name
         determination_method = "RefSeq"
-        item_type = "bacterial transcript"
-        for item in id_locus_tag_dict.items():
-            if item[1]["parent"][0] == "NA":
-                item_name = (strain_name + " " "transcript" + " " +
-                             str(item[1]["genomic_start"]) +
-                             " " + str(item[1]["genomic_end"]))
-                item_alias = "transcript by RefSeq"
-                name_entries = self._search_item_by_label(self.site, item_name)
-                if self._item_already_exists(name_entries, item_name,
-                                             item_type, strain_name) == "yes":
-                    print("item {} already exists".format(item_name))           
-                elif (self._item_already_exists(name_entries, item_name,
-                                                item_type, strain_name) == "no"
-                      or self._item_already_exists(name_entries, item_name,
-                                                   item_type, strain_name) ==
-                      "yes, but different description"):
-                    new_transcript_id = self._create_new_item(item_name,
-                                                              item_description)
-                    print("created transcript item with ID {}".format(
-                        new_transcript_id))                    
-                    self._make_log_entry("transcript", new_transcript_id)
-                    self._add_claims_to_new_transcript_item(new_transcript_id,
-                        item[1]["strand_direction"], item[1]["genomic_start"],
-                        item[1]["genomic_end"], determination_method,
-                        item_alias)
-                    self._add_claim_item(new_transcript_id,
-                                         property_dict["has part"],
-                                         item[0])
-                    self._add_claim_item(item[0], property_dict["part of"],
-                                         new_transcript_id)
-                    print("created has part/part of connection "
-                          "between {} and {}".format(new_transcript_id,
-                                                     item[0]))
+        item_name = (strain_name + " " "transcript" + " " +
+                     str(feature["genomic_start"]) +
+                     " " + str(feature["genomic_end"]))
+        item_alias = "transcript by RefSeq"
+        claim_item_list, claim_string_list = (
+            self._get_claims_for_new_transcript_item(
+                feature["strand_direction"],
+                feature["genomic_start"], feature["genomic_end"],
+                determination_method))
+        claim_item_list.append((property_dict["has part"], item_id))
+        self._create_item_if_non_existent(
+            key, item_name, item_description, item_alias,
+            claim_item_list, claim_string_list,
+            partial(self._register_new_transcript_item,
+                    determination_method))
 
     def create_sRNA_interactions(self):
-        property_dict = self._get_property_dict()
-        id_locus_tag_dict = self.id_locus_tag_dict
-        strain_name = self._get_strain_name(self.strain_id)
+        self._schedule_sRNA_interactions()
+        self.scheduler.run()
+
+    def _schedule_sRNA_interactions(self):
+        """Add the interactions of each row of the interaction file once
+        the sRNA, the target genes and their part of links exist.
+        """
+        self.scheduler.phase = "sRNA interactions"
+        ncRNA_keys = defaultdict(list)
+        gene_keys = defaultdict(list)
+        for row in self._get_feature_model().entries_of(["gene", "ncRNA"]):
+            if row.feature == "ncRNA":
+                ncRNA_keys[(row.attributes['Name'], str(row.start),
+                            str(row.end))].append(("item", row))
+            else:
+                gene_key = ("item", row)
+                gene_keys[(row.attributes['locus_tag'],
+                           row.attributes['ID'])].append(gene_key)
+                if self.scheduler.has_task(("part of", gene_key)):
+                    gene_keys[(row.attributes['locus_tag'],
+                               row.attributes['ID'])].append(
+                                   ("part of", gene_key))
+        row_keys = []
         with open(self.interaction_file) as csvfile:
             sRNA_interactions_dict = csv.DictReader(csvfile, delimiter="\t")
-            for row in sRNA_interactions_dict:
+            for row_number, row in enumerate(sRNA_interactions_dict):
                 specs = self._process_interactions_row(row)
-                if (self._get_matching_transcripts(specs["sRNA_name"],
-                                                   specs["targets_locus_tag"],
-                                                   specs["sRNA_start_pos"],
-                                                   specs["sRNA_end_pos"],
-                                                   specs["entry_id"]) == (
-                                                       None)):
-                    print("no matching transcripts")
-                    self._make_log_entry_no_transcript(
-                        specs["sRNA_name"], specs["targets_locus_tag"])
-                    continue
-                sRNA_item_id, matching_transcript_IDs = (
-                    self._get_matching_transcripts(specs["sRNA_name"],
-                                                   specs["targets_locus_tag"],
-                                                   specs["sRNA_start_pos"],
-                                                   specs["sRNA_end_pos"],
-                                                   specs["entry_id"]))
-                specs = self._process_interactions_row(row)
-                
-                for transcript_ID in matching_transcript_IDs:
-                    try:
-                        self._add_claim_item_qualifier(
-                            sRNA_item_id, specs["claim"], transcript_ID,
-                            specs["quali_start"],
-                            specs["start_pos_sRNA_plex"],
-                            specs["quali_end"], specs["end_pos_sRNA_plex"],
-                            specs["quali_method"], property_dict["RNAplex"])
-                        self._add_claim_item_qualifier(
-                            transcript_ID, specs["claim"], sRNA_item_id,
-                            specs["quali_start"],
-                            specs["start_pos_target_plex"],
-                            specs["quali_end"],
-                            specs["end_pos_target_plex"],
-                            specs["quali_method"],
-                            property_dict["RNAplex"])
-                        print("created interaction (RNAplex) between "
-                              "sRNA {} "
-                              "and transcript {}".format(sRNA_item_id,
-                                                         transcript_ID))
-                        self._make_log_entry_create_interaction(
-                            "plex", sRNA_item_id, transcript_ID)
-                    except:
-                        print("interaction (RNAplex) between sRNA {} "
-                              "and transcript {} already exists".format(
-                                  sRNA_item_id, transcript_ID))
-                        self._make_log_entry_interaction_exists(
-                            "plex", sRNA_item_id, transcript_ID)
-
-                    try:
-                        self._add_claim_item_qualifier(
-                            sRNA_item_id, specs["claim"],
-                            transcript_ID, specs["quali_start"],
-                            specs["start_pos_sRNA_up"],
-                            specs["quali_end"],
-                            specs["end_pos_sRNA_up"],
-                            specs["quali_method"],
-                            property_dict["RNAup"])
-                        self._add_claim_item_qualifier(
-                            transcript_ID, specs["claim"],
-                            sRNA_item_id, specs["quali_start"],
-                            specs["start_pos_target_up"],
-                            specs["quali_end"],
-                            specs["end_pos_target_up"],
-                            specs["quali_method"],
-                            property_dict["RNAup"])
-                        print("created interaction (RNAup) between "
-                              "sRNA {} and transcript {}".format(
-                                  sRNA_item_id, transcript_ID))
-                        self._make_log_entry_create_interaction(
-                            "up", sRNA_item_id, transcript_ID)
-                        self.number_of_uploaded_items[
-                            'interactions'] += 1
-                    except:
-                        print("interaction (RNAup) between sRNA {} "
-                              "and transcript {} already exists".format(
-                                  sRNA_item_id, transcript_ID))
-                        self._make_log_entry_interaction_exists(
-                            "up", sRNA_item_id, transcript_ID)
+                row_key = ("interactions", row_number)
+                self.scheduler.add_task(
+                    row_key,
+                    ncRNA_keys.get((specs["sRNA_name"],
+                                    specs["sRNA_start_pos"],
+                                    specs["sRNA_end_pos"]), []) +
+                    gene_keys.get((specs["targets_locus_tag"],
+                                   specs["entry_id"]), []),
+                    partial(self._resolve_interactions_of_row, row_key,
+                            specs))
+                row_keys.append(row_key)
+        self.scheduler.add_task(("interaction edits",), row_keys,
+                                self._add_interactions)
+
+    def _resolve_interactions_of_row(self, key, specs, *item_ids):
+        """Resolve the key of a row with its sRNA, the transcripts of its
+        target and its specs.
+        """
+        matching_transcripts = self._get_matching_transcripts(
+            specs["sRNA_name"], specs["targets_locus_tag"],
+            specs["sRNA_start_pos"], specs["sRNA_end_pos"],
+            specs["entry_id"])
+        if matching_transcripts is None:
+            print("no matching transcripts")
+            log_event("skipped", reason="no matching transcript",
+                      ncRNA=specs["sRNA_name"],
+                      targets_locus_tag=specs["targets_locus_tag"])
+            self.scheduler.resolve(key, None)
+            return
+        sRNA_item_id, matching_transcript_IDs = matching_transcripts
+        self.scheduler.resolve(key, (sRNA_item_id, matching_transcript_IDs,
+                                     specs))
+
+    def _add_interactions(self, *interactions_of_rows):
+        """Group the interactions of all rows by item and add all
+        interaction statements of an item, RNAplex and RNAup in both
+        directions, with one edit.
+        """
+        property_dict = self.context.property_dict
+        interactions = defaultdict(dict)
+        interacting_transcripts = defaultdict(set)
+        for interactions_of_row in interactions_of_rows:
+            if interactions_of_row is None:
+                continue
+            sRNA_item_id, transcript_IDs, specs = interactions_of_row
+            for transcript_ID in transcript_IDs:
+                interacting_transcripts[sRNA_item_id].add(transcript_ID)
+                for method in ["plex", "up"]:
+                    method_ID = property_dict["RNA" + method]
+                    # a dictionary drops interactions of repeated rows
+                    interactions[sRNA_item_id][(
+                        transcript_ID, specs["start_pos_sRNA_" + method],
+                        specs["end_pos_sRNA_" + method], method_ID)] = None
+                    interactions[transcript_ID][(
+                        sRNA_item_id, specs["start_pos_target_" + method],
+                        specs["end_pos_target_" + method], method_ID)] = None
+        for item_id, item_interactions in interactions.items():
+            self.scheduler.submit(
+                ("interaction", item_id), item_id,
+                self._add_interaction_claims,
+                (item_id, list(item_interactions)),
+                partial(self._count_interactions,
+                        len(interacting_transcripts.get(item_id, []))))
+        self.scheduler.resolve(("interaction edits",), None)
+
+    def _add_interaction_claims(self, item_id, interactions):
+        """Add physically interacts with statements with start, end and
+        method qualifiers to an item in one wbeditentity call and return
+        their number.
+        """
+        property_dict = self.context.property_dict
+        claim = property_dict["physically interacts with"]
+        data = {'claims': []}
+        for target, start, end, method in interactions:
+            if self._is_synced_statement(item_id, get_signature(
+                    claim, target, [(property_dict["genomic_start"], start),
+                                    (property_dict["genomic_end"], end),
+                                    (property_dict["determination method"],
+                                     method)])):
+                continue
+            data['claims'].append(self._get_statement_data(
+                self._get_item_snak_data(claim, target),
+                [self._get_string_snak_data(property_dict["genomic_start"],
+                                            start),
+                 self._get_string_snak_data(property_dict["genomic_end"],
+                                            end),
+                 self._get_item_snak_data(
+                     property_dict["determination method"], method)]))
+            log_event("linked", relation="physically interacts with",
+                      method=method, item_id=item_id, target_id=target)
+        if data['claims'] == []:
+            return(0)
+        self.upload_executor.write(self.backend.edit_entity, item_id, data,
+                                   summary="Adding sRNA interactions.")
+        self._cache_revision_id(item_id)
+        print("created {} interactions of item {}".format(
+            len(data['claims']), item_id))
+        return(len(data['claims']))
+
+    def _count_interactions(self, number_of_interacting_transcripts,
+                            number_of_statements):
+        if number_of_statements > 0:
+            self.number_of_uploaded_items['interactions'] += (
+                number_of_interacting_transcripts)
                         
     def _process_interactions_row(self, row):
-        property_dict = self._get_property_dict()
+        property_dict = self.context.property_dict
         both_genome_positions_plex = row['sRNA_interacted_position_RNAplex']
         genome_pos_list_plex = both_genome_positions_plex.split("-")
         both_target_positions_plex = row['target_interacted_position_RNAplex']
@@ -701,142 +1041,74 @@ class BacterialAnnotationBot():
     def _get_matching_transcripts(self, sRNA_name, targets_locus_tag,
                                   sRNA_start_position, sRNA_end_position,
                                   entry_id):
-        interacting_ncRNA_id = None
-        real_transc = None
-        id_locus_tag_dict = self.id_locus_tag_dict
-        for item in id_locus_tag_dict.items():
-            if (item[1]["locus_tag"] == targets_locus_tag and
-                item[1]["feature_type"] == "gene" and
-                item[1]["entry_id"] == entry_id):
-                target_gene_id = item[0]
-                target_get_part_of_ids_list = (
-                    self._get_part_of_targets_ids_list(
-                        target_gene_id))
-                real_transc = self._check_if_targets_are_transcripts(
-                    target_get_part_of_ids_list)
-            elif item[1]["feature_type"] == "ncRNA":
-                if (item[1]["item_alias"] == sRNA_name and
-                    (str(item[1]["genomic_start"]) ==
-                     str(sRNA_start_position)) and
-                    str(item[1]["genomic_end"]) == str(sRNA_end_position)):
-                    interacting_ncRNA_id = item[0]
+        """Look up the sRNA item and the transcripts of the target gene in
+        the feature store; the part of links were created by this run.
+        """
+        interacting_ncRNA_id = self.feature_store.get_ncRNA_id(
+            sRNA_name, sRNA_start_position, sRNA_end_position)
+        target_gene_ids = self.feature_store.get_gene_ids(targets_locus_tag,
+                                                          entry_id)
         if (interacting_ncRNA_id is None or
-            real_transc is None):
+            target_gene_ids == []):
             return(None)
-        else:
-            return(interacting_ncRNA_id, real_transc)
-
-    def _get_part_of_targets_ids_list(self, target_gene_id):
-        target_get_part_of_ids_list = []
-        property_dict = self._get_property_dict()
-        item = pywikibot.ItemPage(self.repo, target_gene_id)
-        item_dict = item.get()
-        clm_dict = item_dict["claims"]
-        clm_list = clm_dict[property_dict["part of"]]
-        for clm in clm_list:
-            clm_target = clm.getTarget()
-            target_ID = clm_target.getID()
-            target_get_part_of_ids_list.append(target_ID)
-        return(target_get_part_of_ids_list)
-            
-    def _check_if_targets_are_transcripts(self, target_transcripts_ids_list):
-        ids_of_transcripts = []
-        property_dict = self._get_property_dict()
-        for ID in target_transcripts_ids_list:
-            item = pywikibot.ItemPage(self.repo, ID)
-            item_dict = item.get()
-            clm_dict = item_dict["claims"]
-            clm_list = clm_dict[property_dict["instance_of"]]
-            for clm in clm_list:
-                clm_target = clm.getTarget()
-                instance_of_target_id = clm_target.getID()
-                if instance_of_target_id == property_dict["transcript"]:
-                    ids_of_transcripts.append(ID)                   
-        return(ids_of_transcripts)                       
-                                           
+        real_transc = self.feature_store.get_transcripts(target_gene_ids[-1])
+        return(interacting_ncRNA_id, real_transc)
+
     def _get_property_dict(self):
-        if self.databank == "TillsWiki":
-            property_dict = {"instance_of": "P6", "subclass_of": "P7",
-                             "found_in_taxon": "P8", "genomic_start": "P9",
-                             "genomic_end": "P10",
-                             "strand_orientation": "P11", "RNA": "Q9",
-                             "Forward_Strand": "Q11",
-                             "Reverse_Strand": "Q12", "small_RNA": "Q194",
-                             "DNA": "Q227", "gene": "Q254",
-                             "protein": "Q267", "NCBI Locus tag": "P24",
-                             "encodes": "P25","encoded by": "P26",
-                             "NCBI Locus tag of associated gene": "P27",
-                             "physically interacts with": "P15",
-                             "has part": "P28",
-                             "determination method": "P29",
-                             "RNAplex": "Q357", "RNAup": "Q465",
-                             "ribosomal RNA": "Q417", "transfer RNA": "Q424",
-                             "TSS": "Q441", "part of": "P4",
-                             "RefSeq": "Q36583", "ANNOgesic": "Q36584",
-                             "transcript": "Q37105", "stated in": "P30"}
-            return(property_dict)        
-        elif self.databank == "Wikidata":
-            property_dict = {"instance_of": "P31", "subclass_of": "P279",
-                             "found_in_taxon": "P703",
-                             "genomic_start": "P644",
-                             "genomic_end": "P645",
-                             "strand_orientation": "P2548", "RNA": "Q11053",
-                             "Forward_Strand": "Q22809680",
-                             "Reverse_Strand": "Q22809711",
-                             "small_RNA": "Q24287527", "DNA": "Q7430",
-                             "gene": "Q7187", "protein": "Q8054",
-                             "NCBI Locus tag": "P2393", "encodes": "P688",
-                             "encoded by": "P702",
-                             "physically interacts with": "P129",
-                             "has part": "P527",
-                             "determination method": "P459",
-                             "ribosomal RNA": "Q215980",
-                             "transfer RNA": "Q201448",
-                             "TSS": "Q2449354", "part of": "P361",
-                             "RefSeq": "Q7307074",
-                             "transcript": "Q26944990", "stated in": "P248",
-                             "RNAplex": "Q27907827", "RNAup": "Q27907828"}
-            return(property_dict)
-                       
-    def _add_claim_string(self, item_id, claim, target):
-        new_item = pywikibot.ItemPage(self.repo, item_id) 
-        claim = pywikibot.Claim(self.repo, claim)
-        claim.setTarget(target)
-        new_item.addClaim(claim)
-        
+        return(get_property_dict(self.databank))
+
     def _add_claim_item(self, item_id, claim, target):
-        new_item = pywikibot.ItemPage(self.repo, item_id) 
-        claim = pywikibot.Claim(self.repo, claim)
-        target = pywikibot.ItemPage(self.repo, target)
-        claim.setTarget(target)
-        new_item.addClaim(claim)
-
-    def _add_claim_item_qualifier(self, item_id, claim, target, qualifier,
-                                  qualifier_target, qualifier2,
-                                  qualifier_target2, qualifier3,
-                                  qualifier_target3):
-        new_item = pywikibot.ItemPage(self.repo, item_id) 
-        claim = pywikibot.Claim(self.repo, claim)
-        target = pywikibot.ItemPage(self.repo, target)
-        claim.setTarget(target)
-        new_item.addClaim(claim)
-        qualifier = pywikibot.Claim(self.repo, qualifier)
-        qualifier.setTarget(qualifier_target)
-        claim.addQualifier(qualifier)
-        qualifier2 = pywikibot.Claim(self.repo, qualifier2)
-        qualifier2.setTarget(qualifier_target2)
-        claim.addQualifier(qualifier2)
-        qualifier3 = pywikibot.Claim(self.repo, qualifier3)
-        qualifier_target3 = pywikibot.ItemPage(self.repo, qualifier_target3)
-        qualifier3.setTarget(qualifier_target3)
-        claim.addQualifier(qualifier3)
-   
-    def _create_new_item(self, label, item_description):
-        data = self._get_data_for_new_item(label, item_description)
-        item = pywikibot.ItemPage(self.repo)
-        item.editEntity(data)
-        item_id = item.getID()
-        new_item = pywikibot.ItemPage(self.repo, item_id) 
+        if self._is_synced_statement(item_id, get_signature(claim, target)):
+            return
+        self.upload_executor.write(self.backend.add_claim, item_id, claim,
+                                   target, "wikibase-item")
+        self._cache_revision_id(item_id)
+
+    def _add_claims_to_existing_item(self, item_id, claim_item_list=(),
+                                     claim_string_list=()):
+        """Add several statements to an existing item with one
+        wbeditentity call.
+        """
+        claim_item_list = [
+            (claim, target) for claim, target in claim_item_list
+            if not self._is_synced_statement(
+                item_id, get_signature(claim, target))]
+        claim_string_list = [
+            (claim, target) for claim, target in claim_string_list
+            if not self._is_synced_statement(
+                item_id, get_signature(claim, target))]
+        if claim_item_list == [] and claim_string_list == []:
+            return
+        data = {'claims': []}
+        for claim, target in claim_item_list:
+            data['claims'].append(self._get_statement_data(
+                self._get_item_snak_data(claim, target)))
+        for claim, target in claim_string_list:
+            data['claims'].append(self._get_statement_data(
+                self._get_string_snak_data(claim, target)))
+        self.upload_executor.write(self.backend.edit_entity, item_id, data,
+                                   summary="Adding claims.")
+        self._cache_revision_id(item_id)
+
+    def _cache_revision_id(self, item_id):
+        """Keep the revision of the bot's own edit, so that the next run
+        with the label cache does not read the item again.
+        """
+        if self.label_cache is not None:
+            self.label_cache.set_revision_id(
+                item_id, self.backend.get_written_revision_id(item_id))
+
+    def _create_new_item(self, label, item_description, item_alias=None,
+                         claim_item_list=(), claim_string_list=()):
+        data = self._get_data_for_new_item_with_claims(
+            label, item_description, item_alias, claim_item_list,
+            claim_string_list)
+        item_id = self.upload_executor.write(self.backend.create_item, data)
+        self._get_item_inventory().add(label, item_description, item_id)
+        if self.label_cache is not None:
+            self.label_cache.add_item(
+                item_id, label, item_description, self.strain_id,
+                self.backend.get_written_revision_id(item_id))
         return(item_id)
 
     def _get_data_for_new_item(self, label, item_description):
@@ -854,6 +1126,112 @@ class BacterialAnnotationBot():
                 }
             }
         }
-         
 
+    def _get_data_for_new_item_with_claims(self, label, item_description,
+                                           item_alias, claim_item_list,
+                                           claim_string_list):
+        """Build the complete entity JSON (label, description, alias and all
+        statements) so that a new item is created by a single wbeditentity
+        call.
+        """
+        data = self._get_data_for_new_item(label, item_description)
+        if item_alias is not None:
+            data['aliases'] = {
+                'en': [{
+                    'language': 'en',
+                    'value': item_alias
+                }]
+            }
+        claims = []
+        for claim, target in claim_item_list:
+            claims.append(self._get_statement_data(
+                self._get_item_snak_data(claim, target)))
+        for claim, target in claim_string_list:
+            claims.append(self._get_statement_data(
+                self._get_string_snak_data(claim, target)))
+        if claims != []:
+            data['claims'] = claims
+        return(data)
+
+    def _get_statement_data(self, mainsnak, qualifier_snaks=()):
+        statement = {
+            'mainsnak': mainsnak,
+            'type': 'statement',
+            'rank': 'normal'
+        }
+        if qualifier_snaks:
+            qualifiers = defaultdict(list)
+            for qualifier_snak in qualifier_snaks:
+                qualifiers[qualifier_snak['property']].append(qualifier_snak)
+            statement['qualifiers'] = dict(qualifiers)
+        return(statement)
+
+    def _get_item_snak_data(self, claim, target):
+        return {
+            'snaktype': 'value',
+            'property': claim,
+            'datavalue': {
+                'value': {
+                    'entity-type': 'item',
+                    'numeric-id': int(target[1:])
+                },
+                'type': 'wikibase-entityid'
+            }
+        }
+
+    def _get_string_snak_data(self, claim, target):
+        return {
+            'snaktype': 'value',
+            'property': claim,
+            'datavalue': {
+                'value': target,
+                'type': 'string'
+            }
+        }
 
+def get_property_dict(databank):
+    """Return the IDs of the properties and items the bot uses in a
+    databank.
+    """
+    if databank == "TillsWiki":
+        property_dict = {"instance_of": "P6", "subclass_of": "P7",
+                         "found_in_taxon": "P8", "genomic_start": "P9",
+                         "genomic_end": "P10",
+                         "strand_orientation": "P11", "RNA": "Q9",
+                         "Forward_Strand": "Q11",
+                         "Reverse_Strand": "Q12", "small_RNA": "Q194",
+                         "DNA": "Q227", "gene": "Q254",
+                         "protein": "Q267", "NCBI Locus tag": "P24",
+                         "encodes": "P25","encoded by": "P26",
+                         "NCBI Locus tag of associated gene": "P27",
+                         "physically interacts with": "P15",
+                         "has part": "P28",
+                         "determination method": "P29",
+                         "RNAplex": "Q357", "RNAup": "Q465",
+                         "ribosomal RNA": "Q417", "transfer RNA": "Q424",
+                         "TSS": "Q441", "part of": "P4",
+                         "RefSeq": "Q36583", "ANNOgesic": "Q36584",
+                         "transcript": "Q37105", "stated in": "P30"}
+        return(property_dict)        
+    elif databank == "Wikidata":
+        property_dict = {"instance_of": "P31", "subclass_of": "P279",
+                         "found_in_taxon": "P703",
+                         "genomic_start": "P644",
+                         "genomic_end": "P645",
+                         "strand_orientation": "P2548", "RNA": "Q11053",
+                         "Forward_Strand": "Q22809680",
+                         "Reverse_Strand": "Q22809711",
+                         "small_RNA": "Q24287527", "DNA": "Q7430",
+                         "gene": "Q7187", "protein": "Q8054",
+                         "NCBI Locus tag": "P2393", "encodes": "P688",
+                         "encoded by": "P702",
+                         "physically interacts with": "P129",
+                         "has part": "P527",
+                         "determination method": "P459",
+                         "ribosomal RNA": "Q215980",
+                         "transfer RNA": "Q201448",
+                         "TSS": "Q2449354", "part of": "P361",
+                         "RefSeq": "Q7307074",
+                         "transcript": "Q26944990", "stated in": "P248",
+                         "RNAplex": "Q27907827", "RNAup": "Q27907828"}
+        return(property_dict)
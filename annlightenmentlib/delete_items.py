@@ -1,32 +1,125 @@
-import pywikibot
+import json
+import re
+from annlightenmentlib.event_log import log_event
+from annlightenmentlib.metered_backend import MeteredBackend
+from annlightenmentlib.upload_journal import read_journal
 
 class DeleteItems():
+    """
+    Deletes items through one backend session. The deletions run on an
+    UploadExecutor, so they are sent by several workers at once while
+    the executor keeps them spaced by put_throttle and pauses on maxlag.
+    The result of every item is kept: deleted, missing (the item did not
+    exist anymore) or failed with the error of the wiki.
+    """
 
-    def __init__(self, path_to_logfile):
-        self.path_to_logfile = path_to_logfile
-
-    def _return_ID_list_for_deletion(self):
-        ID_for_deletion_list = []
-        placeholder_item_type_list = [
-            "transcript", "sRNA", "ncRNA", "TSS", "gene", "protein",
-            "sRNA gene", "rRNA", "tRNA"]
-        logfile = open(self.path_to_logfile, 'r')
-        for line in logfile.readlines():
-            for item_type in placeholder_item_type_list:
-                if line.startswith("INFO:root:created {} item with "
-                                   "ID".format(item_type)):
-                    line_list = line.split()
-                    ID_for_deletion_list.append(line_list[-1])
-        return(ID_for_deletion_list)
-
-    def _delete(self, item_id_list):
-        for item_id in item_id_list:
-            site = pywikibot.Site("en", "TillsWiki")
-            repo = site.data_repository()
-            repoitem = pywikibot.ItemPage(repo, item_id)
-            reason = "deleted by ANNlightenment"
-            try:
-                repoitem.delete(reason, prompt=False)
-                print("Deleted item {}".format(item_id))
-            except:
-                continue
+    def __init__(self, backend, upload_executor,
+                 reason="deleted by ANNlightenment"):
+        self.backend = MeteredBackend(backend, upload_executor.metrics)
+        self.upload_executor = upload_executor
+        self.reason = reason
+        self.results = {}
+
+    def get_item_ids_from_logfile(self, path_to_logfile):
+        """Return the IDs of the items a log file reports as created.
+        Text logs of older versions are read as well.
+        """
+        created_item = re.compile(r"created .+ item with ID (Q\d+)$")
+        item_ids = []
+        with open(path_to_logfile) as logfile:
+            for line in logfile:
+                if line.startswith("{"):
+                    event = json.loads(line)
+                    if event["event"] == "created":
+                        item_ids.append(event["item_id"])
+                    continue
+                match = created_item.search(line.rstrip())
+                if match is not None:
+                    item_ids.append(match.group(1))
+        return(item_ids)
+
+    def get_item_ids_from_journal(self, path_to_journal):
+        """Return the IDs of the items an upload journal records as
+        created. Updates of existing items in a sync are journaled under
+        keys of their own and are skipped. The keys of batch uploads
+        start with the strain ID.
+        """
+        item_key_types = ["item", "ncRNA gene", "transcript",
+                          "RefSeq transcript"]
+        strain_id, results = read_journal(path_to_journal)
+        # a dictionary drops repeated IDs and keeps the order
+        item_ids = {}
+        for journal_key, result in results.items():
+            key = json.loads(journal_key)
+            if key[0] not in item_key_types and key[0].startswith("Q"):
+                key = key[1:]
+            if key[0] in item_key_types and result is not None:
+                item_ids[result] = None
+        return(list(item_ids))
+
+    def get_item_ids_of_strain(self, strain_id, found_in_taxon):
+        """Return the IDs of all items whose found in taxon claim is the
+        strain.
+        """
+        linking_item_ids = self.backend.get_linking_item_ids(strain_id)
+        entities = self.backend.get_entities(linking_item_ids, "claims")
+        item_ids = []
+        for item_id in linking_item_ids:
+            statements = entities.get(item_id, {}).get(
+                'claims', {}).get(found_in_taxon, [])
+            if any(statement['mainsnak']['snaktype'] == 'value' and
+                   statement['mainsnak']['datavalue']['value'][
+                       'numeric-id'] == int(strain_id[1:])
+                   for statement in statements):
+                item_ids.append(item_id)
+        return(item_ids)
+
+    def delete(self, item_ids):
+        """Delete the items and return their results by ID."""
+        self.upload_executor.metrics.set_phase("deletion")
+        for item_id in item_ids:
+            self.upload_executor.submit(
+                item_id, self._delete_item, (item_id,),
+                lambda result, item_id=item_id: self._register_result(
+                    item_id, result),
+                lambda error, item_id=item_id: self._register_result(
+                    item_id, "failed", error))
+        self.upload_executor.join()
+        return(self.results)
+
+    def _delete_item(self, item_id):
+        try:
+            self.upload_executor.write(self.backend.delete_item, item_id,
+                                       self.reason)
+        except Exception as error:
+            if self._is_missing_item_error(error):
+                return("missing")
+            raise
+        return("deleted")
+
+    def _is_missing_item_error(self, error):
+        return(getattr(error, "code", None) == "missingtitle" or
+               type(error).__name__ in ["NoPage", "NoPageError"])
+
+    def _register_result(self, item_id, result, error=None):
+        self.results[item_id] = (result, error)
+        if result == "deleted":
+            print("Deleted item {}".format(item_id))
+            log_event("deleted", item_id=item_id)
+        elif result == "missing":
+            print("Item {} does not exist".format(item_id))
+
+    def get_counts(self):
+        counts = {"deleted": 0, "missing": 0, "failed": 0}
+        for result, error in self.results.values():
+            counts[result] += 1
+        return(counts)
+
+    def write_report(self, path_to_report):
+        """Write one JSON line with the result of every item."""
+        with open(path_to_report, "w") as report:
+            for item_id, (result, error) in self.results.items():
+                record = {"item_id": item_id, "result": result}
+                if error is not None:
+                    record["error"] = str(error)
+                report.write(json.dumps(record) + "\n")
@@ -0,0 +1,43 @@
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+
+event_logger = logging.getLogger("annlightenment.events")
+
+class EventLog():
+    """
+    Writes the events of a run (created, linked, skipped, failed, ...)
+    to a JSON lines file, one object per event with its time, its name
+    and its fields. Events are put on a queue and written by a background
+    thread, so logging never waits for the disk. Without an open
+    EventLog, log_event() does nothing.
+    """
+
+    def __init__(self, path_to_log):
+        self.path_to_log = path_to_log
+        self.file_handler = logging.FileHandler(path_to_log)
+        self.file_handler.setFormatter(JSONLinesFormatter())
+        self.queue = queue.Queue()
+        self.queue_handler = QueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, self.file_handler)
+        event_logger.addHandler(self.queue_handler)
+        event_logger.setLevel(logging.INFO)
+        event_logger.propagate = False
+        self.listener.start()
+
+    def close(self):
+        """Write the remaining events and close the file."""
+        event_logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.file_handler.close()
+
+class JSONLinesFormatter(logging.Formatter):
+
+    def format(self, record):
+        event = {"time": round(record.created, 3), "event": record.msg}
+        event.update(getattr(record, "event_fields", {}))
+        return(json.dumps(event))
+
+def log_event(event, **fields):
+    event_logger.info(event, extra={"event_fields": fields})
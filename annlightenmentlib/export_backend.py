@@ -0,0 +1,210 @@
+import json
+import threading
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+class ExportBackend(WikibaseBackend):
+    """
+    Backend for first-time loads that collects the entities the bot would
+    create instead of sending them to the wiki, for a bulk import on the
+    server side. New items get the placeholder IDs Q-1, Q-2, ... and the
+    wiki looks empty. All writes of an item, including the claims added
+    after its creation, are merged into its entity.
+
+    Cross-references between new items are resolved when the entities
+    are written: with first_item_id (the next free QID of the wiki into
+    which the items are imported one after another) Q-n becomes the n-th
+    QID from there on, otherwise the placeholders are kept.
+    """
+
+    def __init__(self, strain_labels=None):
+        self.strain_labels = strain_labels or {}
+        self.lock = threading.Lock()
+        self.entities = []
+
+    def _get_entity(self, item_id):
+        """Return the entity of a placeholder ID. Existing items of the wiki
+        are not exported, so writes to them are rejected.
+        """
+        number = item_id[2:]
+        if (not item_id.startswith("Q-") or not number.isdigit() or
+            not 0 < int(number) <= len(self.entities)):
+            raise ValueError("{} is not an item of this export, an export "
+                             "can only write to the items it created".format(
+                                 item_id))
+        return(self.entities[int(number) - 1])
+
+    def _get_snak(self, claim, target, datatype):
+        if datatype == "wikibase-item":
+            datavalue = {'value': {'entity-type': 'item',
+                                   'numeric-id': int(target[1:])},
+                         'type': 'wikibase-entityid'}
+        else:
+            datavalue = {'value': target, 'type': 'string'}
+        return({'snaktype': 'value', 'property': claim,
+                'datavalue': datavalue})
+
+    def _add_statement(self, entity, statement):
+        entity['claims'].setdefault(
+            statement['mainsnak']['property'], []).append(statement)
+
+    def _merge(self, entity, data):
+        for field in ['labels', 'descriptions']:
+            entity[field].update(data.get(field, {}))
+        for language, aliases in data.get('aliases', {}).items():
+            entity['aliases'].setdefault(language, []).extend(aliases)
+        for statement in data.get('claims', []):
+            self._add_statement(entity, statement)
+
+    def create_item(self, data):
+        with self.lock:
+            item_id = "Q-{}".format(len(self.entities) + 1)
+            entity = {'type': 'item', 'id': item_id, 'labels': {},
+                      'descriptions': {}, 'aliases': {}, 'claims': {}}
+            self._merge(entity, data)
+            self.entities.append(entity)
+        return(item_id)
+
+    def edit_entity(self, item_id, data, summary=None):
+        with self.lock:
+            self._merge(self._get_entity(item_id), data)
+
+    def add_claim(self, item_id, claim, target, datatype):
+        statement = {'mainsnak': self._get_snak(claim, target, datatype),
+                     'type': 'statement', 'rank': 'normal'}
+        with self.lock:
+            self._add_statement(self._get_entity(item_id), statement)
+
+    def get_entities(self, item_ids, props):
+        return({})
+
+    def get_linking_item_ids(self, item_id):
+        return([])
+
+    def delete_item(self, item_id, reason):
+        raise ValueError("cannot delete item {}, an export only collects "
+                         "new items and deletes nothing".format(item_id))
+
+    def get_label(self, item_id):
+        return(self.strain_labels.get(item_id, item_id))
+
+    def __len__(self):
+        return(len(self.entities))
+
+    def get_number_of_statements(self):
+        return(sum(len(statements) for entity in self.entities
+                   for statements in entity['claims'].values()))
+
+    def _get_resolver(self, first_item_id):
+        """Return a function that maps a numeric ID to the final one."""
+        if first_item_id is None:
+            return(lambda numeric_id: numeric_id)
+        first_number = int(first_item_id[1:])
+        return(lambda numeric_id: numeric_id if numeric_id > 0 else
+               first_number - numeric_id - 1)
+
+    def _resolve_snak(self, snak, resolve):
+        value = snak['datavalue']['value']
+        if isinstance(value, dict):
+            snak = dict(snak, datavalue=dict(snak['datavalue'], value=dict(
+                value, **{'numeric-id': resolve(value['numeric-id'])})))
+        return(snak)
+
+    def write_ndjson(self, path_to_ndjson, first_item_id=None):
+        """Write one line of Wikibase entity JSON per new item."""
+        resolve = self._get_resolver(first_item_id)
+        with open(path_to_ndjson, "w") as ndjson:
+            for entity in self.entities:
+                claims = {}
+                for claim, statements in entity['claims'].items():
+                    claims[claim] = [self._resolve_statement(
+                        statement, resolve) for statement in statements]
+                ndjson.write(json.dumps(dict(
+                    entity, id="Q{}".format(resolve(-int(entity['id'][2:]))),
+                    claims=claims)) + "\n")
+
+    def _resolve_statement(self, statement, resolve):
+        statement = dict(statement, mainsnak=self._resolve_snak(
+            statement['mainsnak'], resolve))
+        if 'qualifiers' in statement:
+            statement['qualifiers'] = {
+                qualifier: [self._resolve_snak(snak, resolve)
+                            for snak in snaks]
+                for qualifier, snaks in statement['qualifiers'].items()}
+        return(statement)
+
+    def write_quickstatements(self, path_to_batch, first_item_id=None):
+        """Write a QuickStatements (V1) batch. Each item is created with
+        its label, description, aliases and the statements that refer
+        only to existing items. The statements between new items follow
+        at the end, when all of them exist. QuickStatements cannot escape
+        double quotes, tabs or line breaks in a value, so a value with one
+        of them raises a ValueError that names the item and the field
+        before anything is written.
+        """
+        resolve = self._get_resolver(first_item_id)
+        cross_references = []
+        lines = []
+        for entity in self.entities:
+            lines.append("CREATE\n")
+            for language, label in entity['labels'].items():
+                field = "L" + language
+                lines.append("LAST\t{}\t{}\n".format(field, self._quote(
+                    entity['id'], field, label['value'])))
+            for language, description in entity['descriptions'].items():
+                field = "D" + language
+                lines.append("LAST\t{}\t{}\n".format(field, self._quote(
+                    entity['id'], field, description['value'])))
+            for language, aliases in entity['aliases'].items():
+                field = "A" + language
+                for alias in aliases:
+                    lines.append("LAST\t{}\t{}\n".format(
+                        field, self._quote(entity['id'], field,
+                                           alias['value'])))
+            for statements in entity['claims'].values():
+                for statement in statements:
+                    if self._refers_to_new_item(statement):
+                        cross_references.append((entity['id'],
+                                                 statement))
+                    else:
+                        lines.append("LAST\t{}\n".format(
+                            self._get_quickstatement(
+                                entity['id'], statement, resolve)))
+        for item_id, statement in cross_references:
+            lines.append("Q{}\t{}\n".format(
+                resolve(-int(item_id[2:])),
+                self._get_quickstatement(item_id, statement, resolve)))
+        with open(path_to_batch, "w") as batch:
+            batch.writelines(lines)
+
+    def _refers_to_new_item(self, statement):
+        snaks = [statement['mainsnak']] + [
+            snak for snaks in statement.get('qualifiers', {}).values()
+            for snak in snaks]
+        return(any(isinstance(snak['datavalue']['value'], dict) and
+                   snak['datavalue']['value']['numeric-id'] < 0
+                   for snak in snaks))
+
+    def _quote(self, item_id, field, value):
+        if any(character in value for character in '"\t\r\n'):
+            raise ValueError(
+                "the {} value {!r} of item {} contains a double quote, tab "
+                "or line break, which QuickStatements cannot "
+                "express".format(field, value, item_id))
+        return('"{}"'.format(value))
+
+    def _get_quickstatement(self, item_id, statement, resolve):
+        """Return the property and value columns of a statement with its
+        qualifiers.
+        """
+        snaks = [statement['mainsnak']] + [
+            snak for snaks in statement.get('qualifiers', {}).values()
+            for snak in snaks]
+        columns = []
+        for snak in snaks:
+            value = snak['datavalue']['value']
+            if isinstance(value, dict):
+                value = "Q{}".format(resolve(value['numeric-id']))
+            else:
+                value = self._quote(item_id, snak['property'], value)
+            columns.extend([snak['property'], value])
+        return("\t".join(columns))
@@ -0,0 +1,72 @@
+from collections import defaultdict
+from annlightenmentlib.gff3parser import Gff3Parser
+
+class FeatureModel():
+    """
+    In-memory model of the features of an ANNOgesic GFF file that are
+    uploaded, built by reading the file once. Entries are kept in file
+    order, grouped by feature type and linked to their parents.
+    """
+
+    uploaded_features = ["gene", "CDS", "rRNA", "tRNA", "TSS", "ncRNA",
+                         "transcript"]
+    required_attributes = {"gene": ["ID", "Name", "locus_tag"],
+                           "CDS": ["ID", "product", "locus_tag"],
+                           "rRNA": ["ID", "product", "locus_tag"],
+                           "tRNA": ["ID", "product", "locus_tag"],
+                           "TSS": ["ID", "Name"],
+                           "ncRNA": ["ID", "Name"],
+                           "transcript": ["ID", "Name"]}
+
+    def __init__(self):
+        self.entries = []
+        self.features_dict = defaultdict(list)
+        self.entries_by_id = {}
+        self.children_dict = defaultdict(list)
+
+    def read(self, annotation_file):
+        for entry in Gff3Parser().entries_from_file(annotation_file):
+            self.add_entry(entry)
+        return(self)
+
+    def add_entry(self, entry):
+        if entry.feature not in self.uploaded_features:
+            return
+        self.entries.append(entry)
+        self.features_dict[entry.feature].append(entry)
+        entry_id = entry.attributes.get("ID")
+        if entry_id is not None:
+            self.entries_by_id[entry_id] = entry
+        for parent in self.get_parents(entry):
+            self.children_dict[parent].append(entry)
+
+    def get_parents(self, entry):
+        if "Parent" not in entry.attributes:
+            return([])
+        return(entry.attributes["Parent"].split(","))
+
+    def get_children(self, entry_id):
+        return(self.children_dict.get(entry_id, []))
+
+    def entries_of(self, features):
+        """Yield the entries of the given feature types in file order."""
+        for entry in self.entries:
+            if entry.feature in features:
+                yield(entry)
+
+    def count(self, feature):
+        return(len(self.features_dict.get(feature, [])))
+
+    def validate(self):
+        """Return a list of problems that would stop an upload midway."""
+        problems = []
+        for entry in self.entries:
+            for attribute in self.required_attributes[entry.feature]:
+                if attribute not in entry.attributes:
+                    problems.append("{} at {}:{}-{} has no {} attribute".format(
+                        entry.feature, entry.seq_id, entry.start, entry.end,
+                        attribute))
+            if entry.strand not in ["+", "-"]:
+                problems.append("{} {} has no valid strand ({})".format(
+                    entry.feature, entry.attributes.get("ID"), entry.strand))
+        return(problems)
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+class FeatureStore():
+    """
+    The features uploaded during a run, keyed by the QID of their item,
+    together with the indexes that the interaction statements look up
+    their genes, transcripts and ncRNAs in.
+    """
+
+    def __init__(self):
+        self.id_locus_tag_dict = defaultdict(dict)
+        self.transcripts_dict = defaultdict(list)
+        self.gene_dict = defaultdict(list)
+        self.ncRNA_dict = {}
+
+    def add(self, item_id, feature_type, locus_tag, parents, genomic_start,
+            genomic_end, strand_direction, item_name, entry_id,
+            item_alias=None):
+        feature = self.id_locus_tag_dict[item_id]
+        feature['feature_type'] = feature_type
+        feature['locus_tag'] = locus_tag
+        feature['parent'] = parents
+        feature['genomic_start'] = genomic_start
+        feature['genomic_end'] = genomic_end
+        feature['strand_direction'] = strand_direction
+        feature['item_name'] = item_name
+        if item_alias is not None:
+            feature['item_alias'] = item_alias
+        feature['entry_id'] = entry_id
+        if feature_type == "gene":
+            self.gene_dict[(locus_tag, entry_id)].append(item_id)
+        elif feature_type == "ncRNA":
+            self.ncRNA_dict[(item_alias, str(genomic_start),
+                             str(genomic_end))] = item_id
+
+    def add_part_of_link(self, item_id, transcript_id):
+        self.transcripts_dict[item_id].append(transcript_id)
+
+    def get_transcripts(self, item_id):
+        """Return the IDs of the transcripts the item is part of."""
+        return(list(self.transcripts_dict.get(item_id, [])))
+
+    def get_gene_ids(self, locus_tag, entry_id):
+        return(list(self.gene_dict.get((locus_tag, entry_id), [])))
+
+    def get_ncRNA_id(self, item_alias, genomic_start, genomic_end):
+        return(self.ncRNA_dict.get(
+            (item_alias, str(genomic_start), str(genomic_end))))
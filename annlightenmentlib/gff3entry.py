@@ -1,29 +1,64 @@
+from urllib.parse import unquote
+
 class Gff3Entry(object):
 
+    __slots__ = ["seq_id", "source", "feature", "start", "end", "score",
+                 "strand", "phase", "attribute_string", "_attribute_dict"]
+
     def __init__(self, entry_dict):
-        self.seq_id = entry_dict["seq_id"]
-        self.source = entry_dict["source"]
-        self.feature = entry_dict["feature"]
+        self._set_fields(
+            entry_dict["seq_id"], entry_dict["source"], entry_dict["feature"],
+            entry_dict["start"], entry_dict["end"], entry_dict["score"],
+            entry_dict["strand"], entry_dict["phase"],
+            entry_dict["attributes"])
+
+    @classmethod
+    def from_fields(cls, fields):
+        """Create an entry from the nine columns of a split GFF line."""
+        entry = cls.__new__(cls)
+        entry._set_fields(*fields)
+        return(entry)
+
+    def _set_fields(self, seq_id, source, feature, start, end, score, strand,
+                    phase, attribute_string):
+        if "%" in seq_id:
+            seq_id = unquote(seq_id)
+        self.seq_id = seq_id
+        self.source = source
+        self.feature = feature
         # 1-based coordinates
         # Make sure that start <= end
-        start, end = sorted([int(entry_dict["start"]), int(entry_dict["end"])])
+        start = int(start)
+        end = int(end)
+        if start > end:
+            start, end = end, start
         self.start = start
         self.end = end
-        self.score = entry_dict["score"]
-        self.strand = entry_dict["strand"]
-        self.phase = entry_dict["phase"]
-        self.attributes = self._attributes(entry_dict["attributes"])
-        self.attribute_string = entry_dict["attributes"]
-    
+        self.score = score
+        self.strand = strand
+        self.phase = phase
+        self.attribute_string = attribute_string
+        self._attribute_dict = None
+
+    @property
+    def attributes(self):
+        """The attribute column as dictionary, decoded on first use."""
+        if self._attribute_dict is None:
+            self._attribute_dict = self._attributes(self.attribute_string)
+        return(self._attribute_dict)
+
     def _attributes(self, attributes_string):
         """Translate the attribute string to dictionary"""
-        if attributes_string is None:
+        if attributes_string is None or attributes_string in ["", "."]:
             return({})
-        if attributes_string.endswith(";"):
-            attributes_string = attributes_string[:-1]
-        return dict(
-            [key_value_pair.split("=")
-             for key_value_pair in attributes_string.split(";")])
+        key_value_pairs = [key_value_pair.partition("=")
+                           for key_value_pair in attributes_string.split(";")
+                           if key_value_pair != ""]
+        if "%" in attributes_string:
+            # GFF3 percent-encodes ; = & , and control characters
+            return({unquote(key): unquote(value)
+                    for key, _, value in key_value_pairs})
+        return({key: value for key, _, value in key_value_pairs})
 
     def __str__(self):
         return "\t".join([str(field) for field in [
@@ -1,4 +1,5 @@
-import csv
+import gzip
+import io
 from annlightenmentlib.gff3entry import Gff3Entry
 
 class Gff3Parser(object):
@@ -10,18 +11,37 @@ class Gff3Parser(object):
     http://modencode.oicr.on.ca/cgi-bin/validate_gff3_online
     """
 
+    def entries_from_file(self, path_to_gff):
+        """
+        Stream the entries of a plain or gzip compressed GFF file. The file
+        is opened once and read line by line, so memory use does not grow
+        with its size and pipes (e.g. <(zcat annotation.gff.gz)) work too.
+        """
+        with open(path_to_gff, "rb") as gff:
+            if gff.peek(2)[:2] == b"\x1f\x8b":
+                gff = gzip.GzipFile(fileobj=gff)
+            yield from self.entries(io.TextIOWrapper(gff, encoding="utf-8"))
+
     def entries(self, input_gff_fh):
         """
+        Yield a Gff3Entry for every feature line. Lines are split on tabs
+        directly; the attribute column is only decoded when it is used.
+        Reading stops at a ##FASTA section, other directives like ###
+        are skipped.
         """
-        for entry_dict in csv.DictReader(
-            input_gff_fh, delimiter="\t",
-            fieldnames=["seq_id", "source", "feature", "start",
-                        "end", "score", "strand", "phase", "attributes"]):
-            if entry_dict["seq_id"].startswith("#"):
+        for line in input_gff_fh:
+            if line.startswith("#"):
+                if line.startswith("##FASTA"):
+                    break
                 continue
-            yield(self._dict_to_entry(entry_dict))
+            if line.startswith(">"):
+                break
+            line = line.rstrip("\r\n")
+            if line == "":
+                continue
+            yield(self._line_to_entry(line))
             # try:
-            #     yield(self._dict_to_entry(entry_dict))
+            #     yield(self._line_to_entry(line))
             # except:
             #     sys.stderr.write(
             #         "Error! Please make sure that you use GFF3 formated "
@@ -30,6 +50,12 @@ class Gff3Parser(object):
             #         "http://www.sequenceontology.org/gff3.shtml for more "
             #         "information).\n")
             #     sys.exit(0)
-    
+
+    def _line_to_entry(self, line):
+        fields = line.split("\t")
+        if len(fields) != 9:
+            fields = (fields + [None] * 9)[:9]
+        return Gff3Entry.from_fields(fields)
+
     def _dict_to_entry(self, entry_dict):
         return Gff3Entry(entry_dict)
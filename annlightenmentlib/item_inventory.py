@@ -0,0 +1,32 @@
+from collections import defaultdict
+
+class ItemInventory():
+    """
+    In-memory index of the items that are linked to a strain. It maps each
+    label to the (QID, description) pairs of the items carrying that label
+    so that the existence check of a feature is a dictionary lookup
+    instead of a query to the wiki.
+    """
+
+    def __init__(self):
+        self.label_dict = defaultdict(list)
+
+    def add(self, label, description, item_id):
+        entry = (item_id, description)
+        if entry not in self.label_dict[label]:
+            self.label_dict[label].append(entry)
+
+    def contains(self, label, description):
+        for item_id, item_description in self.label_dict.get(label, []):
+            if item_description == description:
+                return(True)
+        return(False)
+
+    def get_item_id(self, label, description):
+        for item_id, item_description in self.label_dict.get(label, []):
+            if item_description == description:
+                return(item_id)
+        return(None)
+
+    def __len__(self):
+        return(sum(len(entries) for entries in self.label_dict.values()))
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+class LabelCache():
+    """
+    SQLite-backed cache of the items (label, description, QID and
+    revision ID) the bot has read or written. It lets a restarted run
+    build its item inventory without reading every item of the strain
+    again: only items whose revision changed are read.
+    """
+
+    def __init__(self, path_to_cache):
+        self.path_to_cache = path_to_cache
+        # upload workers write to the cache, so access is serialised
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path_to_cache,
+                                          check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "item_id TEXT PRIMARY KEY, label TEXT, description TEXT, "
+            "strain_id TEXT, revision_id INTEGER)")
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS items_strain_id "
+            "ON items (strain_id)")
+        self.connection.commit()
+
+    def add_item(self, item_id, label, description, strain_id=None,
+                 revision_id=None):
+        self.add_items([(item_id, label, description, strain_id,
+                         revision_id)])
+
+    def add_items(self, item_rows):
+        """Insert or replace (item_id, label, description, strain_id,
+        revision_id) rows. A row without a strain ID does not overwrite
+        the strain of an item that is already known.
+        """
+        with self.lock:
+            self.connection.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (item_id) DO UPDATE SET "
+                "label = excluded.label, description = excluded.description, "
+                "strain_id = COALESCE(excluded.strain_id, items.strain_id), "
+                "revision_id = COALESCE(excluded.revision_id, "
+                "items.revision_id)", item_rows)
+            self.connection.commit()
+
+    def set_revision_id(self, item_id, revision_id):
+        """Store the revision of an edit of a cached item. Edits that
+        finish out of order do not set an older revision.
+        """
+        if revision_id is None:
+            return
+        with self.lock:
+            self.connection.execute(
+                "UPDATE items SET revision_id = "
+                "MAX(COALESCE(revision_id, 0), ?) WHERE item_id = ?",
+                (revision_id, item_id))
+            self.connection.commit()
+
+    def remove_items(self, item_ids):
+        with self.lock:
+            for item_id in item_ids:
+                self.connection.execute(
+                    "DELETE FROM items WHERE item_id = ?", (item_id,))
+            self.connection.commit()
+
+    def has_items(self, strain_id):
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT 1 FROM items WHERE strain_id = ? LIMIT 1",
+                (strain_id,))
+            return(cursor.fetchone() is not None)
+
+    def get_items(self, strain_id):
+        """Return (item_id, label, description) rows of a strain."""
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT item_id, label, description FROM items "
+                "WHERE strain_id = ?", (strain_id,))
+            return(cursor.fetchall())
+
+    def get_revision_ids(self, strain_id):
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT item_id, revision_id FROM items WHERE strain_id = ?",
+                (strain_id,))
+            return(dict(cursor.fetchall()))
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,51 @@
+import time
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+class MeteredBackend(WikibaseBackend):
+    """Wraps a backend and records the duration of every API operation
+    in RunMetrics.
+    """
+
+    def __init__(self, backend, metrics):
+        self.backend = backend
+        self.metrics = metrics
+
+    def _measure(self, operation, function, *args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return(function(*args, **kwargs))
+        finally:
+            self.metrics.record_operation(
+                operation, time.perf_counter() - start_time)
+
+    def create_item(self, data):
+        return(self._measure("editEntity", self.backend.create_item, data))
+
+    def edit_entity(self, item_id, data, summary=None):
+        return(self._measure("editEntity", self.backend.edit_entity,
+                             item_id, data, summary=summary))
+
+    def add_claim(self, item_id, claim, target, datatype):
+        return(self._measure("addClaim", self.backend.add_claim, item_id,
+                             claim, target, datatype))
+
+    def get_entities(self, item_ids, props):
+        return(self._measure("get", self.backend.get_entities, item_ids,
+                             props))
+
+    def get_linking_item_ids(self, item_id):
+        return(self._measure("backlinks", self.backend.get_linking_item_ids,
+                             item_id))
+
+    def delete_item(self, item_id, reason):
+        return(self._measure("delete", self.backend.delete_item, item_id,
+                             reason))
+
+    def get_written_revision_id(self, item_id):
+        return(self.backend.get_written_revision_id(item_id))
+
+    def get_label(self, item_id):
+        return(self._measure("get", self.backend.get_label, item_id))
+
+    def close(self):
+        self.backend.close()
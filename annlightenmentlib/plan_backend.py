@@ -0,0 +1,78 @@
+from collections import Counter
+import json
+import threading
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+class PlanBackend(WikibaseBackend):
+    """
+    Backend for dry runs that never contacts the wiki. Every write the
+    bot would make is appended to a JSON lines plan, new items get the
+    placeholder IDs Q-1, Q-2, ... and the wiki looks empty, so the plan
+    contains every item, claim, link and interaction of the input.
+    """
+
+    def __init__(self, path_to_plan, put_throttle=0):
+        self.path_to_plan = path_to_plan
+        self.put_throttle = put_throttle
+        self.plan_file = open(path_to_plan, "w")
+        self.lock = threading.Lock()
+        self.number_of_new_items = 0
+        self.write_counts = Counter()
+        self.item_counts = Counter()
+        self.number_of_statements = 0
+
+    def _write_record(self, record, number_of_statements=0):
+        with self.lock:
+            self.plan_file.write(json.dumps(record) + "\n")
+            self.write_counts[record["op"]] += 1
+            self.number_of_statements += number_of_statements
+
+    def create_item(self, data):
+        with self.lock:
+            self.number_of_new_items += 1
+            item_id = "Q-{}".format(self.number_of_new_items)
+            # descriptions read "bacterial <type> found in <strain>"
+            self.item_counts[data["descriptions"]["en"]["value"].split(
+                " found in ")[0]] += 1
+        self._write_record({"op": "create_item", "item_id": item_id,
+                            "data": data}, len(data.get("claims", [])))
+        return(item_id)
+
+    def edit_entity(self, item_id, data, summary=None):
+        self._write_record({"op": "edit_entity", "item_id": item_id,
+                            "summary": summary, "data": data},
+                           len(data.get("claims", [])))
+
+    def add_claim(self, item_id, claim, target, datatype):
+        self._write_record({"op": "add_claim", "item_id": item_id,
+                            "claim": claim, "target": target}, 1)
+
+    def get_entities(self, item_ids, props):
+        return({})
+
+    def get_linking_item_ids(self, item_id):
+        return([])
+
+    def delete_item(self, item_id, reason):
+        self._write_record({"op": "delete_item", "item_id": item_id,
+                            "reason": reason})
+
+    def get_label(self, item_id):
+        # without the wiki the strain is named by its ID
+        return(item_id)
+
+    def get_summary(self):
+        number_of_writes = sum(self.write_counts.values())
+        return({"op": "summary", "writes": dict(self.write_counts),
+                "items": dict(self.item_counts),
+                "statements": self.number_of_statements,
+                "put_throttle": self.put_throttle,
+                "minimum_seconds": number_of_writes * self.put_throttle})
+
+    def close(self):
+        """Append the summary to the plan and return it."""
+        summary = self.get_summary()
+        with self.lock:
+            self.plan_file.write(json.dumps(summary) + "\n")
+            self.plan_file.close()
+        return(summary)
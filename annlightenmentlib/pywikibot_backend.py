@@ -0,0 +1,82 @@
+import pywikibot
+from pywikibot.data import api
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+class PywikibotBackend(WikibaseBackend):
+    """The default backend, which talks to the wiki through pywikibot."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.written_revision_ids = {}
+
+    def _get_target(self, target, datatype):
+        if datatype == "wikibase-item":
+            return(pywikibot.ItemPage(self.repo, target))
+        return(target)
+
+    def _record_revision_id(self, item):
+        # pywikibot keeps the lastrevid of the write's answer
+        self.written_revision_ids[item.getID()] = max(
+            item.latest_revision_id or 0,
+            self.written_revision_ids.get(item.getID(), 0))
+
+    def create_item(self, data):
+        item = pywikibot.ItemPage(self.repo)
+        item.editEntity(data)
+        self._record_revision_id(item)
+        return(item.getID())
+
+    def edit_entity(self, item_id, data, summary=None):
+        item = pywikibot.ItemPage(self.repo, item_id)
+        item.editEntity(data, summary=summary)
+        self._record_revision_id(item)
+
+    def add_claim(self, item_id, claim, target, datatype):
+        new_item = pywikibot.ItemPage(self.repo, item_id)
+        claim = pywikibot.Claim(self.repo, claim)
+        claim.setTarget(self._get_target(target, datatype))
+        new_item.addClaim(claim)
+        self._record_revision_id(new_item)
+
+    def get_entities(self, item_ids, props):
+        # 50 IDs per request is the API limit for non-sysop accounts
+        entities = {}
+        item_ids = list(item_ids)
+        for batch_start in range(0, len(item_ids), 50):
+            params = {'action': 'wbgetentities', 'format': 'json',
+                      'ids': "|".join(item_ids[batch_start:batch_start + 50]),
+                      'props': props, 'languages': 'en'}
+            request = api.Request(site=self.repo, **params)
+            result = request.submit()
+            for item_id, entity in result['entities'].items():
+                if "missing" not in entity:
+                    entities[item_id] = entity
+        return(entities)
+
+    def get_linking_item_ids(self, item_id):
+        linking_item_ids = []
+        item = pywikibot.ItemPage(self.repo, item_id)
+        params = {'action': 'query', 'format': 'json', 'list': 'backlinks',
+                  'bltitle': item.title(),
+                  'blnamespace': self.repo.item_namespace.id,
+                  'bllimit': 'max'}
+        while True:
+            request = api.Request(site=self.repo, **params)
+            result = request.submit()
+            for backlink in result['query']['backlinks']:
+                linking_item_ids.append(backlink['title'].split(":")[-1])
+            if "continue" not in result:
+                break
+            params.update(result['continue'])
+        return(linking_item_ids)
+
+    def delete_item(self, item_id, reason):
+        item = pywikibot.ItemPage(self.repo, item_id)
+        item.delete(reason, prompt=False)
+
+    def get_written_revision_id(self, item_id):
+        return(self.written_revision_ids.get(item_id) or None)
+
+    def get_label(self, item_id):
+        item = pywikibot.ItemPage(self.repo, item_id)
+        return(item.get()['labels']['en'])
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+
+# codes of the answers with which a server asks clients to slow down
+throttling_error_codes = set(["maxlag", "ratelimited", "http-429",
+                              "http-503"])
+
+# the weight of the latest interval in the observed interval
+observed_interval_weight = 0.1
+
+class RateController():
+    """
+    Adapts the interval between the writes of all workers to the
+    feedback of the server (additive increase, multiplicative decrease
+    of the write rate). Each write that is answered within latency_target
+    seconds raises the rate by rate_increase writes per second. A slower
+    answer or a throttling error (maxlag, ratelimited, HTTP 429 or 503)
+    halves it, but only once for all writes that got their slot before
+    the last decrease. Unthrottled writes (an interval of 0) are halved from
+    the rate at which they were observed to start. After a throttling
+    error all writes pause for the Retry-After time of the server or,
+    without one, for an exponential backoff with jitter. The interval
+    stays between min_interval and max_interval seconds.
+
+    A client that paces and retries its requests itself (pywikibot) hides
+    the feedback of the server, so with adaptive False the interval stays
+    fixed and only the pauses after throttling errors are computed.
+    """
+
+    def __init__(self, interval=0, min_interval=0, max_interval=60,
+                 rate_increase=0.05, latency_target=5, backoff_base=5,
+                 max_backoff=300, adaptive=True):
+        self.interval = interval
+        self.adaptive = adaptive
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate_increase = rate_increase
+        self.latency_target = latency_target
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.last_start_time = None
+        self.observed_interval = None
+        self.last_decrease_time = None
+
+    def get_rate(self):
+        """Return the writes per second or None for unthrottled writes."""
+        interval = self.interval
+        if interval == 0:
+            return(None)
+        return(1 / interval)
+
+    def is_throttling_error(self, error):
+        return(getattr(error, "code", None) in throttling_error_codes or
+               type(error).__name__.startswith("Maxlag"))
+
+    def record_start(self, start_time):
+        """Record the time of a write slot. The slots must be recorded in
+        their order.
+        """
+        with self.lock:
+            if self.last_start_time is not None:
+                interval = start_time - self.last_start_time
+                if self.observed_interval is None:
+                    self.observed_interval = interval
+                self.observed_interval += observed_interval_weight * (
+                    interval - self.observed_interval)
+            self.last_start_time = start_time
+
+    def record_success(self, slot_time, latency):
+        """Record a write that got its slot at slot_time and took latency
+        seconds.
+        """
+        if not self.adaptive:
+            return
+        with self.lock:
+            if latency > self.latency_target:
+                self._decrease(slot_time)
+            elif self.interval > 0:
+                self.interval = max(self.min_interval, 1 / (
+                    1 / self.interval + self.rate_increase))
+
+    def record_throttling(self, slot_time, attempt, retry_after=None):
+        """Lower the rate and return the seconds to pause before the
+        next write.
+        """
+        if self.adaptive:
+            with self.lock:
+                self._decrease(slot_time)
+        backoff = min(self.max_backoff, self.backoff_base * 2 ** attempt)
+        pause = random.uniform(backoff / 2, backoff)
+        try:
+            return(max(pause, float(retry_after)))
+        except (TypeError, ValueError):
+            # no Retry-After or an HTTP date instead of seconds
+            return(pause)
+
+    def _decrease(self, slot_time):
+        if (self.last_decrease_time is not None and
+            slot_time < self.last_decrease_time):
+            return
+        interval = self.interval
+        if interval == 0:
+            interval = self.observed_interval or 0
+        # a rate that was too high to be measured starts at 1000 writes/s
+        self.interval = min(self.max_interval, max(
+            2 * interval, 0.001, self.min_interval))
+        self.last_decrease_time = time.monotonic()
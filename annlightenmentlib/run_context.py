@@ -0,0 +1,11 @@
+class RunContext():
+    """
+    Values that are resolved once when the bot starts and are shared by
+    every upload phase: the strain label and the property mapping of the
+    databank.
+    """
+
+    def __init__(self, backend, strain_id, property_dict):
+        self.strain_id = strain_id
+        self.property_dict = property_dict
+        self.strain_name = backend.get_label(strain_id)
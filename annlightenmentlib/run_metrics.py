@@ -0,0 +1,160 @@
+from collections import defaultdict
+import bisect
+import json
+import threading
+import time
+
+# upper bounds of the latency histogram buckets in milliseconds
+histogram_bounds = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000,
+                    10000]
+
+class RunMetrics():
+    """
+    Counts and times every API operation of a run, with a latency
+    histogram per operation, and breaks the operations and the time of
+    the upload tasks down by phase. The time spent waiting for the write
+    throttle and for pauses the server asked for is recorded separately,
+    so a slow upload shows whether it is spent in reads, writes or waits.
+    The write rate that the rate controller chose is kept as well.
+
+    The phase is kept per thread. UploadExecutor passes the phase of the
+    thread that submits a task on to the worker that runs it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.start_time = time.monotonic()
+        self.operations = defaultdict(_get_empty_operation)
+        self.phases = defaultdict(_get_empty_phase)
+        self.waits = defaultdict(_get_empty_wait)
+        self.write_rate = None
+
+    def set_phase(self, phase):
+        self.local.phase = phase
+
+    def get_phase(self):
+        return(getattr(self.local, "phase", "setup"))
+
+    def record_operation(self, operation, seconds):
+        phase = self.get_phase()
+        with self.lock:
+            statistics = self.operations[operation]
+            statistics["calls"] += 1
+            statistics["seconds"] += seconds
+            statistics["max_seconds"] = max(statistics["max_seconds"],
+                                            seconds)
+            statistics["histogram"][bisect.bisect_left(
+                histogram_bounds, seconds * 1000)] += 1
+            phase_statistics = self.phases[phase]
+            phase_statistics["calls"][operation] += 1
+            phase_statistics["call_seconds"] += seconds
+
+    def record_wait(self, reason, seconds):
+        with self.lock:
+            self.waits[reason]["count"] += 1
+            self.waits[reason]["seconds"] += seconds
+
+    def record_rate(self, rate):
+        """Record the writes per second (None for unthrottled writes)."""
+        if rate is None:
+            return
+        with self.lock:
+            if self.write_rate is None:
+                self.write_rate = {"current": rate, "min": rate,
+                                   "max": rate}
+            self.write_rate["current"] = rate
+            self.write_rate["min"] = min(self.write_rate["min"], rate)
+            self.write_rate["max"] = max(self.write_rate["max"], rate)
+
+    def record_task(self, start_time, end_time):
+        with self.lock:
+            phase_statistics = self.phases[self.get_phase()]
+            phase_statistics["tasks"] += 1
+            phase_statistics["task_seconds"] += end_time - start_time
+            if (phase_statistics["first_start"] is None or
+                start_time < phase_statistics["first_start"]):
+                phase_statistics["first_start"] = start_time
+            phase_statistics["last_end"] = max(
+                phase_statistics["last_end"] or end_time, end_time)
+
+    def get_summary(self):
+        with self.lock:
+            operations = {}
+            for operation, statistics in sorted(self.operations.items()):
+                operations[operation] = {
+                    "calls": statistics["calls"],
+                    "seconds": round(statistics["seconds"], 3),
+                    "mean_ms": round(1000 * statistics["seconds"] /
+                                     statistics["calls"], 2),
+                    "max_ms": round(1000 * statistics["max_seconds"], 2),
+                    "histogram_ms": _get_histogram(
+                        statistics["histogram"])}
+            phases = {}
+            for phase, statistics in self.phases.items():
+                elapsed = 0.0
+                if statistics["first_start"] is not None:
+                    elapsed = (statistics["last_end"] -
+                               statistics["first_start"])
+                phases[phase] = {
+                    "calls": dict(statistics["calls"]),
+                    "call_seconds": round(statistics["call_seconds"], 3),
+                    "tasks": statistics["tasks"],
+                    "task_seconds": round(statistics["task_seconds"], 3),
+                    "elapsed_seconds": round(elapsed, 3)}
+            waits = {reason: {"count": wait["count"],
+                              "seconds": round(wait["seconds"], 3)}
+                     for reason, wait in sorted(self.waits.items())}
+            write_rate = None
+            if self.write_rate is not None:
+                write_rate = {bound: round(rate, 3) for bound, rate
+                              in self.write_rate.items()}
+        return({"seconds": round(time.monotonic() - self.start_time, 3),
+                "operations": operations, "phases": phases,
+                "waits": waits, "write_rate": write_rate})
+
+    def print_summary(self):
+        summary = self.get_summary()
+        print("API calls in {:.1f} seconds:".format(summary["seconds"]))
+        for operation, statistics in summary["operations"].items():
+            print(" {} {}: {:.1f} s, mean {} ms, max {} ms".format(
+                statistics["calls"], operation, statistics["seconds"],
+                statistics["mean_ms"], statistics["max_ms"]))
+            print("  latency: {}".format(", ".join(
+                "{} {}".format(count, bound)
+                for bound, count in statistics["histogram_ms"].items())))
+        for reason, wait in summary["waits"].items():
+            print(" waited {:.1f} s for {} ({} times)".format(
+                wait["seconds"], reason, wait["count"]))
+        if summary["write_rate"] is not None:
+            print(" write rate: {current} writes/s (between {min} and "
+                  "{max})".format(**summary["write_rate"]))
+        print("phases:")
+        for phase, statistics in summary["phases"].items():
+            print(" {}: {} tasks in {:.1f} s, {:.1f} s in {} API "
+                  "calls".format(phase, statistics["tasks"],
+                                 statistics["elapsed_seconds"],
+                                 statistics["call_seconds"],
+                                 sum(statistics["calls"].values())))
+
+    def write(self, path_to_metrics):
+        with open(path_to_metrics, "w") as metrics_file:
+            json.dump(self.get_summary(), metrics_file, indent=1)
+
+def _get_empty_operation():
+    return({"calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+            "histogram": [0] * (len(histogram_bounds) + 1)})
+
+def _get_empty_phase():
+    return({"calls": defaultdict(int), "call_seconds": 0.0, "tasks": 0,
+            "task_seconds": 0.0, "first_start": None, "last_end": None})
+
+def _get_empty_wait():
+    return({"count": 0, "seconds": 0.0})
+
+def _get_histogram(counts):
+    """Return the non-empty buckets by their upper bound."""
+    labels = ["<={}".format(bound) for bound in histogram_bounds] + [
+        ">{}".format(histogram_bounds[-1])]
+    return({label: count for label, count in zip(labels, counts)
+            if count > 0})
@@ -0,0 +1,138 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
+import time
+from annlightenmentlib.event_log import log_event
+from annlightenmentlib.rate_controller import RateController
+from annlightenmentlib.run_metrics import RunMetrics
+
+class UploadExecutor():
+    """
+    Runs independent item edits on a pool of worker threads.
+
+    Every single API write goes through write(), which spaces the writes
+    of all workers by the interval of a RateController, starting with
+    put_throttle seconds, and pauses all workers when the server answers
+    with maxlag or another throttling error. Only with adaptive_rate the
+    interval follows the feedback of the server; backends that pace their
+    writes themselves keep put_throttle. The waits, the write rate
+    and the tasks are recorded in the executor's RunMetrics. Completion
+    callbacks run in the thread that calls submit() or join(), so the
+    bookkeeping of the bot never has to be shared between threads.
+    Failed tasks are collected per item instead of stopping the upload.
+    """
+
+    def __init__(self, max_workers=1, put_throttle=0, maxlag_pause=5,
+                 max_retries=5, min_write_interval=0, adaptive_rate=True):
+        self.max_workers = max_workers
+        self.put_throttle = put_throttle
+        self.max_retries = max_retries
+        self.rate_controller = RateController(
+            put_throttle, min_interval=min_write_interval,
+            backoff_base=maxlag_pause, adaptive=adaptive_rate)
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.pending_futures = {}
+        self.failures = []
+        self.throttle_lock = threading.Lock()
+        self.next_write_time = 0.0
+        self.resume_time = 0.0
+        self.metrics = RunMetrics()
+
+    def submit(self, item_key, function, args=(), callback=None,
+               error_callback=None):
+        """Run function(*args) on a worker and, once it is done, call
+        callback(result) or error_callback(error) in the calling thread.
+        """
+        while len(self.pending_futures) >= 2 * self.max_workers:
+            self.process_finished_futures()
+        future = self.thread_pool.submit(
+            self._run_in_phase, self.metrics.get_phase(), function, args)
+        self.pending_futures[future] = (item_key, callback, error_callback)
+        return(future)
+
+    def _run_in_phase(self, phase, function, args):
+        self.metrics.set_phase(phase)
+        start_time = time.monotonic()
+        try:
+            return(function(*args))
+        finally:
+            self.metrics.record_task(start_time, time.monotonic())
+
+    def join(self):
+        """Wait for all submitted tasks and run their callbacks."""
+        while self.pending_futures:
+            self.process_finished_futures()
+
+    def process_finished_futures(self):
+        """Wait until at least one task is done and run the callbacks of
+        all finished tasks.
+        """
+        done_futures, not_done_futures = wait(
+            list(self.pending_futures), return_when=FIRST_COMPLETED)
+        for future in done_futures:
+            item_key, callback, error_callback = self.pending_futures.pop(
+                future)
+            error = future.exception()
+            if error is not None:
+                self.failures.append((item_key, error))
+                print("upload of {} failed: {}".format(item_key, error))
+                log_event("failed", item=str(item_key), error=str(error))
+                if error_callback is not None:
+                    error_callback(error)
+            elif callback is not None:
+                callback(future.result())
+
+    def write(self, function, *args, **kwargs):
+        """Call a single API write once the global throttle allows it and
+        retry it after throttling errors.
+        """
+        for attempt in range(self.max_retries + 1):
+            slot_time = self._wait_for_write_slot()
+            start_time = time.monotonic()
+            try:
+                result = function(*args, **kwargs)
+            except Exception as error:
+                if (attempt == self.max_retries or
+                    not self.rate_controller.is_throttling_error(error)):
+                    raise
+                pause = self.rate_controller.record_throttling(
+                    slot_time, attempt, getattr(error, "retry_after", None))
+                self.metrics.record_rate(self.rate_controller.get_rate())
+                print("server asked to slow down ({}), pausing all uploads "
+                      "for {:.1f} seconds".format(
+                          getattr(error, "code", error), pause))
+                with self.throttle_lock:
+                    self.resume_time = max(
+                        self.resume_time, time.monotonic() + pause)
+                continue
+            self.rate_controller.record_success(
+                slot_time, time.monotonic() - start_time)
+            self.metrics.record_rate(self.rate_controller.get_rate())
+            return(result)
+
+    def _wait_for_write_slot(self):
+        """Wait for the next free write slot and return the time at which
+        it was given out.
+        """
+        with self.throttle_lock:
+            now = time.monotonic()
+            write_time = max(now, self.next_write_time, self.resume_time)
+            self.next_write_time = (write_time +
+                                    self.rate_controller.interval)
+            self.rate_controller.record_start(write_time)
+            reason = "the write throttle"
+            if write_time == self.resume_time:
+                reason = "server pauses"
+        if write_time > now:
+            self.metrics.record_wait(reason, write_time - now)
+            time.sleep(write_time - now)
+        return(now)
+
+    def print_failures(self):
+        if self.failures != []:
+            print("{} uploads failed:".format(len(self.failures)))
+            for item_key, error in self.failures:
+                print(" {}: {}".format(item_key, error))
+
+    def shutdown(self):
+        self.join()
+        self.thread_pool.shutdown()
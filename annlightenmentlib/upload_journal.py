@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+class UploadJournal():
+    """
+    Append-only journal of the uploads that have completed, one JSON line
+    per upload that maps its scheduler key to its result (the QID of a
+    created item). Every line is flushed and fsync'd before the upload
+    counts as done, so an interrupted run can be resumed without
+    repeating finished work.
+    """
+
+    def __init__(self, path_to_journal, strain_id, resume=False):
+        self.path_to_journal = path_to_journal
+        self.strain_id = strain_id
+        self.lock = threading.Lock()
+        self.results = {}
+        if resume and os.path.exists(path_to_journal):
+            self._truncate_incomplete_line()
+        if (resume and os.path.exists(path_to_journal) and
+            os.path.getsize(path_to_journal) > 0):
+            self._read()
+            self.journal_file = open(path_to_journal, "a")
+        else:
+            if (os.path.exists(path_to_journal) and
+                os.path.getsize(path_to_journal) > 0):
+                raise FileExistsError(
+                    "the journal {} of an unfinished upload exists, resume "
+                    "that upload or remove the journal".format(
+                        path_to_journal))
+            self.journal_file = open(path_to_journal, "w")
+            self._write_line({"strain_id": strain_id})
+
+    def _truncate_incomplete_line(self):
+        """Cut off the last line if the run died while writing it."""
+        with open(self.path_to_journal, "rb+") as journal_file:
+            content = journal_file.read()
+            complete_length = content.rfind(b"\n") + 1
+            if complete_length < len(content):
+                journal_file.truncate(complete_length)
+
+    def _read(self):
+        strain_id, self.results = read_journal(self.path_to_journal)
+        if strain_id != self.strain_id:
+            raise ValueError("the journal {} belongs to strain {}".format(
+                self.path_to_journal, strain_id))
+
+    def _write_line(self, record):
+        self.journal_file.write(json.dumps(record) + "\n")
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+    def record(self, key, result):
+        with self.lock:
+            self._write_line({"key": key, "result": result})
+            self.results[key] = result
+
+    def contains(self, key):
+        return(key in self.results)
+
+    def get_result(self, key):
+        return(self.results[key])
+
+    def __len__(self):
+        return(len(self.results))
+
+    def close(self):
+        with self.lock:
+            self.journal_file.close()
+
+    def remove(self):
+        """Delete the journal once the upload has finished completely."""
+        self.close()
+        os.remove(self.path_to_journal)
+
+def read_journal(path_to_journal):
+    """Return the strain ID and the results by key of a journal. An
+    incomplete last line is ignored.
+    """
+    results = {}
+    with open(path_to_journal) as journal_file:
+        header = json.loads(journal_file.readline())
+        for line in journal_file:
+            if not line.endswith("\n"):
+                break
+            record = json.loads(line)
+            results[record["key"]] = record["result"]
+    return(header["strain_id"], results)
+
+def get_journal_key(key):
+    """Return the text form of a scheduler key; GFF entries are written
+    as their GFF line.
+    """
+    def to_list(part):
+        if isinstance(part, tuple):
+            return([to_list(element) for element in part])
+        return(str(part))
+    return(json.dumps(to_list(key)))
@@ -0,0 +1,187 @@
+from collections import defaultdict, deque
+from functools import partial
+from annlightenmentlib.upload_journal import get_journal_key
+
+class UploadScheduler():
+    """
+    Runs the upload as a graph of tasks on an UploadExecutor.
+
+    A task is registered under a key together with the keys it depends
+    on, typically the keys of the items whose QIDs it needs. It is started
+    as soon as all of them are resolved, so links, transcripts and
+    interactions are uploaded while other items are still being created.
+    A key resolves to the result of the upload submitted for it, or to
+    None if that upload was not needed (e.g. because the item already
+    exists). A key whose upload failed is marked as failed instead. Tasks
+    that depend on a failed key are not run and their own key fails as
+    well, so that nothing is uploaded or journaled from partial inputs
+    and a resumed run redoes them.
+
+    Tasks run in the thread that calls run(). Tasks that were waiting for
+    other keys are started before tasks without dependencies, so work that
+    completes a part of the graph is not queued behind the remaining item
+    creations.
+
+    With a journal, every finished upload is recorded under its key and
+    uploads recorded by an earlier run are not repeated; their callbacks
+    run with the recorded result instead.
+
+    A task belongs to the phase that is set in self.phase when it is
+    added, and the API calls of its uploads are counted for that phase.
+    """
+
+    def __init__(self, upload_executor, journal=None):
+        self.upload_executor = upload_executor
+        self.journal = journal
+        self.number_of_resumed_uploads = 0
+        self.results = {}
+        self.failed_keys = set()
+        self.number_of_skipped_tasks = 0
+        self.task_keys = set()
+        self.waiting_tasks = defaultdict(list)
+        self.unlocked_tasks = deque()
+        self.root_tasks = deque()
+        self.phase = None
+
+    def add_task(self, key, dependencies, function):
+        """Call function(*results of dependencies) once all dependencies
+        are resolved. function has to resolve key, either by submit() or
+        by resolve().
+        """
+        self.task_keys.add(key)
+        task = [key, function, list(dependencies),
+                set(dependencies) - set(self.results), self.phase]
+        if task[3] == set():
+            if dependencies == []:
+                self.root_tasks.append(task)
+            else:
+                self.unlocked_tasks.append(task)
+            return
+        for dependency in task[3]:
+            self.waiting_tasks[dependency].append(task)
+
+    def has_task(self, key):
+        return(key in self.task_keys or key in self.results)
+
+    def is_journaled(self, key):
+        return(self.journal is not None and
+               self.journal.contains(get_journal_key(key)))
+
+    def submit(self, key, item_key, function, args=(), callback=None):
+        """Upload in the background; key resolves to the result once
+        callback(result) has run.
+        """
+        if self.journal is not None:
+            journal_key = get_journal_key(key)
+            if self.journal.contains(journal_key):
+                self.number_of_resumed_uploads += 1
+                self._finish(key, callback,
+                             self.journal.get_result(journal_key))
+                return
+            function = partial(self._upload_and_record, journal_key,
+                               function)
+        self.upload_executor.submit(
+            item_key, function, args,
+            lambda result: self._finish(key, callback, result),
+            lambda error: self.fail(key))
+
+    def _upload_and_record(self, journal_key, function, *args):
+        result = function(*args)
+        self.journal.record(journal_key, result)
+        return(result)
+
+    def _finish(self, key, callback, result):
+        if callback is not None:
+            callback(result)
+        self.resolve(key, result)
+
+    def resolve(self, key, value):
+        self.results[key] = value
+        for task in self.waiting_tasks.pop(key, []):
+            task[3].discard(key)
+            if task[3] == set():
+                self.unlocked_tasks.append(task)
+
+    def fail(self, key):
+        """Mark the key as failed; the tasks that depend on it fail too."""
+        self.failed_keys.add(key)
+        self.resolve(key, None)
+
+    def run(self):
+        """Run tasks until the graph is done or only waits for keys
+        that nobody resolves.
+        """
+        while True:
+            if self.unlocked_tasks:
+                self._run_task(self.unlocked_tasks.popleft())
+            elif self.root_tasks:
+                self._run_task(self.root_tasks.popleft())
+            elif self.upload_executor.pending_futures:
+                self.upload_executor.process_finished_futures()
+            else:
+                break
+        if self.number_of_skipped_tasks > 0:
+            print("{} tasks were skipped because uploads they depend on "
+                  "failed".format(self.number_of_skipped_tasks))
+        if self.waiting_tasks:
+            print("{} tasks wait for {} unresolved keys".format(
+                len({id(task) for tasks in self.waiting_tasks.values()
+                     for task in tasks}), len(self.waiting_tasks)))
+
+    def _run_task(self, task):
+        key, function, dependencies, unresolved, phase = task
+        if any(dependency in self.failed_keys for dependency in dependencies):
+            self.number_of_skipped_tasks += 1
+            self.fail(key)
+            return
+        if phase is not None:
+            self.upload_executor.metrics.set_phase(phase)
+        function(*[self.results[dependency] for dependency in dependencies])
+
+class UploadSchedulerScope():
+    """
+    The tasks of one strain in an UploadScheduler that is shared by all
+    strains of a batch. Its keys are prefixed with the strain ID, so that
+    equal keys of different strains (e.g. of identical GFF lines) neither
+    collide in the graph nor in the journal.
+    """
+
+    def __init__(self, scheduler, strain_id):
+        self.scheduler = scheduler
+        self.strain_id = strain_id
+        self.number_of_resumed_uploads = 0
+
+    def _get_key(self, key):
+        return((self.strain_id,) + key)
+
+    @property
+    def phase(self):
+        return(self.scheduler.phase)
+
+    @phase.setter
+    def phase(self, phase):
+        self.scheduler.phase = phase
+
+    def add_task(self, key, dependencies, function):
+        self.scheduler.add_task(
+            self._get_key(key),
+            [self._get_key(dependency) for dependency in dependencies],
+            function)
+
+    def has_task(self, key):
+        return(self.scheduler.has_task(self._get_key(key)))
+
+    def is_journaled(self, key):
+        return(self.scheduler.is_journaled(self._get_key(key)))
+
+    def submit(self, key, item_key, function, args=(), callback=None):
+        if self.is_journaled(key):
+            self.number_of_resumed_uploads += 1
+        self.scheduler.submit(self._get_key(key), item_key, function, args,
+                              callback)
+
+    def resolve(self, key, value):
+        self.scheduler.resolve(self._get_key(key), value)
+
+    def run(self):
+        self.scheduler.run()
@@ -0,0 +1,114 @@
+from collections import defaultdict
+import re
+import threading
+
+class WikiSnapshot():
+    """
+    The items of a strain as they are in the wiki before a sync, read in
+    bulk and indexed by label and description, with their statements
+    reduced to comparable signatures. While the new release is uploaded
+    the snapshot records which items and statements are still wanted;
+    everything else is stale and removed at the end of the sync. Only
+    the items whose description is one the bot gives ("bacterial <type>
+    found in <strain>") count as stale; items curated by hand that link
+    to the strain are left alone.
+    """
+
+    def __init__(self, strain_name):
+        self.own_description = re.compile(
+            "bacterial .+ found in {}$".format(re.escape(strain_name)))
+        self.item_ids = {}
+        self.descriptions = {}
+        self.aliases = {}
+        self.statement_ids = {}
+        self.matched_item_ids = set()
+        self.wanted_signatures = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def add_entity(self, item_id, entity):
+        label = entity.get('labels', {}).get('en', {}).get('value')
+        description = entity.get(
+            'descriptions', {}).get('en', {}).get('value')
+        self.item_ids[(label, description)] = item_id
+        self.descriptions[item_id] = description
+        self.aliases[item_id] = [
+            alias['value'] for alias in entity.get(
+                'aliases', {}).get('en', [])]
+        statement_ids = defaultdict(list)
+        for statements in entity.get('claims', {}).values():
+            for statement in statements:
+                statement_ids[get_statement_signature(statement)].append(
+                    statement.get('id'))
+        self.statement_ids[item_id] = statement_ids
+
+    def __len__(self):
+        return(len(self.statement_ids))
+
+    def get_item_id(self, label, description):
+        return(self.item_ids.get((label, description)))
+
+    def get_aliases(self, item_id):
+        return(self.aliases.get(item_id, []))
+
+    def match(self, item_id):
+        """Claim an existing item for a feature of the new release. An
+        item can only be matched once.
+        """
+        with self.lock:
+            if item_id in self.matched_item_ids:
+                return(False)
+            self.matched_item_ids.add(item_id)
+            return(True)
+
+    def want(self, item_id, signature):
+        """Record that the new release wants the statement and return
+        whether the item already has it.
+        """
+        with self.lock:
+            self.wanted_signatures[item_id].add(signature)
+        return(signature in self.statement_ids.get(item_id, {}))
+
+    def get_stale_statement_ids(self, item_id, properties):
+        """Return the IDs of the item's statements of the given properties
+        that are not wanted.
+        """
+        with self.lock:
+            wanted_signatures = set(self.wanted_signatures[item_id])
+        return([statement_id
+                for signature, statement_ids in self.statement_ids.get(
+                    item_id, {}).items()
+                if signature[0] in properties and
+                signature not in wanted_signatures
+                for statement_id in statement_ids])
+
+    def get_unmatched_item_ids(self):
+        """Return the IDs of the bot's items that no feature matched."""
+        return([item_id for item_id in self.statement_ids
+                if item_id not in self.matched_item_ids and
+                self.own_description.match(
+                    self.descriptions[item_id] or "") is not None])
+
+def get_signature(claim, target, qualifiers=()):
+    """Return a comparable form of a statement: the property, the target
+    and the sorted (qualifier, target) pairs.
+    """
+    return((claim, target, tuple(sorted(qualifiers, key=str))))
+
+def get_statement_signature(statement):
+    mainsnak = statement['mainsnak']
+    qualifiers = [(qualifier_snak['property'], _get_snak_value(qualifier_snak))
+                  for qualifier_snaks in statement.get(
+                      'qualifiers', {}).values()
+                  for qualifier_snak in qualifier_snaks]
+    return(get_signature(mainsnak['property'], _get_snak_value(mainsnak),
+                         qualifiers))
+
+def _get_snak_value(snak):
+    if snak['snaktype'] != 'value':
+        return(None)
+    value = snak['datavalue']['value']
+    if isinstance(value, dict):
+        if 'id' in value:
+            return(value['id'])
+        return("Q{}".format(value['numeric-id']))
+    return(value)
@@ -0,0 +1,58 @@
+class WikibaseAPIError(Exception):
+    """An error returned by the Wikibase API, e.g. maxlag or badtoken."""
+
+    def __init__(self, code, info=None, retry_after=None):
+        Exception.__init__(self, "{}: {}".format(code, info))
+        self.code = code
+        self.info = info
+        self.retry_after = retry_after
+
+class WikibaseBackend():
+    """
+    The API operations BacterialAnnotationBot needs from a Wikibase
+    instance. Every write method performs exactly one API write so that
+    the upload executor can throttle and retry it.
+    """
+
+    def create_item(self, data):
+        """Create an item from entity JSON and return its ID."""
+        raise NotImplementedError
+
+    def edit_entity(self, item_id, data, summary=None):
+        raise NotImplementedError
+
+    def add_claim(self, item_id, claim, target, datatype):
+        """Add a statement. datatype is "wikibase-item" or "string"."""
+        raise NotImplementedError
+
+    def get_entities(self, item_ids, props):
+        """Return a dictionary of entity JSON (without missing entities)
+        for the given IDs.
+        """
+        raise NotImplementedError
+
+    def get_linking_item_ids(self, item_id):
+        """Return the IDs of all items that link to the given item."""
+        raise NotImplementedError
+
+    def delete_item(self, item_id, reason):
+        raise NotImplementedError
+
+    def get_written_revision_id(self, item_id):
+        """Return the revision ID of this backend's last write to the item
+        or None if it is unknown. The wiki is not asked.
+        """
+        return(None)
+
+    def get_label(self, item_id):
+        entities = self.get_entities([item_id], "labels")
+        return(entities[item_id]['labels']['en']['value'])
+
+    def close(self):
+        pass
+
+def get_datavalue(target, datatype):
+    """Return the API value of a statement target."""
+    if datatype == "wikibase-item":
+        return({'entity-type': 'item', 'numeric-id': int(target[1:])})
+    return(target)
@@ -0,0 +1,90 @@
+"""
+Compare the throughput (lines per second) of Gff3Parser with the former
+csv.DictReader based implementation on a synthetic ANNOgesic GFF file.
+
+    $ python3 benchmarks/benchmark_gff3parser.py --megabytes 50
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from annlightenmentlib.gff3parser import Gff3Parser
+from synthetic_data import write_gff
+
+class LegacyGff3Entry(object):
+
+    def __init__(self, entry_dict):
+        self.seq_id = entry_dict["seq_id"]
+        self.source = entry_dict["source"]
+        self.feature = entry_dict["feature"]
+        start, end = sorted([int(entry_dict["start"]), int(entry_dict["end"])])
+        self.start = start
+        self.end = end
+        self.score = entry_dict["score"]
+        self.strand = entry_dict["strand"]
+        self.phase = entry_dict["phase"]
+        self.attributes = self._attributes(entry_dict["attributes"])
+        self.attribute_string = entry_dict["attributes"]
+
+    def _attributes(self, attributes_string):
+        if attributes_string is None:
+            return({})
+        if attributes_string.endswith(";"):
+            attributes_string = attributes_string[:-1]
+        return dict(
+            [key_value_pair.split("=")
+             for key_value_pair in attributes_string.split(";")])
+
+def legacy_entries(input_gff_fh):
+    for entry_dict in csv.DictReader(
+        input_gff_fh, delimiter="\t",
+        fieldnames=["seq_id", "source", "feature", "start",
+                    "end", "score", "strand", "phase", "attributes"]):
+        if entry_dict["seq_id"].startswith("#"):
+            continue
+        yield(LegacyGff3Entry(entry_dict))
+
+def time_parser(entries, path, touch_attributes):
+    start_time = time.perf_counter()
+    number_of_entries = 0
+    with open(path) as gff:
+        for entry in entries(gff):
+            if touch_attributes:
+                entry.attributes["ID"]
+            number_of_entries += 1
+    return(number_of_entries, time.perf_counter() - start_time)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=20,
+                        help="approximate size of the generated GFF file")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    number_of_genes = int(args.megabytes * 1024 * 1024 / 490)
+    gff_fh, gff_path = tempfile.mkstemp(suffix=".gff")
+    os.close(gff_fh)
+    try:
+        write_gff(gff_path, number_of_genes)
+        print("{:.1f} MB, {} genes".format(
+            os.path.getsize(gff_path) / 1024 / 1024, number_of_genes))
+        for name, entries, touch_attributes in [
+                ("csv.DictReader (legacy)", legacy_entries, True),
+                ("Gff3Parser, attributes used", Gff3Parser().entries, True),
+                ("Gff3Parser, attributes unused", Gff3Parser().entries,
+                 False)]:
+            best_time = None
+            for repeat in range(args.repeats):
+                number_of_entries, elapsed = time_parser(
+                    entries, gff_path, touch_attributes)
+                if best_time is None or elapsed < best_time:
+                    best_time = elapsed
+            print("{:<32} {:>12,.0f} lines/s".format(
+                name, number_of_entries / best_time))
+    finally:
+        os.remove(gff_path)
+
+if __name__ == "__main__":
+    main()
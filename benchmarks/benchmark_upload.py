@@ -0,0 +1,103 @@
+"""
+Measure BacterialAnnotationBot.all_features against an in-process mock
+wiki on synthetic ANNOgesic inputs: API calls per feature, client CPU
+time and end-to-end throughput.
+
+    $ python3 benchmarks/benchmark_upload.py --features 1000 10000 \
+          --latency 5 --workers 8 --json upload.json
+
+Compare the JSON files of two releases to find performance regressions.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+from annlightenmentlib.feature_model import FeatureModel
+from annlightenmentlib.upload_executor import UploadExecutor
+from mock_wikibase import MockWikibase
+from synthetic_data import get_number_of_genes, write_csv, write_gff
+
+def run_upload(directory, number_of_features, args):
+    number_of_genes = get_number_of_genes(number_of_features)
+    gff_path = os.path.join(directory, "merge_features.gff")
+    csv_path = os.path.join(directory, "merge.csv")
+    write_gff(gff_path, number_of_genes)
+    write_csv(csv_path, number_of_genes)
+    backend = MockWikibase(args.latency / 1000, args.writes_per_second)
+    upload_executor = UploadExecutor(args.workers,
+                                     maxlag_pause=args.maxlag_pause,
+                                     max_retries=100)
+    start_time = time.perf_counter()
+    start_cpu_time = time.process_time()
+    # the bot reports every edit, which would dominate the CPU time
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            feature_model = FeatureModel().read(gff_path)
+            bot = BacterialAnnotationBot(
+                None, gff_path, csv_path, "Q5", "TillsWiki",
+                feature_model=feature_model,
+                upload_executor=upload_executor, backend=backend)
+            bot.all_features()
+            upload_executor.shutdown()
+    cpu_seconds = time.process_time() - start_cpu_time
+    seconds = time.perf_counter() - start_time
+    summary = upload_executor.metrics.get_summary()
+    number_of_features = len(feature_model.entries)
+    number_of_calls = sum(operation["calls"] for operation in
+                          summary["operations"].values())
+    return({"features": number_of_features,
+            "seconds": round(seconds, 3),
+            "cpu_seconds": round(cpu_seconds, 3),
+            "features_per_second": round(number_of_features / seconds, 1),
+            "calls_per_feature": round(number_of_calls / number_of_features,
+                                       3),
+            "rejected_writes": backend.number_of_rejected_writes,
+            "failures": len(upload_executor.failures),
+            "operations": summary["operations"],
+            "waits": summary["waits"],
+            "write_rate": summary["write_rate"]})
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--features", type=int, nargs="+",
+                        default=[1000, 10000], help="the approximate "
+                        "numbers of GFF features of the runs")
+    parser.add_argument("--latency", type=float, default=0, help="the "
+                        "latency of every API call in milliseconds")
+    parser.add_argument("--writes-per-second", type=int, default=None,
+                        help="answer writes beyond this rate with maxlag")
+    parser.add_argument("--maxlag-pause", type=float, default=0.5,
+                        help="the base of the backoff after maxlag errors "
+                        "in seconds")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", default=None, help="write the results "
+                        "to this file")
+    args = parser.parse_args()
+    results = []
+    print("{:>9} {:>9} {:>9} {:>11} {:>11} {:>9}".format(
+        "features", "seconds", "CPU s", "features/s", "calls/feat.",
+        "rejected"))
+    for number_of_features in args.features:
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_upload(directory, number_of_features, args)
+        results.append(result)
+        print("{:>9} {:>9.2f} {:>9.2f} {:>11.1f} {:>11.3f} {:>9}".format(
+            result["features"], result["seconds"], result["cpu_seconds"],
+            result["features_per_second"], result["calls_per_feature"],
+            result["rejected_writes"]))
+        if result["failures"] > 0:
+            print("{} uploads failed".format(result["failures"]))
+    if args.json is not None:
+        with open(args.json, "w") as json_file:
+            json.dump({"latency_ms": args.latency,
+                       "writes_per_second": args.writes_per_second,
+                       "workers": args.workers, "runs": results},
+                      json_file, indent=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""An in-process Wikibase backend for the benchmarks."""
+import itertools
+import threading
+import time
+from annlightenmentlib.wikibase_backend import WikibaseAPIError, WikibaseBackend
+
+class MockWikibase(WikibaseBackend):
+    """
+    An empty wiki that accepts every write. Each call sleeps for the
+    given latency. With writes_per_second, writes beyond that rate are
+    answered with a maxlag error, like a lagging server would answer.
+    Only counters are kept, so even runs with a million features fit in
+    memory.
+    """
+
+    def __init__(self, latency=0.0, writes_per_second=None):
+        self.latency = latency
+        self.writes_per_second = writes_per_second
+        self.item_numbers = itertools.count(1000)
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.writes_in_window = 0
+        self.number_of_rejected_writes = 0
+
+    def _call(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _write(self):
+        self._call()
+        if self.writes_per_second is None:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start = now
+                self.writes_in_window = 0
+            self.writes_in_window += 1
+            if self.writes_in_window > self.writes_per_second:
+                self.number_of_rejected_writes += 1
+                raise WikibaseAPIError(
+                    "maxlag", "simulated lag",
+                    retry_after=1 - (now - self.window_start))
+
+    def create_item(self, data):
+        self._write()
+        with self.lock:
+            return("Q{}".format(next(self.item_numbers)))
+
+    def edit_entity(self, item_id, data, summary=None):
+        self._write()
+
+    def add_claim(self, item_id, claim, target, datatype):
+        self._write()
+
+    def get_entities(self, item_ids, props):
+        self._call()
+        return({})
+
+    def get_linking_item_ids(self, item_id):
+        self._call()
+        return([])
+
+    def delete_item(self, item_id, reason):
+        self._write()
+
+    def get_label(self, item_id):
+        self._call()
+        return("Staphylococcus aureus NCTC 8325")
@@ -0,0 +1,68 @@
+"""Synthetic ANNOgesic-style input files for the benchmarks."""
+
+def gff_lines(number_of_genes, seq_id="NC_007795.1"):
+    """Yield GFF3 lines with a transcript, TSS, gene and CDS per gene and
+    an sRNA (ncRNA) for every tenth gene.
+    """
+    yield("##gff-version 3\n")
+    for gene_number in range(number_of_genes):
+        start = 100 + gene_number * 1000
+        end = start + 800
+        strand = "+" if gene_number % 2 == 0 else "-"
+        locus_tag = "SAOUHSC_{:05d}".format(gene_number)
+        yield("{}\tANNOgesic\ttranscript\t{}\t{}\t.\t{}\t.\t"
+              "ID=tran{};Name=Transcript_{:05d}\n".format(
+                  seq_id, start - 50, end, strand, gene_number, gene_number))
+        yield("{}\tANNOgesic\tTSS\t{}\t{}\t.\t{}\t.\t"
+              "ID=tss{};Name=TSS:{}_{};Parent=tran{}\n".format(
+                  seq_id, start - 50, start - 50, strand, gene_number,
+                  start - 50, strand, gene_number))
+        yield("{}\tRefSeq\tgene\t{}\t{}\t.\t{}\t.\t"
+              "ID=gene{};Name=gene{};locus_tag={};Parent=tran{}\n".format(
+                  seq_id, start, end, strand, gene_number, gene_number,
+                  locus_tag, gene_number))
+        yield("{}\tRefSeq\tCDS\t{}\t{}\t.\t{}\t0\t"
+              "ID=cds{};Name=YP_{:06d}.1;product=hypothetical protein%2C "
+              "putative;locus_tag={};Parent=gene{};protein_id=YP_{:06d}.1\n"
+              .format(seq_id, start, end, strand, gene_number, gene_number,
+                      locus_tag, gene_number, gene_number))
+        if gene_number % 10 == 0:
+            yield("{}\tANNOgesic\tncRNA\t{}\t{}\t.\t{}\t.\t"
+                  "ID=srna{};Name=sRNA_{:05d}\n".format(
+                      seq_id, end + 20, end + 120, strand, gene_number,
+                      gene_number))
+
+def write_gff(path, number_of_genes):
+    with open(path, "w") as gff:
+        gff.writelines(gff_lines(number_of_genes))
+
+def csv_lines(number_of_genes):
+    """Yield the lines of an ANNOgesic merge CSV with one interaction of
+    every sRNA of gff_lines() with the gene that follows it.
+    """
+    yield("sRNA\tsRNA_position\ttarget_gene_ID\ttarget_locus_tag\t"
+          "target_position\ttarget_strand\tsRNA_interacted_position_RNAplex\t"
+          "target_interacted_position_RNAplex\tsRNA_interacted_position_RNAup\t"
+          "target_interacted_position_RNAup\n")
+    for gene_number in range(0, number_of_genes - 1, 10):
+        end = 100 + gene_number * 1000 + 800
+        target_number = gene_number + 1
+        target_start = 100 + target_number * 1000
+        target_strand = "+" if target_number % 2 == 0 else "-"
+        yield("sRNA_{:05d}\t{}-{}\tgene{}\tSAOUHSC_{:05d}|gene{}\t{}-{}\t{}\t"
+              "{}-{}\t{}-{}\t{}-{}\t{}-{}\n".format(
+                  gene_number, end + 20, end + 120, target_number,
+                  target_number, target_number, target_start,
+                  target_start + 800, target_strand, end + 30, end + 50,
+                  target_start + 10, target_start + 30, end + 31, end + 51,
+                  target_start + 11, target_start + 31))
+
+def write_csv(path, number_of_genes):
+    with open(path, "w") as csv_file:
+        csv_file.writelines(csv_lines(number_of_genes))
+
+def get_number_of_genes(number_of_features):
+    """Return the number of genes for which gff_lines() yields about the
+    given number of features (4.1 per gene).
+    """
+    return(max(1, round(number_of_features / 4.1)))
@@ -7,5 +7,7 @@ mylang = 'en'
 family = 'Name_of_the_Wiki'
 usernames['Name_of_the_Wiki']['en'] = u'Name_of_the_Bot_account'
 console_encoding = 'utf-8'
+# ANNlightenment starts with put_throttle seconds between writes; with
+# --backend asyncio it adapts the interval to the answers of the server
 put_throttle = 1
 sysopnames['Name_of_the_Wiki']['en'] = u'Name_of_the_Bot_account'
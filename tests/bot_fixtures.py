@@ -0,0 +1,130 @@
+from collections import Counter
+import copy
+import itertools
+import os
+import tempfile
+import threading
+import unittest
+from annlightenmentlib.wikibase_backend import WikibaseBackend, get_datavalue
+
+gff_lines = [
+    "##gff-version 3\n",
+    "NC_007795.1\tANNOgesic\ttranscript\t517\t1878\t.\t+\t.\t"
+    "ID=tran0;Name=Transcript_00000\n",
+    "NC_007795.1\tRefSeq\tgene\t517\t1878\t.\t+\t.\t"
+    "ID=gene0;Name=dnaA;locus_tag=SAOUHSC_00001;Parent=tran0\n",
+    "NC_007795.1\tRefSeq\tCDS\t517\t1878\t.\t+\t0\t"
+    "ID=cds0;product=replication initiation protein;"
+    "locus_tag=SAOUHSC_00001;Parent=gene0\n",
+    "NC_007795.1\tANNOgesic\tTSS\t517\t517\t.\t+\t.\t"
+    "ID=tss0;Name=TSS:517_+;Parent=tran0\n",
+    "NC_007795.1\tANNOgesic\tncRNA\t2000\t2100\t.\t-\t.\t"
+    "ID=srna0;Name=sRNA_00000\n"]
+
+csv_content = (
+    "sRNA\tsRNA_position\ttarget_gene_ID\ttarget_locus_tag\t"
+    "target_position\ttarget_strand\tsRNA_interacted_position_RNAplex\t"
+    "target_interacted_position_RNAplex\tsRNA_interacted_position_RNAup\t"
+    "target_interacted_position_RNAup\n"
+    "sRNA_00000\t2000-2100\tgene0\tSAOUHSC_00001|dnaA\t517-1878\t+\t"
+    "2010-2030\t600-620\t2011-2031\t601-621\n")
+
+class InMemoryBackend(WikibaseBackend):
+    """A wiki in a dictionary that applies edits like wbeditentity."""
+
+    def __init__(self):
+        self.entities = {"Q5": {"labels": {"en": {"value": "strain"}},
+                                "claims": {}}}
+        self.writes = Counter()
+        self.item_numbers = itertools.count(100)
+        self.statement_numbers = itertools.count()
+        self.lock = threading.Lock()
+
+    def _get_snak(self, claim, target, datatype):
+        return({"snaktype": "value", "property": claim,
+                "datavalue": {"value": get_datavalue(target, datatype)}})
+
+    def _add_statement(self, item_id, statement):
+        statement = dict(statement, id="{}${}".format(
+            item_id, next(self.statement_numbers)))
+        self.entities[item_id]["claims"].setdefault(
+            statement["mainsnak"]["property"], []).append(statement)
+        return(statement)
+
+    def _apply(self, item_id, data):
+        entity = self.entities[item_id]
+        for field in ["labels", "descriptions"]:
+            if field in data:
+                entity[field] = copy.deepcopy(data[field])
+        for alias in data.get("aliases", {}).get("en", []):
+            entity.setdefault("aliases", {}).setdefault("en", []).append(
+                {"language": "en", "value": alias["value"]})
+        for statement in data.get("claims", []):
+            if "remove" in statement:
+                for statements in entity["claims"].values():
+                    statements[:] = [existing for existing in statements
+                                     if existing["id"] != statement["id"]]
+            else:
+                self._add_statement(item_id, copy.deepcopy(statement))
+
+    def create_item(self, data):
+        with self.lock:
+            item_id = "Q{}".format(next(self.item_numbers))
+            self.entities[item_id] = {"claims": {}}
+            self._apply(item_id, data)
+            self.writes["create_item"] += 1
+        return(item_id)
+
+    def edit_entity(self, item_id, data, summary=None):
+        with self.lock:
+            self._apply(item_id, data)
+            self.writes["edit_entity"] += 1
+
+    def add_claim(self, item_id, claim, target, datatype):
+        with self.lock:
+            self.writes["add_claim"] += 1
+            self._add_statement(item_id, {
+                "mainsnak": self._get_snak(claim, target, datatype)})
+
+    def get_entities(self, item_ids, props):
+        with self.lock:
+            return({item_id: copy.deepcopy(self.entities[item_id])
+                    for item_id in item_ids if item_id in self.entities})
+
+    def get_linking_item_ids(self, item_id):
+        with self.lock:
+            return([linking_item_id
+                    for linking_item_id, entity in self.entities.items()
+                    if any(statement["mainsnak"]["datavalue"]["value"] ==
+                           get_datavalue(item_id, "wikibase-item")
+                           for statements in entity["claims"].values()
+                           for statement in statements)])
+
+    def delete_item(self, item_id, reason):
+        with self.lock:
+            del self.entities[item_id]
+            self.writes["delete_item"] += 1
+
+
+class InputFilesTestCase(unittest.TestCase):
+    """Writes the GFF and interaction file of a test to a temporary
+    directory, whose absolute paths are handed to the bot.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_to_gff = self.get_path("merge_features.gff")
+        self.path_to_csv = self.get_path("merge.csv")
+        self.write_input_files(gff_lines)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_path(self, file_name):
+        return(os.path.join(self.directory.name, file_name))
+
+    def write_input_files(self, lines):
+        with open(self.path_to_gff, "w") as gff:
+            gff.writelines(lines)
+        with open(self.path_to_csv, "w") as csv_file:
+            csv_file.write(csv_content)
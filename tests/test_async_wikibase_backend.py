@@ -0,0 +1,161 @@
+import asyncio
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from annlightenmentlib.async_wikibase_backend import AsyncWikibaseBackend
+from annlightenmentlib.wikibase_backend import WikibaseAPIError
+
+class FakeWikibaseServer():
+    """A tiny stand-in for api.php that keeps its entities in memory."""
+
+    def __init__(self):
+        self.entities = {}
+        self.claims = {}
+        self.connections = 0
+        self.token_requests = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, "127.0.0.1", 0),
+            self.loop).result()
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    async def _close(self):
+        self.server.close()
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers["content-length"]))
+            params = dict(parse_qsl(body.decode()))
+            answer = json.dumps(self._answer(params)).encode()
+            if params["action"] == "wbgetentities":
+                writer.write(b"HTTP/1.1 200 OK\r\n"
+                             b"Transfer-Encoding: chunked\r\n\r\n")
+                for start in range(0, len(answer), 10):
+                    chunk = answer[start:start + 10]
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                writer.write(b"0\r\n\r\n")
+            else:
+                writer.write(b"HTTP/1.1 200 OK\r\nSet-Cookie: session=1; "
+                             b"path=/\r\nContent-Length: %d\r\n\r\n%s" % (
+                                 len(answer), answer))
+            await writer.drain()
+        writer.close()
+
+    def _answer(self, params):
+        action = params["action"]
+        if action == "query" and params.get("meta") == "tokens":
+            self.token_requests += 1
+            return({"query": {"tokens": {"csrftoken": "token+\\",
+                                         "logintoken": "login+\\"}}})
+        if action == "login":
+            return({"login": {"result": "Success"}})
+        if action == "query":
+            backlinks = [{"title": "Item:" + item_id}
+                         for item_id in sorted(self.claims)
+                         if params["bltitle"].split(":")[-1] in
+                         self.claims[item_id].values()]
+            return({"query": {"backlinks": backlinks}})
+        if action == "wbgetentities":
+            entities = {}
+            for item_id in params["ids"].split("|"):
+                if item_id in self.entities:
+                    entities[item_id] = dict(self.entities[item_id],
+                                             title="Item:" + item_id, ns=120)
+                else:
+                    entities[item_id] = {"id": item_id, "missing": ""}
+            return({"entities": entities})
+        if params.get("token") != "token+\\":
+            return({"error": {"code": "badtoken", "info": "Invalid token"}})
+        # writes have to assert the login and be flagged as bot edits
+        if params.get("assert") != "user":
+            return({"error": {"code": "assertuserfailed",
+                              "info": "You are no longer logged in"}})
+        if params.get("bot") != "1":
+            return({"error": {"code": "bot-flag-missing",
+                              "info": "Write without bot flag"}})
+        if action == "wbeditentity":
+            item_id = "Q{}".format(len(self.entities) + 1)
+            self.entities[item_id] = json.loads(params["data"])
+            self.claims[item_id] = {}
+            return({"entity": {"id": item_id, "lastrevid": 100}})
+        if action == "wbcreateclaim":
+            value = json.loads(params["value"])
+            if isinstance(value, dict):
+                value = "Q{}".format(value["numeric-id"])
+            self.claims[params["entity"]][params["property"]] = value
+            return({"claim": {"id": params["entity"] + "$1"},
+                    "pageinfo": {"lastrevid": 101}})
+        if action == "delete":
+            del self.entities[params["title"].split(":")[-1]]
+            return({"delete": {"title": params["title"]}})
+        return({"error": {"code": "unknown_action", "info": action}})
+
+
+class TestAsyncWikibaseBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeWikibaseServer()
+        self.backend = AsyncWikibaseBackend(
+            "http://127.0.0.1:{}/w/api.php".format(self.server.port),
+            "bot", "secret", max_connections=2)
+
+    def tearDown(self):
+        self.backend.close()
+        self.server.stop()
+
+    def _item_data(self, label):
+        return({"labels": {"en": {"language": "en", "value": label}}})
+
+    def test_create_read_and_delete_item(self):
+        item_id = self.backend.create_item(self._item_data("gene0"))
+        self.assertEqual(self.backend.get_label(item_id), "gene0")
+        self.backend.delete_item(item_id, "test")
+        self.assertEqual(self.backend.get_entities([item_id], "labels"), {})
+
+    def test_claim_and_backlinks(self):
+        strain_id = self.backend.create_item(self._item_data("strain"))
+        item_id = self.backend.create_item(self._item_data("gene0"))
+        self.backend.add_claim(item_id, "P8", strain_id, "wikibase-item")
+        self.assertEqual(self.backend.get_written_revision_id(item_id), 101)
+        self.assertEqual(self.server.claims[item_id], {"P8": strain_id})
+        self.assertEqual(self.backend.get_linking_item_ids(strain_id),
+                         [item_id])
+
+    def test_concurrent_writes_share_connections_and_token(self):
+        with ThreadPoolExecutor(max_workers=8) as thread_pool:
+            item_ids = list(thread_pool.map(
+                lambda number: self.backend.create_item(
+                    self._item_data("gene{}".format(number))), range(20)))
+        self.assertEqual(len(set(item_ids)), 20)
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertEqual(self.server.token_requests, 2)
+
+    def test_api_error(self):
+        with self.assertRaises(WikibaseAPIError) as context:
+            self.backend._run(self.backend.client.write(
+                {"action": "unknown"}))
+        self.assertEqual(context.exception.code, "unknown_action")
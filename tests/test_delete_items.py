@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+from annlightenmentlib.delete_items import DeleteItems
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_journal import UploadJournal, get_journal_key
+from annlightenmentlib.wikibase_backend import WikibaseAPIError, WikibaseBackend
+
+def get_found_in_taxon_claims(strain_id):
+    return({"P8": [{"mainsnak": {
+        "snaktype": "value", "property": "P8",
+        "datavalue": {"value": {"entity-type": "item",
+                                "numeric-id": int(strain_id[1:])}}}}]})
+
+class DeletionBackend(WikibaseBackend):
+
+    def __init__(self):
+        self.entities = {"Q1": {"claims": get_found_in_taxon_claims("Q5")},
+                         "Q2": {"claims": get_found_in_taxon_claims("Q5")},
+                         "Q3": {"claims": get_found_in_taxon_claims("Q6")},
+                         "Q4": {"claims": get_found_in_taxon_claims("Q5")}}
+
+    def get_linking_item_ids(self, item_id):
+        return(sorted(self.entities))
+
+    def get_entities(self, item_ids, props):
+        return({item_id: self.entities[item_id] for item_id in item_ids
+                if item_id in self.entities})
+
+    def delete_item(self, item_id, reason):
+        if item_id == "Q4":
+            raise WikibaseAPIError("permissiondenied")
+        if item_id not in self.entities:
+            raise WikibaseAPIError("missingtitle")
+        del self.entities[item_id]
+
+class TestDeleteItems(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = DeletionBackend()
+        self.upload_executor = UploadExecutor(max_workers=2)
+        self.deletion = DeleteItems(self.backend, self.upload_executor)
+
+    def tearDown(self):
+        self.upload_executor.shutdown()
+        self.directory.cleanup()
+
+    def test_items_of_strain(self):
+        self.assertEqual(self.deletion.get_item_ids_of_strain("Q5", "P8"),
+                         ["Q1", "Q2", "Q4"])
+
+    def test_items_from_journal(self):
+        path_to_journal = os.path.join(self.directory.name, "journal")
+        journal = UploadJournal(path_to_journal, "Q5")
+        journal.record(get_journal_key(("item", "gene0")), "Q1")
+        journal.record(get_journal_key(("link", "gene0", "cds0")), None)
+        journal.record(get_journal_key(("part of", ("item", "gene0"))), "Q1")
+        journal.record(get_journal_key(("transcript", "tran0")), "Q2")
+        journal.close()
+        self.assertEqual(
+            self.deletion.get_item_ids_from_journal(path_to_journal),
+            ["Q1", "Q2"])
+
+    def test_items_from_logfile(self):
+        path_to_logfile = os.path.join(self.directory.name, "log")
+        with open(path_to_logfile, "w") as logfile:
+            logfile.write("INFO:root:created sRNA gene item with ID Q1\n"
+                          "INFO:root:created interaction(RNAup) between "
+                          "ncRNA Q1 and transcript Q2\n"
+                          "INFO:root:created transcript item with ID Q2\n")
+        self.assertEqual(
+            self.deletion.get_item_ids_from_logfile(path_to_logfile),
+            ["Q1", "Q2"])
+
+    def test_results_per_item(self):
+        results = self.deletion.delete(["Q1", "Q4", "Q7"])
+        self.assertEqual(results["Q1"], ("deleted", None))
+        self.assertEqual(results["Q7"], ("missing", None))
+        self.assertEqual(results["Q4"][0], "failed")
+        self.assertEqual(self.deletion.get_counts(),
+                         {"deleted": 1, "missing": 1, "failed": 1})
+        path_to_report = os.path.join(self.directory.name, "report")
+        self.deletion.write_report(path_to_report)
+        with open(path_to_report) as report:
+            records = {record["item_id"]: record for record in map(
+                json.loads, report)}
+        self.assertEqual(records["Q1"], {"item_id": "Q1", "result": "deleted"})
+        self.assertEqual(records["Q4"]["error"], "permissiondenied: None")
+        self.assertEqual(sorted(self.backend.entities), ["Q2", "Q3", "Q4"])
@@ -0,0 +1,40 @@
+import unittest
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+
+class TestEntityData(unittest.TestCase):
+
+    def setUp(self):
+        self.bot = BacterialAnnotationBot.__new__(BacterialAnnotationBot)
+
+    def test_data_for_new_item_with_claims(self):
+        data = self.bot._get_data_for_new_item_with_claims(
+            "strain gene0", "bacterial gene found in strain", "dnaA",
+            [("P8", "Q5"), ("P6", "Q254")], [("P9", "100")])
+        self.assertEqual(data['labels']['en']['value'], "strain gene0")
+        self.assertEqual(data['aliases'],
+                         {'en': [{'language': 'en', 'value': 'dnaA'}]})
+        self.assertEqual(len(data['claims']), 3)
+        self.assertEqual(data['claims'][1], {
+            'mainsnak': {
+                'snaktype': 'value',
+                'property': 'P6',
+                'datavalue': {
+                    'value': {
+                        'entity-type': 'item',
+                        'numeric-id': 254
+                    },
+                    'type': 'wikibase-entityid'
+                }
+            },
+            'type': 'statement',
+            'rank': 'normal'
+        })
+        self.assertEqual(data['claims'][2]['mainsnak']['datavalue'],
+                         {'value': '100', 'type': 'string'})
+
+    def test_data_for_new_item_without_alias_and_claims(self):
+        data = self.bot._get_data_for_new_item_with_claims(
+            "strain gene0", "bacterial gene found in strain", None, [], [])
+        self.assertEqual(
+            data, self.bot._get_data_for_new_item(
+                "strain gene0", "bacterial gene found in strain"))
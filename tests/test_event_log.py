@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from annlightenmentlib.delete_items import DeleteItems
+from annlightenmentlib.event_log import EventLog, log_event
+from annlightenmentlib.upload_executor import UploadExecutor
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_to_log = os.path.join(self.directory.name, "events.log")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_events_of_all_threads_are_written(self):
+        event_log = EventLog(self.path_to_log)
+        threads = [threading.Thread(
+            target=log_event, args=("created",),
+            kwargs={"item_type": "gene", "item_id": "Q{}".format(number)})
+                   for number in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log_event("skipped", reason="item exists", label="strain gene0")
+        event_log.close()
+        log_event("created", item_type="gene", item_id="Q99")
+        with open(self.path_to_log) as log_file:
+            events = [json.loads(line) for line in log_file]
+        self.assertEqual(len(events), 11)
+        self.assertEqual(events[-1]["event"], "skipped")
+        self.assertEqual(events[-1]["label"], "strain gene0")
+        self.assertEqual(
+            sorted(DeleteItems(None, UploadExecutor()).get_item_ids_from_logfile(
+                self.path_to_log)),
+            sorted("Q{}".format(number) for number in range(10)))
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import json
+import os
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+from annlightenmentlib.export_backend import ExportBackend
+from annlightenmentlib.upload_executor import UploadExecutor
+from bot_fixtures import InputFilesTestCase, gff_lines
+
+class TestExportBackend(InputFilesTestCase):
+
+    def setUp(self):
+        InputFilesTestCase.setUp(self)
+        self.write_input_files([line for line in gff_lines
+                                if "ID=tss0" not in line])
+        self.backend = ExportBackend({"Q5": "strain"})
+        upload_executor = UploadExecutor()
+        bot = BacterialAnnotationBot(
+            None, self.path_to_gff, self.path_to_csv, "Q5", "TillsWiki",
+            upload_executor=upload_executor, backend=self.backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.all_features()
+        upload_executor.shutdown()
+
+    def _get_entity(self, entities, label):
+        return([entity for entity in entities
+                if entity["labels"]["en"]["value"] == label][0])
+
+    def test_entities_with_resolved_references(self):
+        path_to_ndjson = self.get_path("export.ndjson")
+        self.backend.write_ndjson(path_to_ndjson, first_item_id="Q100")
+        with open(path_to_ndjson) as ndjson:
+            entities = [json.loads(line) for line in ndjson]
+        # gene, protein, sRNA and its gene and the two transcripts
+        self.assertEqual(len(entities), 6)
+        self.assertEqual([entity["id"] for entity in entities],
+                         ["Q{}".format(100 + number) for number in range(6)])
+        gene = self._get_entity(entities, "strain gene0")
+        protein = self._get_entity(entities, "strain cds0")
+        self.assertEqual(
+            gene["claims"]["P25"][0]["mainsnak"]["datavalue"]["value"][
+                "numeric-id"], int(protein["id"][1:]))
+        transcript = self._get_entity(entities, "strain tran0 517 1878")
+        interactions = transcript["claims"]["P15"]
+        self.assertEqual(len(interactions), 2)
+        self.assertEqual(sorted(interactions[0]["qualifiers"]),
+                         ["P10", "P29", "P9"])
+
+    def test_quickstatements_add_cross_references_last(self):
+        path_to_batch = self.get_path("export.qs")
+        self.backend.write_quickstatements(path_to_batch)
+        with open(path_to_batch) as batch:
+            lines = batch.read().splitlines()
+        self.assertEqual(lines.count("CREATE"), 6)
+        last_create = len(lines) - lines[::-1].index("CREATE") - 1
+        cross_references = [line for line in lines if "Q-" in line]
+        self.assertTrue(all(lines.index(line) > last_create
+                            for line in cross_references))
+        self.assertIn('Q-3\tP15\tQ-4\tP9\t"2010"\tP10\t"2030"\tP29\tQ357',
+                      "\n".join(cross_references))
+
+    def test_quickstatements_reject_unquotable_labels(self):
+        path_to_batch = self.get_path("export.qs")
+        self.backend.edit_entity("Q-1", {"labels": {"en": {
+            "language": "en", "value": 'a "quoted"\tlabel'}}})
+        with self.assertRaisesRegex(ValueError, "Len .* item Q-1"):
+            self.backend.write_quickstatements(path_to_batch)
+        self.assertFalse(os.path.exists(path_to_batch))
+
+    def test_quickstatements_reject_unquotable_strings(self):
+        path_to_batch = self.get_path("export.qs")
+        self.backend.add_claim("Q-2", "P9", "line\nbreak", "string")
+        with self.assertRaisesRegex(ValueError, "P9 .* item Q-2"):
+            self.backend.write_quickstatements(path_to_batch)
+        self.assertFalse(os.path.exists(path_to_batch))
+
+    def test_writes_to_other_items_are_rejected(self):
+        self.backend.add_claim("Q-1", "P8", "Q5", "wikibase-item")
+        for item_id in ["Q1", "Q5", "Q-0", "Q-7", "Q-x"]:
+            with self.assertRaises(ValueError):
+                self.backend.add_claim(item_id, "P8", "Q5", "wikibase-item")
+        with self.assertRaises(ValueError):
+            self.backend.delete_item("Q-1", "not part of the release")
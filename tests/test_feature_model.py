@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from annlightenmentlib.feature_model import FeatureModel
+
+gff_content = (
+    "##gff-version 3\n"
+    "NC_007795.1\tANNOgesic\ttranscript\t517\t1878\t.\t+\t.\t"
+    "ID=tran0;Name=Transcript_00000\n"
+    "NC_007795.1\tRefSeq\tgene\t517\t1878\t.\t+\t.\t"
+    "ID=gene0;Name=dnaA;locus_tag=SAOUHSC_00001;Parent=tran0\n"
+    "NC_007795.1\tRefSeq\tCDS\t517\t1878\t.\t+\t0\t"
+    "ID=cds0;product=replication initiation protein;"
+    "locus_tag=SAOUHSC_00001;Parent=gene0\n"
+    "NC_007795.1\tRefSeq\texon\t517\t1878\t.\t+\t.\tID=exon0\n"
+    "NC_007795.1\tANNOgesic\tTSS\t517\t517\t.\t+\t.\t"
+    "ID=tss0;Name=TSS:517_+;Parent=tran0\n")
+
+class TestFeatureModel(unittest.TestCase):
+
+    def setUp(self):
+        gff_fh, self.gff_path = tempfile.mkstemp(suffix=".gff")
+        with os.fdopen(gff_fh, "w") as gff:
+            gff.write(gff_content)
+        self.feature_model = FeatureModel().read(self.gff_path)
+
+    def tearDown(self):
+        os.remove(self.gff_path)
+
+    def test_grouped_by_feature(self):
+        self.assertEqual(len(self.feature_model.entries), 4)
+        self.assertEqual(self.feature_model.count("gene"), 1)
+        self.assertEqual(self.feature_model.count("exon"), 0)
+        self.assertEqual(
+            [entry.feature for entry in self.feature_model.entries_of(
+                ["gene", "TSS", "transcript"])],
+            ["transcript", "gene", "TSS"])
+
+    def test_parent_links(self):
+        self.assertEqual(
+            [entry.attributes["ID"]
+             for entry in self.feature_model.get_children("tran0")],
+            ["gene0", "tss0"])
+        self.assertEqual(
+            [entry.attributes["ID"]
+             for entry in self.feature_model.get_children("gene0")],
+            ["cds0"])
+
+    def test_validate(self):
+        self.assertEqual(self.feature_model.validate(), [])
+        self.feature_model.entries[1].attributes.pop("locus_tag")
+        self.feature_model.entries[3].strand = "."
+        self.assertEqual(len(self.feature_model.validate()), 2)
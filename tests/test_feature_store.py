@@ -0,0 +1,33 @@
+import unittest
+from annlightenmentlib.feature_store import FeatureStore
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.feature_store = FeatureStore()
+
+    def _add(self, item_id, feature_type, locus_tag, parents=["NA"],
+             entry_id="NA", item_alias=None, start=1, end=10):
+        self.feature_store.add(
+            item_id, feature_type, locus_tag, parents, start, end, "Q11",
+            "strain " + entry_id, entry_id, item_alias)
+
+    def test_id_locus_tag_dict(self):
+        self._add("Q1", "ncRNA", "NA", entry_id="srna0", item_alias="sRNA1")
+        self.assertEqual(
+            self.feature_store.id_locus_tag_dict["Q1"]["item_alias"], "sRNA1")
+
+    def test_interaction_lookups(self):
+        self._add("Q1", "gene", "SAOUHSC_00001", entry_id="gene0")
+        self._add("Q2", "ncRNA", "NA", entry_id="srna0", item_alias="sRNA1",
+                  start=100, end=180)
+        self.feature_store.add_part_of_link("Q1", "Q3")
+        self.feature_store.add_part_of_link("Q1", "Q4")
+        self.assertEqual(
+            self.feature_store.get_gene_ids("SAOUHSC_00001", "gene0"), ["Q1"])
+        self.assertEqual(self.feature_store.get_transcripts("Q1"),
+                         ["Q3", "Q4"])
+        self.assertEqual(
+            self.feature_store.get_ncRNA_id("sRNA1", "100", "180"), "Q2")
+        self.assertIsNone(
+            self.feature_store.get_ncRNA_id("sRNA1", "100", "181"))
@@ -0,0 +1,70 @@
+import gzip
+import io
+import os
+import tempfile
+import threading
+import unittest
+from annlightenmentlib.gff3parser import Gff3Parser
+
+class TestGff3Parser(unittest.TestCase):
+
+    def test_entries(self):
+        gff = io.StringIO(
+            "##gff-version 3\n"
+            "NC_007795.1\tRefSeq\tCDS\t1878\t517\t.\t+\t0\t"
+            "ID=cds0;product=protein%2C putative%3B 2;locus_tag=SAOUHSC_1;\n"
+            "\n"
+            "NC_007795.1\tANNOgesic\tTSS\t517\t517\t.\t+\t.\t.\n")
+        entries = list(Gff3Parser().entries(gff))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual((entries[0].start, entries[0].end), (517, 1878))
+        self.assertEqual(entries[0].attributes, {
+            "ID": "cds0", "product": "protein, putative; 2",
+            "locus_tag": "SAOUHSC_1"})
+        self.assertEqual(entries[1].attributes, {})
+        self.assertEqual(str(entries[1]),
+                         "NC_007795.1\tANNOgesic\tTSS\t517\t517\t.\t+\t.\t.")
+
+    def test_entries_from_file(self):
+        gff_content = (
+            "##gff-version 3\n"
+            "NC_007795.1\tRefSeq\tgene\t517\t1878\t.\t+\t.\tID=gene0\n"
+            "###\n"
+            "NC_007795.1\tRefSeq\tgene\t2156\t3289\t.\t+\t.\tID=gene1\n"
+            "##FASTA\n"
+            ">NC_007795.1\n"
+            "CGATCTTTTTTCGATCTTTTTTCGATCTTTTTTCGATCTTTTTTCGAT\n")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plain_path = os.path.join(tmp_dir, "annotation.gff")
+            with open(plain_path, "w") as gff:
+                gff.write(gff_content)
+            gzip_path = os.path.join(tmp_dir, "annotation.gff.gz")
+            with gzip.open(gzip_path, "wt") as gff:
+                gff.write(gff_content)
+            empty_path = os.path.join(tmp_dir, "empty.gff")
+            open(empty_path, "w").close()
+            for path in [plain_path, gzip_path]:
+                self.assertEqual(
+                    [entry.attributes["ID"] for entry in
+                     Gff3Parser().entries_from_file(path)],
+                    ["gene0", "gene1"])
+            self.assertEqual(
+                list(Gff3Parser().entries_from_file(empty_path)), [])
+            # a pipe like <(zcat annotation.gff.gz) has no size
+            fifo_path = os.path.join(tmp_dir, "annotation.fifo")
+            for content in [gff_content.encode(),
+                            gzip.compress(gff_content.encode())]:
+                os.mkfifo(fifo_path)
+                writer = threading.Thread(
+                    target=_write_to_fifo, args=(fifo_path, content))
+                writer.start()
+                self.assertEqual(
+                    [entry.attributes["ID"] for entry in
+                     Gff3Parser().entries_from_file(fifo_path)],
+                    ["gene0", "gene1"])
+                writer.join()
+                os.remove(fifo_path)
+
+def _write_to_fifo(path_to_fifo, content):
+    with open(path_to_fifo, "wb") as fifo:
+        fifo.write(content)
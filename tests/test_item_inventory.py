@@ -0,0 +1,118 @@
+from collections import Counter
+import contextlib
+import io
+import unittest
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+from annlightenmentlib.item_inventory import ItemInventory
+from annlightenmentlib.label_cache import LabelCache
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+def get_entity(label, description, strain_id, revision_id):
+    return({"labels": {"en": {"value": label}},
+            "descriptions": {"en": {"value": description}},
+            "lastrevid": revision_id,
+            "claims": {"P8": [{"mainsnak": {
+                "snaktype": "value", "property": "P8",
+                "datavalue": {"value": {
+                    "entity-type": "item",
+                    "numeric-id": int(strain_id[1:])}}}}]}})
+
+class StrainWiki(WikibaseBackend):
+    """Items of the strain Q5 and one item of another strain."""
+
+    def __init__(self):
+        self.entities = {
+            "Q5": {"labels": {"en": {"value": "strain"}}},
+            "Q1": get_entity("strain gene0", "bacterial gene", "Q5", 10),
+            "Q2": get_entity("strain gene1", "bacterial gene", "Q5", 11),
+            "Q3": get_entity("other gene0", "bacterial gene", "Q6", 12)}
+        self.calls = Counter()
+        self.read_item_ids = []
+
+    def create_item(self, data):
+        item_id = "Q{}".format(len(self.entities) + 10)
+        self.entities[item_id] = get_entity(
+            data["labels"]["en"]["value"],
+            data["descriptions"]["en"]["value"], "Q5", 20)
+        return(item_id)
+
+    def get_written_revision_id(self, item_id):
+        return(self.entities[item_id]["lastrevid"])
+
+    def get_entities(self, item_ids, props):
+        self.calls["get_entities"] += 1
+        if "claims" in props:
+            self.read_item_ids.extend(item_ids)
+        return({item_id: self.entities[item_id] for item_id in item_ids
+                if item_id in self.entities})
+
+    def get_linking_item_ids(self, item_id):
+        self.calls["get_linking_item_ids"] += 1
+        return(sorted(item_id for item_id in self.entities
+                      if item_id != "Q5"))
+
+class TestItemInventory(unittest.TestCase):
+
+    def test_labels_with_several_descriptions(self):
+        item_inventory = ItemInventory()
+        item_inventory.add("dnaA", "bacterial gene", "Q1")
+        item_inventory.add("dnaA", "bacterial transcript", "Q2")
+        item_inventory.add("dnaA", "bacterial gene", "Q1")
+        self.assertEqual(len(item_inventory), 2)
+        self.assertTrue(item_inventory.contains("dnaA", "bacterial gene"))
+        self.assertFalse(item_inventory.contains("dnaA", "protein"))
+        self.assertEqual(item_inventory.get_item_id(
+            "dnaA", "bacterial transcript"), "Q2")
+        self.assertIsNone(item_inventory.get_item_id("dnaB",
+                                                     "bacterial gene"))
+
+    def _get_bot(self, backend, label_cache):
+        bot = BacterialAnnotationBot(
+            None, "merge_features.gff", "merge.csv", "Q5", "TillsWiki",
+            label_cache=label_cache, upload_executor=UploadExecutor(),
+            backend=backend)
+        backend.calls.clear()
+        return(bot)
+
+    def _load_item_inventory(self, backend, label_cache):
+        bot = self._get_bot(backend, label_cache)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return(bot._load_item_inventory())
+
+    def test_cold_and_warm_label_cache(self):
+        backend = StrainWiki()
+        label_cache = LabelCache(":memory:")
+        item_inventory = self._load_item_inventory(backend, label_cache)
+        self.assertEqual(len(item_inventory), 2)
+        self.assertEqual(item_inventory.get_item_id("strain gene1",
+                                                    "bacterial gene"), "Q2")
+        self.assertEqual(label_cache.get_revision_ids("Q5"),
+                         {"Q1": 10, "Q2": 11})
+        # the warm cache checks the revisions of the cached items and reads
+        # only changed items and items linked since
+        backend.entities["Q2"] = get_entity("strain gene1", "bacterial gene",
+                                            "Q5", 13)
+        backend.entities["Q4"] = get_entity("strain gene2", "bacterial gene",
+                                            "Q5", 14)
+        item_inventory = self._load_item_inventory(backend, label_cache)
+        self.assertEqual(len(item_inventory), 3)
+        self.assertEqual(backend.calls, Counter({"get_linking_item_ids": 1,
+                                                 "get_entities": 2}))
+        self.assertEqual(label_cache.get_revision_ids("Q5"),
+                         {"Q1": 10, "Q2": 13, "Q4": 14})
+        label_cache.close()
+
+    def test_items_created_by_the_bot_are_not_read_again(self):
+        backend = StrainWiki()
+        label_cache = LabelCache(":memory:")
+        self._load_item_inventory(backend, label_cache)
+        bot = self._get_bot(backend, label_cache)
+        bot._get_item_inventory()
+        item_id = bot._create_new_item("strain gene2", "bacterial gene")
+        self.assertEqual(label_cache.get_revision_ids("Q5")[item_id], 20)
+        backend.read_item_ids = []
+        self._load_item_inventory(backend, label_cache)
+        # only the item of the other strain, which is never cached, is read
+        self.assertEqual(backend.read_item_ids, ["Q3"])
+        label_cache.close()
@@ -0,0 +1,40 @@
+import unittest
+from annlightenmentlib.label_cache import LabelCache
+
+class TestLabelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.label_cache = LabelCache(":memory:")
+
+    def tearDown(self):
+        self.label_cache.close()
+
+    def test_items_of_strain(self):
+        self.label_cache.add_items([
+            ("Q1", "strain gene0", "bacterial gene found in strain", "Q5", 3),
+            ("Q2", "other gene0", "bacterial gene found in other", "Q6", 4)])
+        self.assertTrue(self.label_cache.has_items("Q5"))
+        self.assertFalse(self.label_cache.has_items("Q7"))
+        self.assertEqual(
+            self.label_cache.get_items("Q5"),
+            [("Q1", "strain gene0", "bacterial gene found in strain")])
+        self.assertEqual(self.label_cache.get_revision_ids("Q6"), {"Q2": 4})
+
+    def test_search_result_keeps_strain(self):
+        self.label_cache.add_item("Q1", "strain gene0", "description", "Q5",
+                                  3)
+        self.label_cache.add_item("Q1", "strain gene0", "description")
+        self.assertEqual(self.label_cache.get_revision_ids("Q5"), {"Q1": 3})
+
+    def test_revision_of_later_edit(self):
+        self.label_cache.add_item("Q1", "strain gene0", "description", "Q5",
+                                  3)
+        self.label_cache.set_revision_id("Q1", 7)
+        self.label_cache.set_revision_id("Q1", 5)
+        self.label_cache.set_revision_id("Q1", None)
+        self.assertEqual(self.label_cache.get_revision_ids("Q5"), {"Q1": 7})
+
+    def test_remove_items(self):
+        self.label_cache.add_item("Q1", "strain gene0", "description", "Q5")
+        self.label_cache.remove_items(["Q1"])
+        self.assertFalse(self.label_cache.has_items("Q5"))
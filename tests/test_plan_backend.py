@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+from annlightenmentlib.plan_backend import PlanBackend
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_scheduler import (UploadScheduler,
+                                                UploadSchedulerScope)
+from bot_fixtures import InputFilesTestCase
+
+class TestPlanBackend(InputFilesTestCase):
+
+    def test_plan_of_whole_upload(self):
+        path_to_plan = self.get_path("plan.jsonl")
+        backend = PlanBackend(path_to_plan, put_throttle=2)
+        upload_executor = UploadExecutor()
+        bot = BacterialAnnotationBot(
+            None, self.path_to_gff, self.path_to_csv, "Q5", "TillsWiki",
+            upload_executor=upload_executor, backend=backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.all_features()
+        upload_executor.shutdown()
+        summary = backend.close()
+        with open(path_to_plan) as plan:
+            records = [json.loads(line) for line in plan]
+        self.assertEqual(records[-1], summary)
+        # gene, protein, TSS, sRNA and its gene, ANNOgesic transcript and
+        # RefSeq transcript of the sRNA
+        self.assertEqual(summary["writes"]["create_item"], 7)
+        self.assertEqual(summary["items"]["bacterial transcript"], 2)
+        # two gene-product links
+        self.assertEqual(summary["writes"]["add_claim"], 2 * 2)
+        # part of claims of gene, TSS and sRNA and one edit each with the
+        # RNAplex and RNAup interaction statements of sRNA and transcript
+        self.assertEqual(summary["writes"]["edit_entity"], 3 + 2)
+        interactions = [record for record in records
+                        if record["op"] == "edit_entity" and
+                        record["summary"] == "Adding sRNA interactions."]
+        self.assertEqual([len(record["data"]["claims"])
+                          for record in interactions], [2, 2])
+        self.assertEqual(len(interactions[0]["data"]["claims"][0][
+            "qualifiers"]), 3)
+        self.assertEqual(summary["minimum_seconds"],
+                         2 * sum(summary["writes"].values()))
+        transcript = [record for record in records
+                      if record["op"] == "create_item" and
+                      record["data"]["labels"]["en"]["value"] ==
+                      "Q5 tran0 517 1878"][0]
+        self.assertEqual(len(transcript["data"]["claims"]), 7 + 2)
+
+    def test_plan_of_batch_with_identical_inputs(self):
+        path_to_plan = self.get_path("plan.jsonl")
+        backend = PlanBackend(path_to_plan)
+        upload_executor = UploadExecutor(max_workers=2)
+        scheduler = UploadScheduler(upload_executor)
+        bots = [BacterialAnnotationBot(
+            None, self.path_to_gff, self.path_to_csv, strain_id,
+            "TillsWiki",
+            upload_executor=upload_executor, backend=backend,
+            scheduler=UploadSchedulerScope(scheduler, strain_id))
+                for strain_id in ["Q5", "Q6"]]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for bot in bots:
+                bot.schedule_all_features()
+            scheduler.run()
+        upload_executor.shutdown()
+        summary = backend.close()
+        self.assertEqual(summary["writes"]["create_item"], 2 * 7)
+        self.assertEqual(summary["writes"]["edit_entity"], 2 * (3 + 2))
+        self.assertEqual([bot.number_of_uploaded_items["interactions"]
+                          for bot in bots], [1, 1])
@@ -0,0 +1,80 @@
+import time
+import unittest
+from annlightenmentlib.rate_controller import RateController
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.wikibase_backend import WikibaseAPIError
+
+class TestRateController(unittest.TestCase):
+
+    def test_rate_rises_additively_and_halves(self):
+        rate_controller = RateController(1, rate_increase=0.5,
+                                         latency_target=2)
+        rate_controller.record_success(0, 0.1)
+        rate_controller.record_success(0, 0.1)
+        self.assertAlmostEqual(rate_controller.get_rate(), 2)
+        rate_controller.record_success(time.monotonic(), 3)
+        self.assertAlmostEqual(rate_controller.get_rate(), 1)
+        rate_controller.record_throttling(time.monotonic(), 0)
+        self.assertAlmostEqual(rate_controller.get_rate(), 0.5)
+
+    def test_rate_is_halved_once_for_writes_sent_together(self):
+        rate_controller = RateController(0.5)
+        start_time = time.monotonic()
+        rate_controller.record_throttling(start_time, 0)
+        rate_controller.record_throttling(start_time, 0)
+        self.assertEqual(rate_controller.interval, 1)
+
+    def test_interval_stays_within_its_bounds(self):
+        rate_controller = RateController(0.5, min_interval=0.4,
+                                         max_interval=0.8, rate_increase=10)
+        rate_controller.record_success(0, 0.1)
+        self.assertEqual(rate_controller.interval, 0.4)
+        for attempt in range(3):
+            rate_controller.record_throttling(time.monotonic(), attempt)
+        self.assertEqual(rate_controller.interval, 0.8)
+
+    def test_unthrottled_writes_are_halved_from_their_observed_rate(self):
+        rate_controller = RateController()
+        for start_time in [0, 0.1, 0.2, 0.3]:
+            rate_controller.record_start(start_time)
+        rate_controller.record_success(0.3, 0.1)
+        self.assertIsNone(rate_controller.get_rate())
+        rate_controller.record_throttling(time.monotonic(), 0)
+        self.assertAlmostEqual(rate_controller.interval, 0.2)
+
+    def test_pause_follows_retry_after_and_backoff(self):
+        rate_controller = RateController(backoff_base=1, max_backoff=4)
+        self.assertEqual(rate_controller.record_throttling(0, 0, "30"), 30)
+        for attempt in range(5):
+            pause = rate_controller.record_throttling(0, attempt)
+            backoff = min(4, 2 ** attempt)
+            self.assertTrue(backoff / 2 <= pause <= backoff)
+
+    def test_fixed_rate_only_pauses(self):
+        rate_controller = RateController(0.5, backoff_base=1,
+                                         adaptive=False)
+        rate_controller.record_success(0, 0.1)
+        rate_controller.record_success(time.monotonic(), 10)
+        self.assertEqual(rate_controller.record_throttling(0, 0, "3"), 3)
+        self.assertEqual(rate_controller.interval, 0.5)
+
+    def test_write_is_retried_after_rate_limit(self):
+        answers = [WikibaseAPIError("ratelimited", retry_after="0"),
+                   WikibaseAPIError("maxlag", retry_after="0"), "Q1"]
+
+        def create_item():
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return(answer)
+
+        upload_executor = UploadExecutor(maxlag_pause=0.01)
+        self.assertEqual(upload_executor.write(create_item), "Q1")
+        write_rate = upload_executor.metrics.get_summary()["write_rate"]
+        self.assertLess(write_rate["current"], write_rate["max"])
+        with self.assertRaises(WikibaseAPIError):
+            upload_executor.write(_raise_permission_error)
+        upload_executor.shutdown()
+
+def _raise_permission_error():
+    raise WikibaseAPIError("permissiondenied")
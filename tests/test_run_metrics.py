@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from annlightenmentlib.metered_backend import MeteredBackend
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.wikibase_backend import WikibaseBackend
+
+class EmptyWiki(WikibaseBackend):
+
+    def get_linking_item_ids(self, item_id):
+        return([])
+
+    def edit_entity(self, item_id, data, summary=None):
+        pass
+
+class TestRunMetrics(unittest.TestCase):
+
+    def test_operations_are_counted_per_phase(self):
+        upload_executor = UploadExecutor(max_workers=2)
+        metrics = upload_executor.metrics
+        backend = MeteredBackend(EmptyWiki(), metrics)
+        backend.get_linking_item_ids("Q5")
+        metrics.set_phase("transcripts")
+        for item_id in ["Q1", "Q2", "Q3"]:
+            upload_executor.submit(item_id, upload_executor.write,
+                                   (backend.edit_entity, item_id, {}))
+        upload_executor.shutdown()
+        summary = metrics.get_summary()
+        self.assertEqual(summary["operations"]["editEntity"]["calls"], 3)
+        self.assertEqual(
+            summary["operations"]["editEntity"]["histogram_ms"], {"<=1": 3})
+        self.assertEqual(summary["phases"]["setup"]["calls"], {"backlinks": 1})
+        self.assertEqual(summary["phases"]["transcripts"]["calls"],
+                         {"editEntity": 3})
+        self.assertEqual(summary["phases"]["transcripts"]["tasks"], 3)
+        with tempfile.TemporaryDirectory() as directory:
+            path_to_metrics = os.path.join(directory, "metrics.json")
+            metrics.write(path_to_metrics)
+            with open(path_to_metrics) as metrics_file:
+                self.assertEqual(json.load(metrics_file)["phases"],
+                                 summary["phases"])
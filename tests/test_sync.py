@@ -0,0 +1,97 @@
+from collections import Counter
+import contextlib
+import io
+from annlightenmentlib.bacterialannotationbot import BacterialAnnotationBot
+from annlightenmentlib.delete_items import DeleteItems
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_journal import UploadJournal
+from bot_fixtures import InMemoryBackend, InputFilesTestCase, gff_lines
+
+class TestSync(InputFilesTestCase):
+
+    def setUp(self):
+        InputFilesTestCase.setUp(self)
+        self.backend = InMemoryBackend()
+
+    def _upload(self, lines, sync, journal=None):
+        self.write_input_files(lines)
+        self.backend.writes.clear()
+        upload_executor = UploadExecutor()
+        bot = BacterialAnnotationBot(
+            None, self.path_to_gff, self.path_to_csv, "Q5", "TillsWiki",
+            upload_executor=upload_executor, backend=self.backend,
+            journal=journal, sync=sync)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.all_features()
+        upload_executor.shutdown()
+        return(bot)
+
+    def _get_claims(self, label):
+        entity = [entity for entity in self.backend.entities.values()
+                  if entity.get("labels", {}).get("en", {}).get("value") ==
+                  label][0]
+        return(entity["claims"])
+
+    def test_sync_of_unchanged_release_writes_nothing(self):
+        self._upload(gff_lines, False)
+        number_of_items = len(self.backend.entities)
+        bot = self._upload(gff_lines, True)
+        self.assertEqual(self.backend.writes, Counter())
+        self.assertEqual(len(self.backend.entities), number_of_items)
+        self.assertEqual(bot.number_of_synced_items['unchanged'],
+                         number_of_items - 1)
+
+    def test_sync_keeps_items_the_bot_did_not_create(self):
+        self._upload(gff_lines, False)
+        self.backend.create_item({
+            "labels": {"en": {"language": "en",
+                              "value": "plasmid curated by hand"}},
+            "descriptions": {"en": {"language": "en",
+                                    "value": "plasmid of strain"}},
+            "claims": [{"mainsnak": self.backend._get_snak(
+                "P8", "Q5", "wikibase-item")}]})
+        self._upload([line for line in gff_lines if "ID=tss0" not in line],
+                     True)
+        # only the TSS is deleted, the hand-curated item stays
+        self.assertEqual(self.backend.writes["delete_item"], 1)
+        self.assertEqual(len(self._get_claims(
+            "plasmid curated by hand")["P8"]), 1)
+
+    def test_sync_sends_only_the_delta(self):
+        self._upload(gff_lines, False)
+        changed_lines = [line.replace("517\t1878\t.\t+\t.\tID=gene0",
+                                      "517\t1900\t.\t+\t.\tID=gene0")
+                         for line in gff_lines if "ID=tss0" not in line]
+        bot = self._upload(changed_lines, True)
+        # new end of the gene, TSS deleted and removed from the transcript
+        self.assertEqual(self.backend.writes,
+                         Counter({"edit_entity": 2, "delete_item": 1}))
+        self.assertEqual(bot.number_of_synced_items['updated'], 2)
+        gene_claims = self._get_claims("strain gene0")
+        self.assertEqual([statement["mainsnak"]["datavalue"]["value"]
+                          for statement in gene_claims["P10"]], ["1900"])
+        self.assertEqual(len(self._get_claims(
+            "strain tran0 517 1878")["P28"]), 1)
+
+    def test_journal_of_sync_lists_only_created_items(self):
+        self._upload(gff_lines, False)
+        existing_item_ids = set(self.backend.entities)
+        changed_lines = [line.replace("517\t1878\t.\t+\t.\tID=gene0",
+                                      "517\t1900\t.\t+\t.\tID=gene0")
+                         for line in gff_lines]
+        changed_lines.append(
+            "NC_007795.1\tRefSeq\tgene\t3000\t3500\t.\t+\t.\t"
+            "ID=gene1;Name=dnaN;locus_tag=SAOUHSC_00002\n")
+        path_to_journal = self.get_path("journal")
+        journal = UploadJournal(path_to_journal, "Q5")
+        bot = self._upload(changed_lines, True, journal)
+        journal.close()
+        self.assertEqual(bot.number_of_synced_items['updated'], 1)
+        created_item_ids = set(self.backend.entities) - existing_item_ids
+        self.assertEqual(len(created_item_ids), 2)
+        upload_executor = UploadExecutor()
+        deletion = DeleteItems(self.backend, upload_executor)
+        self.assertEqual(
+            set(deletion.get_item_ids_from_journal(path_to_journal)),
+            created_item_ids)
+        upload_executor.shutdown()
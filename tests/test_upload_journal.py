@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_journal import UploadJournal, get_journal_key
+from annlightenmentlib.upload_scheduler import UploadScheduler
+
+class TestUploadJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_to_journal = os.path.join(self.directory.name, "journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume_reads_finished_uploads(self):
+        journal = UploadJournal(self.path_to_journal, "Q5")
+        journal.record(get_journal_key(("item", "gene0")), "Q1")
+        journal.close()
+        with open(self.path_to_journal, "a") as journal_file:
+            journal_file.write('{"key": "[\\"item\\", \\"gen')
+        journal = UploadJournal(self.path_to_journal, "Q5", resume=True)
+        journal.record(get_journal_key(("item", "gene1")), "Q2")
+        journal.close()
+        journal = UploadJournal(self.path_to_journal, "Q5", resume=True)
+        self.assertEqual(journal.get_result(
+            get_journal_key(("item", "gene0"))), "Q1")
+        self.assertEqual(len(journal), 2)
+        journal.remove()
+        self.assertFalse(os.path.exists(self.path_to_journal))
+
+    def test_existing_journal_is_not_overwritten(self):
+        UploadJournal(self.path_to_journal, "Q5").close()
+        with self.assertRaises(FileExistsError):
+            UploadJournal(self.path_to_journal, "Q5")
+        with self.assertRaises(ValueError):
+            UploadJournal(self.path_to_journal, "Q6", resume=True)
+
+    def test_scheduler_skips_journaled_uploads(self):
+        journal = UploadJournal(self.path_to_journal, "Q5")
+        journal.record(get_journal_key(("item", "gene0")), "Q1")
+        upload_executor = UploadExecutor()
+        scheduler = UploadScheduler(upload_executor, journal)
+        uploads = []
+        registered = []
+        for key in [("item", "gene0"), ("item", "gene1")]:
+            scheduler.add_task(key, [], lambda key=key: scheduler.submit(
+                key, key, lambda: uploads.append(key) or "Q2",
+                callback=registered.append))
+        scheduler.run()
+        upload_executor.shutdown()
+        journal.close()
+        self.assertEqual(uploads, [("item", "gene1")])
+        self.assertEqual(registered, ["Q1", "Q2"])
+        self.assertEqual(scheduler.number_of_resumed_uploads, 1)
+        self.assertTrue(scheduler.is_journaled(("item", "gene1")))
+
+    def test_tasks_of_failed_uploads_are_redone_on_resume(self):
+        answers = [ValueError("upload failed"), "Q1"]
+
+        def create_gene():
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return(answer)
+
+        transcripts = []
+        for resume in [False, True]:
+            journal = UploadJournal(self.path_to_journal, "Q5", resume)
+            upload_executor = UploadExecutor()
+            scheduler = UploadScheduler(upload_executor, journal)
+            scheduler.add_task(("item", "gene0"), [],
+                               lambda: scheduler.submit(
+                                   ("item", "gene0"), "gene0", create_gene))
+            scheduler.add_task(
+                ("transcript", "tran0"), [("item", "gene0")],
+                lambda gene_id: scheduler.submit(
+                    ("transcript", "tran0"), "tran0",
+                    lambda: transcripts.append(gene_id) or "Q2"))
+            scheduler.run()
+            upload_executor.shutdown()
+            journal.close()
+        self.assertEqual(transcripts, ["Q1"])
+        self.assertTrue(scheduler.is_journaled(("transcript", "tran0")))
@@ -0,0 +1,81 @@
+import unittest
+from annlightenmentlib.upload_executor import UploadExecutor
+from annlightenmentlib.upload_scheduler import (UploadScheduler,
+                                                UploadSchedulerScope)
+
+class TestUploadScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.upload_executor = UploadExecutor(max_workers=1)
+        self.scheduler = UploadScheduler(self.upload_executor)
+        self.started = []
+
+    def tearDown(self):
+        self.upload_executor.shutdown()
+
+    def _create(self, key, item_id, *dependency_ids):
+        self.started.append(key)
+        self.scheduler.submit(key, key, lambda: item_id)
+
+    def _fail(self, key):
+        def failing_upload():
+            raise ValueError("upload failed")
+        self.scheduler.submit(key, key, failing_upload)
+
+    def test_task_runs_with_results_of_dependencies(self):
+        links = []
+        self.scheduler.add_task("gene", [],
+                                lambda: self._create("gene", "Q1"))
+        self.scheduler.add_task("product", [],
+                                lambda: self._create("product", "Q2"))
+        self.scheduler.add_task(
+            "link", ["gene", "product"],
+            lambda gene_id, product_id: links.append((gene_id, product_id)))
+        self.scheduler.run()
+        self.assertEqual(links, [("Q1", "Q2")])
+
+    def test_tasks_of_failed_uploads_are_skipped(self):
+        links = []
+        self.scheduler.add_task("gene", [], lambda: self._fail("gene"))
+        self.scheduler.add_task("product", [],
+                                lambda: self.scheduler.resolve("product",
+                                                               None))
+        self.scheduler.add_task(
+            "link", ["gene"], lambda gene_id: links.append(gene_id))
+        self.scheduler.add_task(
+            "part of", ["link", "product"],
+            lambda link, product_id: links.append(product_id))
+        self.scheduler.run()
+        # an item that needs no upload resolves to None, a failed one
+        # fails its dependent tasks
+        self.assertEqual(links, [])
+        self.assertEqual(self.scheduler.failed_keys,
+                         set(["gene", "link", "part of"]))
+        self.assertEqual(self.scheduler.number_of_skipped_tasks, 2)
+        self.assertEqual(len(self.upload_executor.failures), 1)
+
+    def test_unlocked_tasks_run_before_root_tasks(self):
+        for number in range(6):
+            key = "gene{}".format(number)
+            self.scheduler.add_task(
+                key, [], lambda key=key: self._create(key, "Q1"))
+        self.scheduler.add_task(
+            "transcript0", ["gene0"],
+            lambda gene_id: self._create("transcript0", "Q2"))
+        self.scheduler.run()
+        self.assertLess(self.started.index("transcript0"),
+                        self.started.index("gene5"))
+        self.assertTrue(self.scheduler.has_task("transcript0"))
+
+    def test_scopes_of_strains_do_not_collide(self):
+        links = []
+        for strain_id, item_id in [("Q5", "Q1"), ("Q6", "Q2")]:
+            scope = UploadSchedulerScope(self.scheduler, strain_id)
+            scope.add_task(("item", "gene0"), [],
+                           lambda scope=scope, item_id=item_id: scope.submit(
+                               ("item", "gene0"), "gene0", lambda: item_id))
+            scope.add_task(("link", "gene0"), [("item", "gene0")],
+                           links.append)
+        self.scheduler.run()
+        self.assertEqual(sorted(links), ["Q1", "Q2"])
+        self.assertTrue(self.scheduler.has_task(("Q6", "item", "gene0")))